@@ -0,0 +1,189 @@
+# analysis/anomalies.py
+import numpy as np
+import pandas as pd
+
+from analysis.arrays import NO_MONTH, amount_array, group_sort, month_ordinals, quantiles, sorted_medians
+from analysis.finance_metrics import iqr_bounds
+
+# Rows whose modified z-score exceeds this are anomalous (Iglewicz & Hoaglin)
+MODIFIED_Z_THRESHOLD = 3.5
+
+# Scales a MAD to a standard deviation for normally distributed data
+MAD_TO_SIGMA = 0.6745
+
+# Each month is scored against the previous BASELINE_MONTHS calendar months
+BASELINE_MONTHS = 3
+
+# Fewer rows than this in a window fall back to a wider baseline
+MIN_BASELINE_ROWS = 10
+
+# Scores are computed on log(1 + |amount|), where spending is roughly
+# symmetric. The MAD is floored (in log units, ~5%) so that groups of
+# identical amounts (subscriptions, rent) do not flag every small change
+MIN_LOG_SCALE = 0.05
+
+# Smallest IQR used to scale the IQR score
+MIN_SCALE = 0.01
+
+
+def _median_mad(groups: np.ndarray, values: np.ndarray, n_groups: int) -> tuple:
+    """
+    Median, median absolute deviation and row count per group code.
+    """
+    counts = np.bincount(groups, minlength=n_groups)
+    medians = sorted_medians(values[group_sort(groups, values)], counts)
+
+    deviations = np.abs(values - medians[groups])
+    mads = sorted_medians(deviations[group_sort(groups, deviations)], counts)
+
+    return medians, mads, counts
+
+
+def _fill(baseline, mad, rows, groups, medians, mads, counts, min_rows):
+    """
+    Sets the baseline of `rows` from their group's statistics where the
+    group had enough rows and no baseline was set yet.
+    """
+    usable = (counts[groups] >= min_rows) & np.isnan(baseline[rows])
+    baseline[rows[usable]] = medians[groups[usable]]
+    mad[rows[usable]] = mads[groups[usable]]
+
+
+def _robust_baselines(groups, n_groups, values, months, window_months, min_rows) -> tuple:
+    """
+    Per-row median and MAD of `values` from the row's group over the
+    previous `window_months` months. Rows without enough history, or without a date,
+    use the group's median/MAD over all time, then the median/MAD of every
+    row with the same sign.
+    """
+    baseline = np.full(len(values), np.nan)
+    mad = np.full(len(values), np.nan)
+
+    # Rows sorted by month, so every trailing window is one contiguous slice
+    dated = np.flatnonzero(months != NO_MONTH)
+    order = dated[np.argsort(months[dated], kind="stable")]
+    sorted_months = months[order]
+    sorted_groups = groups[order]
+    sorted_values = values[order]
+
+    for month in np.unique(sorted_months):
+        lo, hi, end = np.searchsorted(sorted_months, [month - window_months, month, month + 1])
+        if hi == lo:
+            continue
+        stats = _median_mad(sorted_groups[lo:hi], sorted_values[lo:hi], n_groups)
+        _fill(baseline, mad, order[hi:end], sorted_groups[hi:end], *stats, min_rows)
+
+    rows = np.arange(len(values))
+    _fill(baseline, mad, rows, groups, *_median_mad(groups, values, n_groups), min_rows)
+
+    # The lowest bit of a group code is the sign
+    signs = groups & 1
+    _fill(baseline, mad, rows, signs, *_median_mad(signs, values, 2), 1)
+
+    return baseline, mad
+
+
+def robust_scores(
+    df: pd.DataFrame,
+    by: str,
+    window_months: int = BASELINE_MONTHS,
+    min_rows: int = MIN_BASELINE_ROWS,
+) -> pd.DataFrame:
+    """
+    Modified z-scores of each amount's magnitude against a rolling robust
+    baseline of its group: rows with the same `by` value and the same sign
+    (income is compared with income, expenses with expenses). Positive
+    scores are larger than usual, negative smaller.
+
+    Returns score and baseline (the group's typical amount) per row,
+    aligned with df. Runs in O(n log n): one sort per month window.
+    """
+    amounts = amount_array(df["amount"])
+    magnitudes = np.log1p(np.abs(amounts))
+
+    codes, uniques = pd.factorize(df[by])
+    codes = np.where(codes < 0, len(uniques), codes).astype(np.int64)
+    groups = codes * 2 + (amounts < 0)
+    n_groups = 2 * (len(uniques) + 1)
+
+    baseline, mad = _robust_baselines(
+        groups, n_groups, magnitudes, month_ordinals(df["date"]), window_months, min_rows
+    )
+    score = MAD_TO_SIGMA * (magnitudes - baseline) / np.maximum(mad, MIN_LOG_SCALE)
+
+    return pd.DataFrame(
+        {"score": score, "baseline": np.copysign(np.expm1(baseline), amounts)},
+        index=df.index,
+    )
+
+
+def category_scores(df: pd.DataFrame) -> pd.DataFrame:
+    return robust_scores(df, "category")
+
+
+def merchant_scores(df: pd.DataFrame) -> pd.DataFrame:
+    return robust_scores(df, "description")
+
+
+def iqr_scores(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    The global IQR check from compute_financial_metrics as a score: the
+    distance beyond the nearer 1.5 x IQR fence in units of IQR, 0 inside.
+    The baseline is the global median.
+    """
+    amounts = amount_array(df["amount"])
+    lower, upper = iqr_bounds(amounts)
+    q1, median, q3 = quantiles(amounts, (0.25, 0.5, 0.75))
+    scale = max(q3 - q1, MIN_SCALE) if len(amounts) else MIN_SCALE
+
+    score = np.where(amounts < lower, (amounts - lower) / scale, np.where(amounts > upper, (amounts - upper) / scale, 0.0))
+
+    return pd.DataFrame({"score": score, "baseline": np.full(len(amounts), median)}, index=df.index)
+
+
+# name -> (scoring function, threshold on |score|)
+DETECTORS = {
+    "category": (category_scores, MODIFIED_Z_THRESHOLD),
+    "merchant": (merchant_scores, MODIFIED_Z_THRESHOLD),
+    "iqr": (iqr_scores, 0.0),
+}
+
+DEFAULT_DETECTOR = "category"
+
+
+def register_detector(name: str, scorer, threshold: float):
+    """
+    Adds a detector. `scorer(df)` must return a frame aligned with df with
+    at least a `score` column; rows with |score| > threshold are flagged.
+    """
+    DETECTORS[name] = (scorer, threshold)
+
+
+def score_anomalies(df: pd.DataFrame, detector: str = DEFAULT_DETECTOR) -> pd.DataFrame:
+    """
+    Scores every row with the named detector.
+    """
+    if detector not in DETECTORS:
+        raise ValueError(f"Unknown anomaly detector: {detector}")
+
+    scorer, _ = DETECTORS[detector]
+    return scorer(df)
+
+
+def detect_anomalies(df: pd.DataFrame, detector: str = DEFAULT_DETECTOR, threshold: float = None) -> pd.DataFrame:
+    """
+    Rows of df flagged by the named detector, with their score and baseline,
+    most anomalous first.
+    """
+    scores = score_anomalies(df, detector)
+    if threshold is None:
+        threshold = DETECTORS[detector][1]
+
+    magnitude = scores["score"].abs().to_numpy()
+    flagged = magnitude > threshold
+
+    anomalies = df[flagged].assign(score=scores["score"][flagged].round(2), baseline=scores["baseline"][flagged])
+    if not pd.api.types.is_numeric_dtype(df["amount"]):
+        anomalies = anomalies.assign(amount=amount_array(df["amount"])[flagged])
+
+    return anomalies.iloc[np.argsort(-magnitude[flagged], kind="stable")]
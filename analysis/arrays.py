@@ -0,0 +1,98 @@
+# analysis/arrays.py
+import numpy as np
+import pandas as pd
+
+from monitoring.instrumentation import instrumented
+from parsers.dates import parse_date_strings
+
+# Month ordinal used for rows without a usable date
+NO_MONTH = np.iinfo(np.int64).min
+
+
+@instrumented("metrics.amounts")
+def amount_array(amount: pd.Series) -> np.ndarray:
+    """
+    Returns the amount column as a float64 array with missing values as 0.
+    Numeric columns are used as-is; anything else is coerced once.
+    """
+    if not pd.api.types.is_numeric_dtype(amount):
+        amount = pd.to_numeric(amount, errors="coerce")
+
+    values = amount.to_numpy(dtype=np.float64, na_value=np.nan)
+    if np.isnan(values).any():
+        values = np.where(np.isnan(values), 0.0, values)
+    return values
+
+
+def day_ordinals(dates: pd.Series) -> tuple:
+    """
+    Days since 1970-01-01 for every row, and a mask of rows without a
+    usable date.
+    """
+    if pd.api.types.is_datetime64_any_dtype(dates):
+        parsed = dates.to_numpy(dtype="datetime64[ns]")
+    else:
+        parsed = parse_date_strings(dates)
+    return parsed.astype("datetime64[D]").astype(np.int64), np.isnat(parsed)
+
+
+@instrumented("metrics.parse_dates")
+def month_ordinals(dates: pd.Series) -> np.ndarray:
+    """
+    Returns months since 1970-01 for every row, NO_MONTH where the date is
+    missing or unparseable. Strings go through parse_date_strings.
+    """
+    if pd.api.types.is_datetime64_any_dtype(dates):
+        parsed = dates.to_numpy(dtype="datetime64[ns]")
+    else:
+        parsed = parse_date_strings(dates)
+
+    missing = np.isnat(parsed)
+    months = parsed.astype("datetime64[M]").astype(np.int64)
+    months[missing] = NO_MONTH
+    return months
+
+
+def quantiles(values: np.ndarray, qs) -> list:
+    """
+    Linear-interpolated quantiles (same as Series.quantile) computed with a
+    single partial sort instead of a full sort.
+    """
+    n = len(values)
+    if n == 0:
+        return [np.nan for _ in qs]
+
+    positions = [q * (n - 1) for q in qs]
+    kth = sorted({int(np.floor(p)) for p in positions} | {int(np.ceil(p)) for p in positions})
+    part = np.partition(values, kth)
+
+    result = []
+    for p in positions:
+        lo, hi = int(np.floor(p)), int(np.ceil(p))
+        result.append(part[lo] + (part[hi] - part[lo]) * (p - lo))
+    return result
+
+
+def sorted_medians(values: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    """
+    Medians of consecutive runs of `values` (sorted within each run) with
+    the given lengths; NaN for empty runs.
+    """
+    if len(values) == 0:
+        return np.full(len(counts), np.nan)
+
+    starts = np.cumsum(counts) - counts
+    safe = np.maximum(counts, 1)
+    lo = np.minimum(starts + (safe - 1) // 2, len(values) - 1)
+    hi = np.minimum(starts + safe // 2, len(values) - 1)
+    return np.where(counts > 0, (values[lo] + values[hi]) / 2, np.nan)
+
+
+def group_sort(groups: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """
+    Order that sorts by group, then value: a sort by value followed by a
+    stable sort by group. Faster than np.lexsort and, unlike a combined
+    float key, exact for any group codes and values.
+    """
+    by_value = np.argsort(values)
+    return by_value[np.argsort(groups[by_value], kind="stable")]
@@ -0,0 +1,118 @@
+# analysis/categorize.py
+import re
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from parsers.schema import DEFAULTS
+
+# Keywords are matched as whole words in the normalized description
+CATEGORY_KEYWORDS = {
+    "Groceries": [
+        "whole foods", "trader joe", "trader joes", "safeway", "kroger", "aldi", "costco", "walmart",
+        "grocery", "groceries", "supermarket", "market",
+    ],
+    "Dining": [
+        "starbucks", "chipotle", "mcdonald", "mcdonalds", "subway", "dunkin", "doordash", "uber eats",
+        "grubhub", "restaurant", "cafe", "coffee", "pizza", "lunch", "dinner", "breakfast", "bar",
+    ],
+    "Transport": [
+        "uber", "lyft", "shell", "chevron", "exxon", "bp", "gas", "fuel", "parking", "toll", "metro",
+        "transit", "taxi", "train",
+    ],
+    "Travel": [
+        "delta", "united airlines", "american airlines", "southwest", "airline", "airlines", "airbnb",
+        "expedia", "marriott", "hilton", "hotel", "flight", "flights",
+    ],
+    "Entertainment": [
+        "netflix", "spotify", "hulu", "disney", "hbo", "youtube", "steam", "cinema", "movie", "movies",
+        "concert", "tickets",
+    ],
+    "Shopping": ["amazon", "amzn", "target", "best buy", "ebay", "etsy", "ikea", "apple store", "clothing"],
+    "Utilities": [
+        "comcast", "xfinity", "pg&e", "verizon", "at&t", "t mobile", "electric", "electricity", "water",
+        "internet", "phone", "utility", "utilities",
+    ],
+    "Health": ["cvs", "walgreens", "pharmacy", "doctor", "dental", "dentist", "hospital", "clinic", "gym", "fitness"],
+    "Rent": ["rent", "landlord", "mortgage", "apartment", "property management"],
+    "Salary": ["salary", "payroll", "paycheck", "direct deposit", "wages"],
+    "Fees": ["fee", "fees", "overdraft", "interest charge", "atm"],
+}
+
+_KEYWORD_CATEGORY = {
+    keyword: category for category, keywords in CATEGORY_KEYWORDS.items() for keyword in keywords
+}
+
+# One alternation over every keyword, longest first, so "uber eats" wins
+# over "uber" at the same position
+KEYWORD_PATTERN = re.compile(
+    r"\b(?:" + "|".join(re.escape(k) for k in sorted(_KEYWORD_CATEGORY, key=len, reverse=True)) + r")\b"
+)
+
+# Card processors add reference numbers and punctuation: "AMZN MKTP US*2K3"
+_DESCRIPTION_NOISE = re.compile(r"[^a-z&\s]+")
+
+# Distinct descriptions remembered across calls
+MAX_MEMO_DESCRIPTIONS = 100_000
+
+
+def normalize_description(description: str) -> str:
+    """
+    Lower-cases a description and drops digits and punctuation.
+    """
+    return " ".join(_DESCRIPTION_NOISE.sub(" ", str(description).lower()).split())
+
+
+@lru_cache(maxsize=MAX_MEMO_DESCRIPTIONS)
+def classify_description(description: str):
+    """
+    Category for one raw description, or None if no keyword matches.
+    """
+    match = KEYWORD_PATTERN.search(normalize_description(description))
+    return _KEYWORD_CATEGORY[match.group(0)] if match else None
+
+
+def categorize(df: pd.DataFrame, llm_fallback: bool = False) -> pd.DataFrame:
+    """
+    Fills in the category of rows that are 'Uncategorized' (or missing)
+    from their description. Categories the input already had are kept.
+
+    Each distinct description is classified once, so the cost depends on
+    the number of merchants, not rows. With `llm_fallback`, descriptions no
+    keyword matches are sent to llm_client.categorize_merchants in batches.
+    """
+    uncategorized = DEFAULTS["category"]
+
+    category = df["category"].astype("category")
+    category_codes = category.cat.codes.to_numpy()
+    pending = category_codes < 0
+    if uncategorized in category.cat.categories:
+        pending |= category_codes == category.cat.categories.get_loc(uncategorized)
+    if not pending.any():
+        return df
+
+    # Work on dictionary codes: one classification per distinct description
+    description = df["description"].astype("category")
+    codes = description.cat.codes.to_numpy()[pending]
+    uniques = description.cat.categories
+    used = np.bincount(codes[codes >= 0], minlength=len(uniques)) > 0
+
+    labels = [classify_description(d) if is_used else None for d, is_used in zip(uniques, used)]
+
+    unknown = [d for d, label, is_used in zip(uniques, labels, used) if is_used and label is None]
+    if llm_fallback and unknown:
+        from llm.llm_client import categorize_merchants
+
+        suggested = categorize_merchants(unknown, list(CATEGORY_KEYWORDS))
+        labels = [label or suggested.get(d) for d, label in zip(uniques, labels)]
+
+    names = list(dict.fromkeys([*category.cat.categories, *(label for label in labels if label), uncategorized]))
+    position = {name: i for i, name in enumerate(names)}
+    label_codes = np.array([position[label or uncategorized] for label in labels] + [position[uncategorized]])
+
+    # Missing descriptions (code -1) pick the trailing 'Uncategorized' entry
+    new_codes = category_codes.astype(np.int64)
+    new_codes[pending] = label_codes[codes]
+
+    return df.assign(category=pd.Categorical.from_codes(new_codes, categories=names).remove_unused_categories())
@@ -2,51 +2,89 @@
 import pandas as pd
 import numpy as np
 
-def compute_financial_metrics(df: pd.DataFrame) -> dict:
+from analysis.arrays import NO_MONTH, amount_array, month_ordinals, quantiles
+from monitoring.instrumentation import instrumented
+
+IQR_MULTIPLIER = 1.5
+
+
+@instrumented("metrics.category_spend")
+def spend_by_category(categories: pd.Series, amounts: np.ndarray, expense_mask: np.ndarray) -> pd.Series:
     """
-    Computes required financial metrics from normalized data.
+    Absolute expense total per category, largest first.
     """
+    codes, uniques = pd.factorize(categories, sort=True)
+    keep = expense_mask & (codes >= 0)
 
-    df = df.copy()
+    sums = np.bincount(codes[keep], weights=amounts[keep], minlength=len(uniques))
+    counts = np.bincount(codes[keep], minlength=len(uniques))
+    present = counts > 0
 
-    # Ensure amount is numeric
-    df["amount"] = pd.to_numeric(df["amount"], errors="coerce").fillna(0)
+    spend = pd.Series(
+        np.abs(sums[present]).astype(np.float64),
+        index=pd.Index(np.asarray(uniques)[present], name="category"),
+        name="amount",
+    )
+    return spend.sort_values(ascending=False)
 
-    income = df[df["amount"] > 0]["amount"].sum()
-    expenses = df[df["amount"] < 0]["amount"].sum()
-    expenses = abs(expenses)
 
-    net_savings = income - expenses
-    savings_rate = (net_savings / income * 100) if income > 0 else 0
+@instrumented("metrics.monthly_trend")
+def net_by_month(months: np.ndarray, amounts: np.ndarray) -> pd.Series:
+    """
+    Net amount per calendar month, indexed by a monthly PeriodIndex.
+    """
+    valid = months != NO_MONTH
+    if not valid.any():
+        return pd.Series(
+            [], index=pd.PeriodIndex([], freq="M", name="parsed_date"), name="amount", dtype=np.float64
+        )
 
-    # Category-wise spending
-    category_spend = (
-        df[df["amount"] < 0]
-        .groupby("category")["amount"]
-        .sum()
-        .abs()
-        .sort_values(ascending=False)
-    )
+    row_months = months[valid]
+    first = row_months.min()
+    offsets = row_months - first
 
-    # Monthly trend (safe parsing)
-    df["parsed_date"] = pd.to_datetime(df["date"], errors="coerce")
-    monthly_trend = (
-        df.dropna(subset=["parsed_date"])
-        .groupby(df["parsed_date"].dt.to_period("M"))["amount"]
-        .sum()
+    sums = np.bincount(offsets, weights=amounts[valid])
+    counts = np.bincount(offsets)
+    present = np.flatnonzero(counts)
+
+    index = pd.PeriodIndex(
+        pd.to_datetime((present + first).astype("datetime64[M]")), freq="M", name="parsed_date"
     )
+    return pd.Series(sums[present], index=index, name="amount")
 
-    # Simple anomaly detection using IQR
-    q1 = df["amount"].quantile(0.25)
-    q3 = df["amount"].quantile(0.75)
+
+@instrumented("metrics.iqr_bounds")
+def iqr_bounds(amounts: np.ndarray) -> tuple:
+    """
+    Lower and upper IQR fences for the anomaly check.
+    """
+    q1, q3 = quantiles(amounts, (0.25, 0.75))
     iqr = q3 - q1
 
-    lower_bound = q1 - 1.5 * iqr
-    upper_bound = q3 + 1.5 * iqr
+    return q1 - IQR_MULTIPLIER * iqr, q3 + IQR_MULTIPLIER * iqr
 
-    anomalies = df[
-        (df["amount"] < lower_bound) | (df["amount"] > upper_bound)
-    ]
+
+@instrumented("metrics.anomalies")
+def flag_anomalies(df: pd.DataFrame, amounts: np.ndarray, bounds: tuple) -> pd.DataFrame:
+    """
+    Rows of df whose amount falls outside the IQR fences, with amount numeric.
+    """
+    lower_bound, upper_bound = bounds
+
+    flagged = (amounts < lower_bound) | (amounts > upper_bound)
+    anomalies = df[flagged]
+    if not pd.api.types.is_numeric_dtype(df["amount"]):
+        anomalies = anomalies.assign(amount=amounts[flagged])
+
+    return anomalies
+
+
+def build_metrics(income, expenses, category_spend, monthly_trend, anomalies) -> dict:
+    """
+    Assembles the metrics dict shared by every way of computing it.
+    """
+    net_savings = income - expenses
+    savings_rate = (net_savings / income * 100) if income > 0 else 0
 
     return {
         "total_income": round(income, 2),
@@ -57,3 +95,56 @@ def compute_financial_metrics(df: pd.DataFrame) -> dict:
         "monthly_trend": monthly_trend,
         "anomalies": anomalies
     }
+
+
+@instrumented("metrics")
+def compute_financial_metrics(df: pd.DataFrame) -> dict:
+    """
+    Computes required financial metrics from normalized data.
+    Works directly on the column arrays: the frame is not copied, sign masks
+    are built once and the IQR bounds come from a partial sort.
+    """
+
+    # Ensure amount is numeric
+    amounts = amount_array(df["amount"])
+
+    income_mask = amounts > 0
+    expense_mask = amounts < 0
+
+    income = np.add.reduce(amounts, where=income_mask)
+    expenses = abs(np.add.reduce(amounts, where=expense_mask))
+
+    # Category-wise spending
+    category_spend = spend_by_category(df["category"], amounts, expense_mask)
+
+    # Monthly trend (safe parsing)
+    monthly_trend = net_by_month(month_ordinals(df["date"]), amounts)
+
+    # Simple anomaly detection using IQR
+    anomalies = flag_anomalies(df, amounts, iqr_bounds(amounts))
+
+    return build_metrics(income, expenses, category_spend, monthly_trend, anomalies)
+
+
+def metrics_to_dict(metrics: dict) -> dict:
+    """
+    JSON-serializable copy of a metrics dict: scalars as floats, the
+    category and monthly series as {label: amount}, anomalies (and
+    recurring payments, if detected) as records.
+    """
+    anomalies = metrics["anomalies"]
+    recurring = metrics.get("recurring")
+
+    result = {
+        "total_income": float(metrics["total_income"]),
+        "total_expenses": float(metrics["total_expenses"]),
+        "net_savings": float(metrics["net_savings"]),
+        "savings_rate": float(metrics["savings_rate"]),
+        "category_spend": {str(k): float(v) for k, v in metrics["category_spend"].items()},
+        "monthly_trend": {str(k): float(v) for k, v in metrics["monthly_trend"].items()},
+        "anomalies": anomalies.astype({"date": str}).to_dict(orient="records") if len(anomalies) else [],
+    }
+    if recurring is not None:
+        dates = {"first_charge": str, "last_charge": str, "next_expected": str}
+        result["recurring"] = recurring.astype(dates).to_dict(orient="records") if len(recurring) else []
+    return result
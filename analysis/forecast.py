@@ -0,0 +1,179 @@
+# analysis/forecast.py
+import numpy as np
+import pandas as pd
+
+from analysis.rollups import rollup
+from monitoring.instrumentation import instrumented
+
+# Months projected when no horizon is given
+DEFAULT_HORIZON = 12
+
+# The level and trend are fitted on this many trailing months
+TREND_MONTHS = 24
+
+# Each projected month keeps this share of the previous month's trend, so a
+# short-term slope flattens out instead of compounding over long horizons
+TREND_DAMPING = 0.9
+
+# Seasonal offsets need at least this many whole years of history
+MIN_SEASONAL_YEARS = 2
+
+
+def monthly_history(cube: pd.DataFrame) -> tuple:
+    """
+    Income and expenses (both positive) per month (rows, every month from
+    the first to the last with transactions) and category (columns), from
+    the rollup cube. Returns (PeriodIndex, categories, income, expenses).
+    """
+    monthly = rollup(cube, "M", by_category=True)[["income", "expenses"]].unstack("category", fill_value=0.0)
+    if monthly.empty:
+        return pd.PeriodIndex([], freq="M"), pd.Index([]), np.zeros((0, 0)), np.zeros((0, 0))
+
+    months = pd.period_range(monthly.index.min(), monthly.index.max(), freq="M")
+    monthly = monthly.reindex(months, fill_value=0.0)
+    categories = pd.Index(monthly["income"].columns.astype(str))
+    return (
+        months,
+        categories,
+        monthly["income"].to_numpy(dtype=np.float64),
+        monthly["expenses"][monthly["income"].columns].to_numpy(dtype=np.float64),
+    )
+
+
+def _seasonal_offsets(months: pd.PeriodIndex, history: np.ndarray) -> np.ndarray:
+    """
+    Additive offset per calendar month (12 x categories) from the trailing
+    whole years of history; zeros when there are fewer than
+    MIN_SEASONAL_YEARS of them.
+    """
+    offsets = np.zeros((12, history.shape[1]))
+    years = len(history) // 12
+    if years < MIN_SEASONAL_YEARS:
+        return offsets
+
+    recent = history[-12 * years:].reshape(years, 12, -1)
+    by_position = recent.mean(axis=0) - recent.mean(axis=(0, 1))
+    calendar = months[-12 * years:][:12].month.to_numpy() - 1
+    offsets[calendar] = by_position
+    return offsets
+
+
+def seasonal_baseline(months: pd.PeriodIndex, history: np.ndarray, horizon: int = DEFAULT_HORIZON) -> tuple:
+    """
+    Projection of every column for the `horizon` months after the history:
+    a level and damped linear trend fitted by least squares on the last
+    TREND_MONTHS deseasonalized months, plus each calendar month's seasonal
+    offset. All columns are fitted at once.
+    Returns (future PeriodIndex, horizon x columns matrix).
+    """
+    future = pd.period_range(months[-1] + 1, periods=horizon, freq="M")
+    if history.size == 0:
+        return future, np.zeros((horizon, history.shape[1]))
+
+    offsets = _seasonal_offsets(months, history)
+    window = history[-TREND_MONTHS:] - offsets[months[-TREND_MONTHS:].month.to_numpy() - 1]
+
+    # Least squares y = a + b * x per column, x centred on the window
+    x = np.arange(len(window)) - (len(window) - 1) / 2
+    denominator = (x ** 2).sum()
+    slope = (x @ (window - window.mean(axis=0))) / denominator if denominator else np.zeros(history.shape[1])
+    level = window.mean(axis=0) + slope * x[-1]
+
+    damped_steps = np.cumsum(TREND_DAMPING ** np.arange(1, horizon + 1))
+    projection = level + damped_steps[:, None] * slope + offsets[future.month.to_numpy() - 1]
+    return future, projection
+
+
+def scenario_arrays(scenarios: list, categories: pd.Index) -> tuple:
+    """
+    Turns scenario dicts into the arrays `project` takes. Each scenario is
+    {"name": ..., "changes": [{"category": ..., "scale": 0.8, "shift": -1500,
+    "start": 3}, ...]}: the category's projected expenses are multiplied by
+    `scale` and `shift` (signed; negative for a new expense) is added from
+    month `start` (0 = first projected month) on. A category the history
+    does not have is added with a zero baseline.
+    Returns (names, categories, scale, shift, start), each array
+    scenarios x categories.
+    """
+    new = [
+        change["category"] for scenario in scenarios for change in scenario.get("changes", ())
+        if change["category"] not in categories
+    ]
+    categories = categories.append(pd.Index(list(dict.fromkeys(new)), dtype=object)) if new else categories
+
+    scale = np.ones((len(scenarios), len(categories)))
+    shift = np.zeros((len(scenarios), len(categories)))
+    start = np.zeros((len(scenarios), len(categories)), dtype=np.int64)
+    for i, scenario in enumerate(scenarios):
+        for change in scenario.get("changes", ()):
+            column = categories.get_loc(change["category"])
+            scale[i, column] = change.get("scale", 1.0)
+            shift[i, column] = change.get("shift", 0.0)
+            start[i, column] = change.get("start", 0)
+
+    names = [scenario.get("name", f"Scenario {i + 1}") for i, scenario in enumerate(scenarios)]
+    return names, categories, scale, shift, start
+
+
+def project(income: np.ndarray, expenses: np.ndarray, scale: np.ndarray, shift: np.ndarray, start: np.ndarray) -> np.ndarray:
+    """
+    Every scenario applied to the projected income and expenses (horizon x
+    categories) in one broadcast against the (scenarios x categories)
+    parameters. `scale` applies to expenses, so cutting a category's
+    spending leaves its refunds and income alone.
+    Returns scenarios x horizon x categories net amounts.
+    """
+    missing = scale.shape[1] - income.shape[1]
+    if missing > 0:
+        income = np.pad(income, ((0, 0), (0, missing)))
+        expenses = np.pad(expenses, ((0, 0), (0, missing)))
+
+    active = np.arange(len(income))[None, :, None] >= start[:, None, :]
+    return (
+        income[None]
+        - expenses[None] * np.where(active, scale[:, None, :], 1.0)
+        + np.where(active, shift[:, None, :], 0.0)
+    )
+
+
+@instrumented("forecast")
+def forecast(cube: pd.DataFrame, scenarios: list = (), horizon: int = DEFAULT_HORIZON, opening: float = 0.0) -> dict:
+    """
+    Seasonal projection of every category's income and expenses for the
+    next `horizon` months, netted per category, for a "Baseline" scenario
+    followed by `scenarios` (see scenario_arrays), all computed together.
+    Returns arrays for charting:
+      periods     future months (PeriodIndex)
+      categories  category of each column
+      scenarios   scenario names, "Baseline" first
+      amounts     scenarios x months x categories
+      net         scenarios x months, net amount per month
+      balance     scenarios x months, `opening` plus the cumulative net
+    """
+    months, categories, income, expenses = monthly_history(cube)
+    if len(months) == 0:
+        return {}
+
+    # Income and expenses are fitted together; a falling trend stops at zero
+    periods, baseline = seasonal_baseline(months, np.hstack([income, expenses]), horizon)
+    baseline = np.maximum(baseline, 0.0)
+    names, categories, scale, shift, start = scenario_arrays([{"name": "Baseline"}, *scenarios], categories)
+    n = income.shape[1]
+    amounts = project(baseline[:, :n], baseline[:, n:], scale, shift, start)
+    net = amounts.sum(axis=2)
+
+    return {
+        "periods": periods,
+        "categories": categories,
+        "scenarios": names,
+        "amounts": amounts,
+        "net": net,
+        "balance": opening + np.cumsum(net, axis=1),
+    }
+
+
+def balance_frame(result: dict) -> pd.DataFrame:
+    """
+    Projected balance per month (rows) and scenario (columns), for a line chart.
+    """
+    return pd.DataFrame(result["balance"].T, index=result["periods"].to_timestamp(), columns=result["scenarios"])
@@ -0,0 +1,234 @@
+# analysis/incremental.py
+import math
+
+import numpy as np
+import pandas as pd
+
+from analysis.arrays import amount_array, month_ordinals
+from analysis.finance_metrics import IQR_MULTIPLIER, build_metrics, net_by_month, spend_by_category
+
+# Relative accuracy of the quantile sketch (1%)
+SKETCH_RELATIVE_ACCURACY = 0.01
+
+# Rows outside this tighter fence are kept as anomaly candidates, so that
+# later batches can move the 1.5 x IQR fences inwards without losing rows
+CANDIDATE_MULTIPLIER = 1.0
+
+# At most this many of the lowest and of the highest candidates are kept,
+# so memory stays bounded however many rows are folded in; the number of
+# anomalies is still counted from the sketch
+MAX_ANOMALY_ROWS = 1000
+
+
+def _add_series(total, part: pd.Series) -> pd.Series:
+    """
+    Adds two keyed partial sums, keeping keys that appear in either.
+    """
+    if total is None:
+        return part
+    if part.empty:
+        return total
+    return total.add(part, fill_value=0).rename(part.name)
+
+
+class QuantileSketch:
+    """
+    Mergeable quantile sketch with relative-error guarantees (DDSketch).
+
+    Values are counted in logarithmic buckets of width gamma = (1+a)/(1-a),
+    one store per sign plus a zero count. quantile(q) returns a value within
+    a relative error `a` of the sample at rank floor(q * (n - 1)); it does
+    not interpolate between neighbouring ranks the way Series.quantile does.
+    Memory depends on the range of magnitudes, not on the number of values.
+    """
+
+    def __init__(self, relative_accuracy: float = SKETCH_RELATIVE_ACCURACY):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.positive = {}
+        self.negative = {}
+        self.zeros = 0
+        self.count = 0
+
+    def _keys(self, magnitudes: np.ndarray) -> np.ndarray:
+        return np.ceil(np.log(magnitudes) / self._log_gamma).astype(np.int64)
+
+    @staticmethod
+    def _add_counts(store: dict, keys: np.ndarray):
+        buckets, counts = np.unique(keys, return_counts=True)
+        for bucket, count in zip(buckets.tolist(), counts.tolist()):
+            store[bucket] = store.get(bucket, 0) + count
+
+    def add(self, values: np.ndarray):
+        values = np.asarray(values, dtype=np.float64)
+        positive = values > 0
+        negative = values < 0
+
+        self._add_counts(self.positive, self._keys(values[positive]))
+        self._add_counts(self.negative, self._keys(-values[negative]))
+        self.zeros += int(len(values) - positive.sum() - negative.sum())
+        self.count += len(values)
+
+    def merge(self, other: "QuantileSketch"):
+        if other.gamma != self.gamma:
+            raise ValueError("Cannot merge sketches with different relative accuracy")
+
+        for store, other_store in ((self.positive, other.positive), (self.negative, other.negative)):
+            for bucket, count in other_store.items():
+                store[bucket] = store.get(bucket, 0) + count
+        self.zeros += other.zeros
+        self.count += other.count
+
+    def _value(self, bucket: int) -> float:
+        return 2 * self.gamma ** bucket / (self.gamma + 1)
+
+    def count_outside(self, lower: float, upper: float) -> int:
+        """
+        Values below `lower` or above `upper`, to the sketch's accuracy.
+        """
+        below = sum(count for bucket, count in self.negative.items() if -self._value(bucket) < lower)
+        below += sum(count for bucket, count in self.positive.items() if self._value(bucket) < lower)
+        above = sum(count for bucket, count in self.positive.items() if self._value(bucket) > upper)
+        above += sum(count for bucket, count in self.negative.items() if -self._value(bucket) > upper)
+        zeros = self.zeros if (0.0 < lower or 0.0 > upper) else 0
+        return below + above + zeros
+
+    def quantile(self, q: float) -> float:
+        if self.count == 0:
+            return np.nan
+
+        rank = int(q * (self.count - 1))
+
+        # Walk buckets in ascending value order: large negatives first
+        for bucket in sorted(self.negative, reverse=True):
+            rank -= self.negative[bucket]
+            if rank < 0:
+                return -self._value(bucket)
+
+        rank -= self.zeros
+        if rank < 0:
+            return 0.0
+
+        for bucket in sorted(self.positive):
+            rank -= self.positive[bucket]
+            if rank < 0:
+                return self._value(bucket)
+
+        return self._value(max(self.positive))
+
+
+class IncrementalMetrics:
+    """
+    compute_financial_metrics kept up to date as batches arrive.
+
+    Holds running income/expense sums, per-category and per-month sums, and
+    a QuantileSketch of all amounts for the IQR fences. update(df) folds in
+    a new batch, merge(other) combines partitions, and to_metrics() returns
+    the usual metrics dict without touching earlier rows.
+
+    Totals, category spend and monthly trend match a full recompute exactly
+    (up to float summation order). The IQR fences are within the sketch's
+    relative accuracy (1% by default) of the exact quartiles, so rows very
+    close to a fence may be classified differently. Anomalies are drawn from
+    retained candidate rows: rows inside the 1.0 x IQR fence when they
+    arrived are dropped, so they are missed only if later batches pull the
+    fences in past them. Only the `max_anomalies` lowest and highest
+    candidates are retained; `anomaly_count` in the result is the sketch's
+    count of all rows outside the fences.
+    """
+
+    def __init__(self, relative_accuracy: float = SKETCH_RELATIVE_ACCURACY, max_anomalies: int = MAX_ANOMALY_ROWS):
+        self.income = 0.0
+        self.expenses = 0.0
+        self.rows = 0
+        self.category_spend = None
+        self.monthly_trend = None
+        self.sketch = QuantileSketch(relative_accuracy)
+        self.candidates = None
+        self.max_anomalies = max_anomalies
+
+    def _fences(self, multiplier: float) -> tuple:
+        q1 = self.sketch.quantile(0.25)
+        q3 = self.sketch.quantile(0.75)
+        iqr = q3 - q1
+        return q1 - multiplier * iqr, q3 + multiplier * iqr
+
+    def _prune(self, frame: pd.DataFrame) -> pd.DataFrame:
+        lower, upper = self._fences(CANDIDATE_MULTIPLIER)
+        amounts = frame["amount"].to_numpy(dtype=np.float64)
+        outside = np.flatnonzero((amounts < lower) | (amounts > upper))
+        if len(outside) <= 2 * self.max_anomalies:
+            return frame.iloc[outside]
+
+        # The most extreme rows on each side stay anomalous however the fences move
+        order = outside[np.argsort(amounts[outside], kind="stable")]
+        keep = np.sort(np.concatenate([order[:self.max_anomalies], order[-self.max_anomalies:]]))
+        return frame.iloc[keep]
+
+    def update(self, df: pd.DataFrame) -> "IncrementalMetrics":
+        """
+        Folds a batch of normalized transactions into the running state.
+        """
+        amounts = amount_array(df["amount"])
+        expense_mask = amounts < 0
+
+        self.income += np.add.reduce(amounts, where=amounts > 0)
+        self.expenses += abs(np.add.reduce(amounts, where=expense_mask))
+        self.rows += len(amounts)
+
+        self.category_spend = _add_series(self.category_spend, spend_by_category(df["category"], amounts, expense_mask))
+        self.monthly_trend = _add_series(self.monthly_trend, net_by_month(month_ordinals(df["date"]), amounts))
+
+        self.sketch.add(amounts)
+
+        batch = df.assign(amount=amounts) if not pd.api.types.is_float_dtype(df["amount"]) else df
+        frames = [frame for frame in (self.candidates, batch) if frame is not None and not frame.empty]
+        self.candidates = self._prune(pd.concat(frames) if len(frames) > 1 else frames[0]) if frames else None
+
+        return self
+
+    def merge(self, other: "IncrementalMetrics") -> "IncrementalMetrics":
+        """
+        Combines another partition's state into this one.
+        """
+        self.income += other.income
+        self.expenses += other.expenses
+        self.rows += other.rows
+
+        if other.category_spend is not None:
+            self.category_spend = _add_series(self.category_spend, other.category_spend)
+        if other.monthly_trend is not None:
+            self.monthly_trend = _add_series(self.monthly_trend, other.monthly_trend)
+
+        self.sketch.merge(other.sketch)
+
+        frames = [frame for frame in (self.candidates, other.candidates) if frame is not None and not frame.empty]
+        self.candidates = self._prune(pd.concat(frames)) if frames else None
+
+        return self
+
+    def to_metrics(self) -> dict:
+        """
+        The compute_financial_metrics dict for everything seen so far.
+        """
+        category_spend = self.category_spend
+        if category_spend is None:
+            category_spend = spend_by_category(pd.Series([], dtype=object), np.empty(0), np.empty(0, dtype=bool))
+        category_spend = category_spend.sort_index().sort_values(ascending=False)
+
+        monthly_trend = self.monthly_trend
+        if monthly_trend is None:
+            monthly_trend = net_by_month(np.empty(0, dtype=np.int64), np.empty(0))
+        monthly_trend = monthly_trend.sort_index()
+
+        lower, upper = self._fences(IQR_MULTIPLIER)
+        if self.candidates is None:
+            anomalies = pd.DataFrame(columns=["date", "description", "amount", "category"])
+        else:
+            amounts = self.candidates["amount"].to_numpy(dtype=np.float64)
+            anomalies = self.candidates[(amounts < lower) | (amounts > upper)]
+
+        metrics = build_metrics(self.income, self.expenses, category_spend, monthly_trend, anomalies)
+        metrics["anomaly_count"] = max(self.sketch.count_outside(lower, upper), len(anomalies)) if self.rows else 0
+        return metrics
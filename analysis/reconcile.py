@@ -0,0 +1,222 @@
+# analysis/reconcile.py
+import re
+
+import numpy as np
+import pandas as pd
+
+from monitoring.instrumentation import instrumented
+
+# Both legs of a transfer must fall within this many days of each other
+TRANSFER_WINDOW_DAYS = 3
+
+# Descriptions banks use for money moved between a customer's own accounts;
+# both legs of a transfer must match
+TRANSFER_PATTERN = re.compile(
+    r"\b(?:transfer|xfer|trnsfr|tfr|autopay|auto pay|payment thank you|thank you for your payment|"
+    r"online payment|card payment|credit card payment|epayment|to savings|from savings|"
+    r"to checking|from checking)\b"
+)
+
+# Sweeps of the transfer matcher; each pairs every leg with at most one
+# partner, so a few rounds settle amounts that repeat within the window
+MAX_TRANSFER_ROUNDS = 5
+
+_TEXT_NOISE = re.compile(r"[^a-z0-9]+")
+
+REPORT_COLUMNS = ["reason", "matched_row", "date", "description", "amount", "category", "source"]
+
+
+def _normalized_text(values: pd.Series) -> tuple:
+    """
+    Codes of each row's description after lower-casing and dropping
+    punctuation and extra whitespace, and the normalized strings; each
+    distinct description is normalized once.
+    """
+    values = values.astype("category")
+    codes, uniques = values.cat.codes.to_numpy(), values.cat.categories
+    texts = np.array([" ".join(_TEXT_NOISE.sub(" ", str(u).lower()).split()) for u in uniques], dtype=object)
+    text_codes, normalized = pd.factorize(texts)
+    return np.where(codes >= 0, text_codes[np.maximum(codes, 0)] if len(texts) else -1, -1), normalized
+
+
+def _cents(amounts: pd.Series) -> np.ndarray:
+    return np.round(pd.to_numeric(amounts, errors="coerce").to_numpy(dtype=np.float64, na_value=0.0) * 100).astype(np.int64)
+
+
+def _runs(keys: np.ndarray) -> tuple:
+    """
+    For every row, how many earlier rows share its key, and the position of
+    the first row with that key; one stable sort instead of two groupbys.
+    """
+    n = len(keys)
+    order = np.argsort(keys, kind="stable")
+    ordered = keys[order]
+    new_run = np.r_[True, ordered[1:] != ordered[:-1]]
+    run_start = np.maximum.accumulate(np.where(new_run, np.arange(n), 0))
+
+    within = np.empty(n, dtype=np.int64)
+    first = np.empty(n, dtype=np.int64)
+    within[order] = np.arange(n) - run_start
+    first[order] = order[run_start]
+    return within, first
+
+
+def find_duplicates(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Rows repeating a transaction from another source file (same day, amount
+    in cents and normalized description), found through a hash of those
+    three. Repeats within one file are real and are numbered so that file
+    B's second coffee is a duplicate only if file A also had a second one.
+    Rows without a date are never duplicates: nothing tells two undated
+    charges of the same amount apart, e.g. the same subscription on twelve
+    monthly PDF statements.
+    Returns (row position, position of the row it duplicates) pairs; empty
+    when the frame has no `source` column.
+    """
+    empty = pd.DataFrame({"row": np.empty(0, dtype=np.int64), "matched_row": np.empty(0, dtype=np.int64)})
+    if "source" not in df or len(df) == 0:
+        return empty
+
+    dates = df["date"].to_numpy(dtype="datetime64[ns]")
+    dated = np.flatnonzero(~np.isnat(dates))
+    if len(dated) == 0:
+        return empty
+
+    df = df.iloc[dated]
+    days = dates[dated].astype("datetime64[D]").astype(np.int64)
+    text_codes, _ = _normalized_text(df["description"])
+    hashes = pd.util.hash_pandas_object(
+        pd.DataFrame({"day": days, "cents": _cents(df["amount"]), "text": text_codes}), index=False
+    ).to_numpy()
+
+    hash_codes = pd.factorize(hashes)[0].astype(np.int64)
+    sources = pd.Categorical(df["source"])
+    occurrence, _ = _runs(hash_codes * (len(sources.categories) + 1) + sources.codes + 1)
+
+    within, first = _runs(hash_codes * len(df) + occurrence)
+    repeated = within > 0
+    return pd.DataFrame({"row": dated[repeated], "matched_row": dated[first[repeated]]})
+
+
+def find_transfers(df: pd.DataFrame, window_days: int = TRANSFER_WINDOW_DAYS) -> pd.DataFrame:
+    """
+    Pairs of transfer-like rows with equal and opposite amounts at most
+    `window_days` apart, each row in at most one pair. Rows are swept in
+    (amount, date) order with merge_asof, nearest date first, instead of
+    comparing every outflow with every inflow.
+    Returns (outflow position, inflow position) pairs.
+    """
+    empty = pd.DataFrame({"out_row": np.empty(0, dtype=np.int64), "in_row": np.empty(0, dtype=np.int64)})
+    if len(df) == 0:
+        return empty
+
+    text_codes, texts = _normalized_text(df["description"])
+    transfer_text = np.array([bool(TRANSFER_PATTERN.search(t)) for t in texts], dtype=bool)
+    looks_like = np.where(text_codes >= 0, transfer_text[np.maximum(text_codes, 0)] if len(texts) else False, False)
+
+    dates = df["date"].to_numpy(dtype="datetime64[ns]")
+    cents = _cents(df["amount"])
+    candidates = pd.DataFrame({
+        "row": np.arange(len(df)),
+        "date": dates,
+        "cents": np.abs(cents),
+        "sign": np.sign(cents),
+    })[looks_like & ~np.isnat(dates) & (cents != 0)]
+
+    outflows = candidates[candidates["sign"] < 0].sort_values("date", kind="stable")
+    inflows = candidates[candidates["sign"] > 0].sort_values("date", kind="stable")
+    tolerance = pd.Timedelta(days=window_days)
+    pairs = []
+
+    for _ in range(MAX_TRANSFER_ROUNDS):
+        if outflows.empty or inflows.empty:
+            break
+
+        right = inflows[["row", "date", "cents"]].rename(columns={"row": "in_row"})
+        right["in_date"] = right["date"]
+        matched = pd.merge_asof(
+            outflows[["row", "date", "cents"]],
+            right,
+            on="date",
+            by="cents",
+            direction="nearest",
+            tolerance=tolerance,
+        ).dropna(subset=["in_row"])
+        if matched.empty:
+            break
+
+        # An inflow claimed by several outflows goes to the nearest one
+        matched["gap"] = (matched["date"] - matched["in_date"]).abs()
+        matched = matched.sort_values(["gap", "row"], kind="stable").drop_duplicates("in_row")
+        round_pairs = pd.DataFrame({"out_row": matched["row"].to_numpy(), "in_row": matched["in_row"].to_numpy(dtype=np.int64)})
+        pairs.append(round_pairs)
+
+        outflows = outflows[~outflows["row"].isin(round_pairs["out_row"])]
+        inflows = inflows[~inflows["row"].isin(round_pairs["in_row"])]
+
+    return pd.concat(pairs, ignore_index=True) if pairs else empty
+
+
+@instrumented("reconcile")
+def reconcile(df: pd.DataFrame, window_days: int = TRANSFER_WINDOW_DAYS, drop_duplicates: bool = True) -> tuple:
+    """
+    Drops duplicate transactions across uploaded files and both legs of
+    transfers between the user's own accounts, which would otherwise count
+    as income and expenses. Returns (reconciled frame, report): one report
+    row per removed transaction with the reason ("duplicate" or "transfer")
+    and the index label of the row it matched.
+
+    Two accounts can have genuinely separate charges on the same day, for
+    the same amount and merchant; with `drop_duplicates=False` such matches
+    are kept (for the user to confirm first) and only transfers are removed.
+    """
+    duplicates = find_duplicates(df)
+    unmatched = np.ones(len(df), dtype=bool)
+    unmatched[duplicates["row"].to_numpy()] = False
+    keep = unmatched.copy() if drop_duplicates else np.ones(len(df), dtype=bool)
+    if not drop_duplicates:
+        duplicates = duplicates.iloc[:0]
+
+    # Duplicates are left out either way, so a transfer is not matched
+    # against its own copy
+    transfers = find_transfers(df[unmatched], window_days)
+    kept_positions = np.flatnonzero(unmatched)
+    out_rows = kept_positions[transfers["out_row"].to_numpy()]
+    in_rows = kept_positions[transfers["in_row"].to_numpy()]
+    keep[out_rows] = False
+    keep[in_rows] = False
+
+    removed = np.concatenate([duplicates["row"].to_numpy(), out_rows, in_rows])
+    matched = np.concatenate([duplicates["matched_row"].to_numpy(), in_rows, out_rows])
+    reasons = np.repeat(["duplicate", "transfer"], [len(duplicates), 2 * len(transfers)])
+
+    order = np.argsort(removed, kind="stable")
+    removed, matched, reasons = removed[order], matched[order], reasons[order]
+
+    rows = df.iloc[removed]
+    report = pd.DataFrame({
+        "reason": reasons,
+        "matched_row": df.index[matched] if len(matched) else pd.Index([]),
+        "date": rows["date"].to_numpy(),
+        "description": rows["description"].to_numpy(),
+        "amount": rows["amount"].to_numpy(),
+        "category": rows["category"].to_numpy(),
+        "source": rows["source"].to_numpy() if "source" in df else None,
+    }, index=rows.index)[REPORT_COLUMNS]
+
+    return df[keep], report
+
+
+def summarize(report: pd.DataFrame) -> dict:
+    """
+    Rows and money removed per reason, for display.
+    """
+    amounts = pd.to_numeric(report["amount"], errors="coerce").fillna(0.0)
+    return {
+        reason: {
+            "rows": int((report["reason"] == reason).sum()),
+            "income_removed": round(float(amounts[(report["reason"] == reason) & (amounts > 0)].sum()), 2),
+            "expenses_removed": round(float(abs(amounts[(report["reason"] == reason) & (amounts < 0)].sum())), 2),
+        }
+        for reason in ("duplicate", "transfer")
+    }
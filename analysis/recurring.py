@@ -0,0 +1,157 @@
+# analysis/recurring.py
+import numpy as np
+import pandas as pd
+
+from analysis.arrays import amount_array, day_ordinals, group_sort, sorted_medians
+from analysis.categorize import normalize_description
+from monitoring.instrumentation import instrumented
+
+# name -> (nominal days between charges, tolerance in days, fewest charges);
+# posting dates move a day or two around weekends, so tolerances allow that
+PERIODS = {
+    "weekly": (7.0, 2.0, 4),
+    "biweekly": (14.0, 3.0, 3),
+    "monthly": (30.44, 4.0, 3),
+    "quarterly": (91.31, 8.0, 3),
+    "annual": (365.25, 15.0, 2),
+}
+
+# Calendar step to the next expected charge per period
+PERIOD_OFFSETS = {
+    "weekly": pd.DateOffset(days=7),
+    "biweekly": pd.DateOffset(days=14),
+    "monthly": pd.DateOffset(months=1),
+    "quarterly": pd.DateOffset(months=3),
+    "annual": pd.DateOffset(years=1),
+}
+
+# Charges per year per period, for the annualized cost (12 x a monthly
+# amount, not 365.25 / 30.44 x)
+CHARGES_PER_YEAR = {
+    "weekly": 52,
+    "biweekly": 26,
+    "monthly": 12,
+    "quarterly": 4,
+    "annual": 1,
+}
+
+# At least this share of a merchant's intervals must fit the period, and of
+# its amounts must be within AMOUNT_TOLERANCE of the typical amount
+MIN_REGULAR_SHARE = 0.75
+AMOUNT_TOLERANCE = 0.15
+
+# A series whose last charge is older than this many periods (before the
+# newest transaction) is reported as no longer active
+ACTIVE_PERIODS = 1.5
+
+RECURRING_COLUMNS = [
+    "merchant", "description", "category", "period", "amount", "charges",
+    "first_charge", "last_charge", "next_expected", "annualized_cost", "active",
+]
+
+
+def _merchant_codes(descriptions: pd.Series) -> tuple:
+    """
+    Code per row of its normalized merchant ("NETFLIX.COM 8123" -> "netflix
+    com"), -1 where nothing is left, and the merchant names; each distinct
+    description is normalized once.
+    """
+    descriptions = descriptions.astype("category")
+    names = np.array([normalize_description(d) for d in descriptions.cat.categories], dtype=object)
+    merchant_codes, merchants = pd.factorize(np.where(names == "", None, names))
+    codes = descriptions.cat.codes.to_numpy()
+    rows = np.where(codes >= 0, merchant_codes[np.maximum(codes, 0)] if len(names) else -1, -1)
+    return rows, np.asarray(merchants, dtype=object)
+
+
+def _empty() -> pd.DataFrame:
+    return pd.DataFrame({column: [] for column in RECURRING_COLUMNS})
+
+
+@instrumented("recurring")
+def detect_recurring(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Subscriptions and other regular payments: expenses grouped by
+    normalized merchant whose intervals fit a weekly, biweekly, monthly,
+    quarterly or annual cadence and whose amounts stay within tolerance.
+
+    One row per series with the typical amount (positive), number of
+    charges, first and last charge, the next expected charge, the cost per
+    year and whether it is still active, largest annual cost first.
+    Interval and amount statistics are computed for every merchant at once
+    after a single sort by (merchant, date).
+    """
+    amounts = amount_array(df["amount"])
+    days, undated = day_ordinals(df["date"])
+    merchant, merchants = _merchant_codes(df["description"])
+
+    rows = np.flatnonzero((amounts < 0) & ~undated & (merchant >= 0))
+    if len(rows) == 0:
+        return _empty()
+
+    span = days[rows].max() - days[rows].min() + 1
+    rows = rows[np.argsort(merchant[rows] * span + (days[rows] - days[rows].min()), kind="stable")]
+    groups, charge_days, charges = merchant[rows], days[rows], -amounts[rows]
+    n_groups = len(merchants)
+
+    counts = np.bincount(groups, minlength=n_groups)
+    last_row = rows[np.cumsum(counts)[counts > 0] - 1]
+    first_day = charge_days[(np.cumsum(counts) - counts)[counts > 0]]
+
+    # Days between consecutive charges of the same merchant
+    same = groups[1:] == groups[:-1]
+    interval_groups = groups[1:][same]
+    intervals = (charge_days[1:] - charge_days[:-1])[same].astype(np.float64)
+    interval_counts = np.bincount(interval_groups, minlength=n_groups)
+    median_interval = sorted_medians(intervals[group_sort(interval_groups, intervals)], interval_counts)
+    median_amount = sorted_medians(charges[group_sort(groups, charges)], counts)
+
+    amount_fits = np.abs(charges - median_amount[groups]) <= AMOUNT_TOLERANCE * median_amount[groups]
+    amount_share = np.bincount(groups, weights=amount_fits, minlength=n_groups) / np.maximum(counts, 1)
+
+    period = np.full(n_groups, -1)
+    for i, (days_apart, tolerance, min_charges) in enumerate(PERIODS.values()):
+        fits = np.abs(intervals - days_apart) <= tolerance
+        share = np.bincount(interval_groups, weights=fits, minlength=n_groups) / np.maximum(interval_counts, 1)
+        candidate = (
+            (period < 0)
+            & (np.abs(median_interval - days_apart) <= tolerance)
+            & (share >= MIN_REGULAR_SHARE)
+            & (counts >= min_charges)
+            & (amount_share >= MIN_REGULAR_SHARE)
+        )
+        period[candidate] = i
+
+    present = counts > 0
+    found = period[present] >= 0
+    if not found.any():
+        return _empty()
+
+    names = np.array(list(PERIODS), dtype=object)[period[present][found]]
+    nominal = np.array([PERIODS[name][0] for name in names])
+    typical = median_amount[present][found]
+    last = df.iloc[last_row[found]]
+    last_dates = pd.DatetimeIndex(days[last_row[found]].astype("datetime64[D]"))
+    newest = days[rows].max()
+
+    next_expected = pd.Series(pd.NaT, index=range(len(names)), dtype="datetime64[ns]")
+    for name, offset in PERIOD_OFFSETS.items():
+        selected = names == name
+        if selected.any():
+            next_expected[selected] = (last_dates[selected] + offset).to_numpy()
+
+    result = pd.DataFrame({
+        "merchant": merchants[present][found],
+        "description": last["description"].astype(str).to_numpy(),
+        "category": last["category"].astype(str).to_numpy(),
+        "period": names,
+        "amount": np.round(typical, 2),
+        "charges": counts[present][found],
+        "first_charge": first_day[found].astype("datetime64[D]").astype("datetime64[ns]"),
+        "last_charge": last_dates,
+        "next_expected": next_expected.to_numpy(),
+        "annualized_cost": np.round(typical * np.array([CHARGES_PER_YEAR[name] for name in names]), 2),
+        "active": days[last_row[found]] + ACTIVE_PERIODS * nominal >= newest,
+    })[RECURRING_COLUMNS]
+
+    return result.sort_values(["active", "annualized_cost"], ascending=False, kind="stable").reset_index(drop=True)
@@ -0,0 +1,126 @@
+# analysis/rollups.py
+import numpy as np
+import pandas as pd
+
+from analysis.arrays import amount_array, day_ordinals
+from monitoring.instrumentation import instrumented
+
+# UI label -> pandas period frequency
+GRANULARITIES = {
+    "Daily": "D",
+    "Weekly": "W",
+    "Monthly": "M",
+    "Quarterly": "Q",
+    "Yearly": "Y",
+}
+
+CUBE_COLUMNS = ["date", "category", "sign", "sum", "count", "min", "max"]
+
+
+@instrumented("rollups.cube")
+def build_cube(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Day-level aggregate of a normalized frame: one row per (date, category,
+    sign) that has transactions, with the sum, count, min and max of their
+    amounts. Sign is -1 for expenses, 1 for income and 0 for zero amounts.
+    Rows without a date are left out, as in the monthly trend.
+
+    Every view below is derived from this cube, so it costs O(days x
+    categories) instead of a pass over the transactions.
+    """
+    amounts = amount_array(df["amount"])
+    days, undated = day_ordinals(df["date"])
+    categories = pd.Categorical(df["category"])
+    codes = categories.codes.astype(np.int64)
+
+    keep = ~undated & (codes >= 0)
+    amounts, days, codes = amounts[keep], days[keep], codes[keep]
+    if len(amounts) == 0:
+        return pd.DataFrame({
+            "date": np.empty(0, dtype="datetime64[ns]"),
+            "category": pd.Categorical([], categories=categories.categories),
+            "sign": np.empty(0, dtype=np.int8),
+            "sum": np.empty(0),
+            "count": np.empty(0, dtype=np.int64),
+            "min": np.empty(0),
+            "max": np.empty(0),
+        })[CUBE_COLUMNS]
+
+    signs = np.sign(amounts).astype(np.int64)
+    n_categories = len(categories.categories)
+    first = days.min()
+    keys = ((days - first) * n_categories + codes) * 3 + (signs + 1)
+
+    # One sort, then every aggregate is a reduction over runs of equal keys
+    order = np.argsort(keys, kind="stable")
+    keys, values = keys[order], amounts[order]
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    cell = keys[starts]
+
+    return pd.DataFrame({
+        "date": (first + cell // (3 * n_categories)).astype("datetime64[D]").astype("datetime64[ns]"),
+        "category": pd.Categorical.from_codes((cell // 3) % n_categories, categories=categories.categories),
+        "sign": (cell % 3 - 1).astype(np.int8),
+        "sum": np.add.reduceat(values, starts),
+        "count": np.diff(np.r_[starts, len(keys)]),
+        "min": np.minimum.reduceat(values, starts),
+        "max": np.maximum.reduceat(values, starts),
+    })[CUBE_COLUMNS]
+
+
+def _periods(cube: pd.DataFrame, freq: str) -> pd.PeriodIndex:
+    """
+    The period of every cube row, converting each distinct day once.
+    """
+    codes, days = pd.factorize(cube["date"], sort=True)
+    return pd.DatetimeIndex(days).to_period(freq)[codes]
+
+
+def rollup(cube: pd.DataFrame, freq: str = "M", by_category: bool = False) -> pd.DataFrame:
+    """
+    Income, expenses (positive), net, transaction count, smallest and
+    largest amount per period (and category, if `by_category`).
+    """
+    signed = cube["sum"].to_numpy()
+    frame = pd.DataFrame({
+        "period": _periods(cube, freq),
+        "category": cube["category"],
+        "income": np.where(cube["sign"] > 0, signed, 0.0),
+        "expenses": np.where(cube["sign"] < 0, -signed, 0.0),
+        "net": signed,
+        "count": cube["count"],
+        "min": cube["min"],
+        "max": cube["max"],
+    })
+
+    keys = ["period", "category"] if by_category else ["period"]
+    return frame.groupby(keys, observed=True).agg(
+        income=("income", "sum"),
+        expenses=("expenses", "sum"),
+        net=("net", "sum"),
+        count=("count", "sum"),
+        min=("min", "min"),
+        max=("max", "max"),
+    )
+
+
+def trend(cube: pd.DataFrame, freq: str = "M") -> pd.Series:
+    """
+    Net amount per period; for "M" this equals the metrics' monthly_trend.
+    """
+    net = rollup(cube, freq)["net"]
+    return net.rename("amount").rename_axis("parsed_date")
+
+
+def category_trend(cube: pd.DataFrame, freq: str = "M") -> pd.DataFrame:
+    """
+    Expenses per period (rows) and category (columns).
+    """
+    return rollup(cube, freq, by_category=True)["expenses"].unstack("category", fill_value=0.0)
+
+
+def running_balance(cube: pd.DataFrame, freq: str = "D", opening: float = 0.0) -> pd.Series:
+    """
+    Balance at the end of every period that has transactions, starting from `opening`.
+    """
+    return (opening + trend(cube, freq).cumsum()).rename("balance")
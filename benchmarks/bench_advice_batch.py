@@ -0,0 +1,131 @@
+"""
+Benchmark for llm.batch_advice against a local mock of the chat
+completions endpoint (no network, no API key needed).
+
+The mock streams a short reply after --latency seconds and fails a share
+of requests (--fail-rate) with 429 or 503, so retries and backoff are
+exercised. Compares the batch against calling generate_ai_advice one
+metrics dict at a time.
+
+    python -m benchmarks.bench_advice_batch --items 200 --concurrency 8 --rate 50
+"""
+import argparse
+import json
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from llm import batch_advice, llm_client
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    latency = 0.2
+    fail_rate = 0.1
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        time.sleep(self.latency * random.uniform(0.5, 1.5))
+
+        if random.random() < self.fail_rate:
+            status = random.choice((429, 503))
+            body = b'{"error": "try again"}'
+            self.send_response(status)
+            if status == 429:
+                self.send_header("Retry-After", "0.1")
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+
+        events = [
+            f"data: {json.dumps({'choices': [{'delta': {'content': word}}]})}\n\n"
+            for word in ("Spend ", "less ", "on ", "dining.")
+        ]
+        body = ("".join(events) + "data: [DONE]\n\n").encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_mock(latency: float, fail_rate: float):
+    """
+    Starts the mock endpoint on a free port; returns (server, URL).
+    """
+    handler = type("Handler", (MockHandler,), {"latency": latency, "fail_rate": fail_rate})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}/v1/chat/completions"
+
+
+def make_metrics(n: int, duplicates: float, seed: int = 0) -> list:
+    """
+    Portfolio metrics dicts; a `duplicates` share repeats an earlier one.
+    """
+    rng = random.Random(seed)
+    items = []
+    for _ in range(n):
+        if items and rng.random() < duplicates:
+            items.append(rng.choice(items))
+            continue
+        income = rng.uniform(2000, 20000)
+        expenses = rng.uniform(1000, income)
+        items.append({
+            "total_income": round(income, 2),
+            "total_expenses": round(expenses, 2),
+            "net_savings": round(income - expenses, 2),
+            "savings_rate": round((income - expenses) / income * 100, 2),
+        })
+    return items
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=200)
+    parser.add_argument("--duplicates", type=float, default=0.1, help="share of items repeating an earlier one")
+    parser.add_argument("--latency", type=float, default=0.2, help="mock reply time in seconds")
+    parser.add_argument("--fail-rate", type=float, default=0.1)
+    parser.add_argument("--concurrency", type=int, default=batch_advice.DEFAULT_CONCURRENCY)
+    parser.add_argument("--rate", type=float, default=50.0)
+    parser.add_argument("--serial-items", type=int, default=20, help="items for the one-at-a-time comparison")
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault("OPENROUTER_API_KEY", "mock")
+    server, url = start_mock(args.latency, args.fail_rate)
+    metrics = make_metrics(args.items, args.duplicates)
+
+    try:
+        llm_client._cache.clear()
+        start = time.perf_counter()
+        serial_ok = 0
+        for item in metrics[:args.serial_items]:
+            try:
+                llm_client.generate_ai_advice(item, api_url=url)
+                serial_ok += 1
+            except Exception:
+                pass
+        serial = time.perf_counter() - start
+        print(f"serial  {args.serial_items:>5} items  {serial:7.2f} s  {args.serial_items / serial:7.2f} items/s  {serial_ok} ok")
+
+        llm_client._cache.clear()
+        _, summary = batch_advice.generate_advice_batch(metrics, api_url=url, concurrency=args.concurrency, rate=args.rate)
+        print(
+            f"batch   {summary['items']:>5} items  {summary['seconds']:7.2f} s  {summary['items_per_s']:7.2f} items/s  "
+            f"{summary['ok']} ok, {summary['failed']} failed, {summary['requests']} requests, {summary['retries']} retries, "
+            f"p50 {summary['p50_latency_s']} s, p95 {summary['p95_latency_s']} s"
+        )
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""
+Benchmark for analysis.categorize on uncategorized rows with many
+distinct merchant descriptions (card-processor style, "Shell #123").
+
+Reports time per call and how many descriptions were actually classified:
+it should track the number of distinct merchants, not rows.
+
+    python -m benchmarks.bench_categorize --rows 1000000 --merchants 5000
+"""
+import argparse
+import time
+
+import numpy as np
+
+from analysis.categorize import categorize, classify_description
+from benchmarks.datagen import MERCHANTS
+from parsers.schema import from_columns
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--merchants", type=int, default=5000)
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(0)
+    names = np.array([f"{MERCHANTS[i % len(MERCHANTS)]} #{i}" for i in range(args.merchants)], dtype=object)
+    df = from_columns(
+        description=names[rng.integers(0, len(names), args.rows)],
+        amount=-np.round(rng.lognormal(3.0, 1.0, args.rows), 2),
+    )
+
+    classify_description.cache_clear()
+    for label in ("cold", "warm"):
+        start = time.perf_counter()
+        out = categorize(df)
+        elapsed = time.perf_counter() - start
+        info = classify_description.cache_info()
+        print(
+            f"{label:>5}  {elapsed:7.3f} s  {args.rows:,} rows  {info.misses:,} classified  "
+            f"{(out['category'] != 'Uncategorized').mean():6.1%} categorized"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Benchmark for analysis.forecast: 1,000 random what-if scenarios over 5
+years of history, projected in one broadcast, against applying them one
+scenario at a time in a Python loop.
+
+    python -m benchmarks.bench_forecast --rows 1000000 --scenarios 1000 --horizons 12,60
+"""
+import argparse
+import time
+
+import numpy as np
+
+from analysis import forecast
+from analysis.rollups import build_cube
+from benchmarks.datagen import CATEGORIES, make_ledger
+from parsers.schema import from_columns
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - start, result
+
+
+def make_scenarios(n: int, seed: int = 0) -> list:
+    """
+    `n` scenarios, each cutting or raising spending in one to three
+    categories from a random month, some with a new monthly expense.
+    """
+    rng = np.random.default_rng(seed)
+    scenarios = []
+    for i in range(n):
+        changes = [
+            {"category": str(category), "scale": float(rng.uniform(0.5, 1.5)), "start": int(rng.integers(0, 12))}
+            for category in rng.choice(CATEGORIES, rng.integers(1, 4), replace=False)
+        ]
+        if rng.random() < 0.3:
+            changes.append({"category": "New expense", "shift": -float(rng.integers(100, 2000)), "start": int(rng.integers(0, 12))})
+        scenarios.append({"name": f"Scenario {i + 1}", "changes": changes})
+    return scenarios
+
+
+def looped(income, expenses, scale, shift, start):
+    """
+    The same projection, one scenario at a time.
+    """
+    return np.stack([
+        forecast.project(income, expenses, scale[i:i + 1], shift[i:i + 1], start[i:i + 1])[0]
+        for i in range(len(scale))
+    ])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--scenarios", type=int, default=1000)
+    parser.add_argument("--horizons", default="12,60")
+    args = parser.parse_args(argv)
+
+    ledger = make_ledger(args.rows)
+    df = from_columns(**{name: ledger[name] for name in ledger.columns})
+    cube = build_cube(df)
+    scenarios = make_scenarios(args.scenarios)
+
+    history_time, (months, categories, income, expenses) = timed(forecast.monthly_history, cube)
+    print(f"history  {len(months)} months x {len(categories)} categories in {history_time * 1e3:7.1f} ms")
+
+    for horizon in (int(value) for value in args.horizons.split(",")):
+        _, baseline = forecast.seasonal_baseline(months, np.hstack([income, expenses]), horizon)
+        baseline = np.maximum(baseline, 0.0)
+        n = income.shape[1]
+        _, _, scale, shift, start = forecast.scenario_arrays(scenarios, categories)
+
+        batched_time, batched = timed(forecast.project, baseline[:, :n], baseline[:, n:], scale, shift, start)
+        loop_time, loop = timed(looped, baseline[:, :n], baseline[:, n:], scale, shift, start)
+        total_time, result = timed(forecast.forecast, cube, scenarios, horizon)
+        assert np.allclose(batched, loop)
+
+        print(
+            f"{horizon:>3} months  {len(scenarios):,} scenarios  batched {batched_time * 1e3:6.1f} ms  "
+            f"loop {loop_time * 1e3:7.1f} ms  end to end {total_time * 1e3:6.1f} ms  "
+            f"({result['balance'].shape[0]} x {result['balance'].shape[1]} balances)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""
+Memory report for the compact transaction table built by parsers.schema.
+
+"before" is the object-dtype frame the parsers used to emit (date strings
+or the "Unknown" sentinel, one Python string per description/category);
+"after" is parsers.schema.from_columns on the same columns.
+
+    python -m benchmarks.bench_memory --sizes 100000,1000000
+"""
+import argparse
+
+from benchmarks.datagen import make_ledger
+from parsers.schema import from_columns, memory_bytes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="100000,1000000")
+    args = parser.parse_args(argv)
+
+    print(f"{'rows':>12} {'source':>8} {'before MB':>10} {'after MB':>9} {'ratio':>6}")
+    for size in (int(s) for s in args.sizes.split(",")):
+        ledger = make_ledger(size)
+
+        # CSV/Excel style input: real dates; PDF/text style: no dates at all
+        for label, dates in (("dated", ledger["date"]), ("undated", None)):
+            before = ledger.assign(date=ledger["date"] if dates is not None else "Unknown")
+            after = from_columns(
+                date=dates,
+                description=ledger["description"],
+                amount=ledger["amount"],
+                category=ledger["category"],
+            )
+            before_mb = memory_bytes(before) / 1e6
+            after_mb = memory_bytes(after) / 1e6
+            print(f"{size:>12,} {label:>8} {before_mb:>10.1f} {after_mb:>9.1f} {before_mb / after_mb:>5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
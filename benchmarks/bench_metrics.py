@@ -0,0 +1,99 @@
+"""
+Benchmark for analysis.finance_metrics.compute_financial_metrics.
+
+Compares the array kernel against the original pandas implementation
+(kept below as reference_metrics) and checks both return the same values.
+
+    python -m benchmarks.bench_metrics --sizes 10000,1000000,10000000
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from analysis.finance_metrics import compute_financial_metrics
+from benchmarks.datagen import make_ledger
+
+
+def reference_metrics(df: pd.DataFrame) -> dict:
+    """
+    The original compute_financial_metrics, used as the baseline.
+    """
+    df = df.copy()
+    df["amount"] = pd.to_numeric(df["amount"], errors="coerce").fillna(0)
+
+    income = df[df["amount"] > 0]["amount"].sum()
+    expenses = abs(df[df["amount"] < 0]["amount"].sum())
+    net_savings = income - expenses
+    savings_rate = (net_savings / income * 100) if income > 0 else 0
+
+    category_spend = (
+        df[df["amount"] < 0]
+        .groupby("category")["amount"]
+        .sum()
+        .abs()
+        .sort_values(ascending=False)
+    )
+
+    df["parsed_date"] = pd.to_datetime(df["date"], errors="coerce")
+    monthly_trend = (
+        df.dropna(subset=["parsed_date"])
+        .groupby(df["parsed_date"].dt.to_period("M"))["amount"]
+        .sum()
+    )
+
+    q1 = df["amount"].quantile(0.25)
+    q3 = df["amount"].quantile(0.75)
+    iqr = q3 - q1
+    anomalies = df[(df["amount"] < q1 - 1.5 * iqr) | (df["amount"] > q3 + 1.5 * iqr)]
+
+    return {
+        "total_income": round(income, 2),
+        "total_expenses": round(expenses, 2),
+        "net_savings": round(net_savings, 2),
+        "savings_rate": round(savings_rate, 2),
+        "category_spend": category_spend,
+        "monthly_trend": monthly_trend,
+        "anomalies": anomalies
+    }
+
+
+def check_same(expected: dict, actual: dict):
+    """
+    Raises AssertionError if the two metric dicts disagree.
+    """
+    for key in ("total_income", "total_expenses", "net_savings", "savings_rate"):
+        assert np.isclose(expected[key], actual[key]), key
+
+    pd.testing.assert_series_equal(expected["category_spend"], actual["category_spend"], check_exact=False)
+    pd.testing.assert_series_equal(expected["monthly_trend"], actual["monthly_trend"], check_exact=False)
+    assert expected["anomalies"].index.equals(actual["anomalies"].index), "anomalies"
+
+
+def best_of(fn, df, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(df)
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="10000,1000000,10000000")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    print(f"{'rows':>12} {'reference s':>12} {'kernel s':>10} {'speedup':>8}")
+    for size in (int(s) for s in args.sizes.split(",")):
+        df = make_ledger(size)
+        ref_time, expected = best_of(reference_metrics, df, args.repeat)
+        new_time, actual = best_of(compute_financial_metrics, df, args.repeat)
+        check_same(expected, actual)
+        print(f"{size:>12,} {ref_time:>12.3f} {new_time:>10.3f} {ref_time / new_time:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Benchmark for parsers.multi.parse_uploads: the same set of monthly CSV
+statements parsed one after another (workers=1) and in a process pool.
+The pool should approach the slowest single file rather than the sum.
+
+Each run uses freshly generated statements so the parse cache never hits.
+
+    python -m benchmarks.bench_multi --files 12 --rows 200000
+"""
+import argparse
+import io
+import time
+
+from benchmarks.datagen import make_ledger
+from parsers.multi import parse_uploads
+
+
+class Upload(io.BytesIO):
+    """
+    Minimal stand-in for Streamlit's UploadedFile.
+    """
+
+    def __init__(self, name: str, data: bytes):
+        super().__init__(data)
+        self.name = name
+
+
+def make_uploads(n_files: int, rows: int, seed: int) -> list:
+    return [
+        Upload(f"statement_{i:02d}.csv", make_ledger(rows, seed=seed * 1000 + i).to_csv(index=False).encode())
+        for i in range(n_files)
+    ]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=12)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    for seed, (label, workers) in enumerate((("serial", 1), ("pool", args.workers)), start=1):
+        uploads = make_uploads(args.files, args.rows, seed)
+
+        start = time.perf_counter()
+        df, results = parse_uploads(uploads, workers=workers)
+        elapsed = time.perf_counter() - start
+
+        slowest = max(result["seconds"] for result in results)
+        total = sum(result["seconds"] for result in results)
+        print(
+            f"{label:>7}  {elapsed:7.3f} s wall  slowest file {slowest:6.3f} s  "
+            f"sum of files {total:7.3f} s  {len(df):>10,} rows"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Benchmark for pipeline.presentation: bytes sent to the browser, and the
+time to serialize them, for the preview table, charts and anomaly table
+as the ledger grows. "full" is the previous behaviour (whole frame, every
+anomaly, every category and month); "bounded" is what the app sends now.
+Each size is run with the generator's few merchants and again with a
+distinct description per row ("unique"), where a page that kept the
+whole categorical dictionary would send every description.
+
+    python -m benchmarks.bench_presentation --sizes 10000,100000,1000000,2000000
+"""
+import argparse
+import time
+
+import numpy as np
+
+from analysis.finance_metrics import compute_financial_metrics
+from benchmarks.datagen import make_ledger
+from parsers.schema import from_columns
+from pipeline import presentation, stages
+
+
+def send(values: list) -> tuple:
+    """
+    (seconds, bytes) to serialize the widget payloads.
+    """
+    start = time.perf_counter()
+    size = sum(presentation.payload_bytes(value) for value in values)
+    return time.perf_counter() - start, size
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="10000,100000,1000000,2000000")
+    args = parser.parse_args(argv)
+
+    for size in (int(value) for value in args.sizes.split(",")):
+        for label in ("merchants", "unique"):
+            run(size, label)
+
+
+def run(size: int, label: str):
+    ledger = make_ledger(size)
+    if label == "unique":
+        ledger["description"] = ledger["description"] + " #" + np.arange(size).astype(str).astype(object)
+    df = from_columns(**{name: ledger[name] for name in ledger.columns})
+    metrics = compute_financial_metrics(df)
+
+    full_time, full_bytes = send([df, metrics["category_spend"], metrics["monthly_trend"], metrics["anomalies"]])
+
+    start = time.perf_counter()
+    charts = stages._charts(metrics)
+    bounded = [presentation.page(df, 1), charts["category_spend"], charts["monthly_trend"], charts["anomalies"]]
+    prepare = time.perf_counter() - start
+    bounded_time, bounded_bytes = send(bounded)
+
+    print(
+        f"{size:>9,} rows {label:>9}  full {full_bytes / 1e6:9.2f} MB in {full_time:7.3f} s  "
+        f"bounded {bounded_bytes / 1e6:7.3f} MB in {prepare + bounded_time:7.3f} s"
+    )
+
+if __name__ == "__main__":
+    main()
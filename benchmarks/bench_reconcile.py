@@ -0,0 +1,90 @@
+"""
+Benchmark for analysis.reconcile on overlapping statements.
+
+Builds a checking and a card statement from a synthetic ledger, repeats
+an overlapping slice of checking in the card file with the descriptions
+re-cased (as another bank would export them), and adds transfer pairs
+between the two. Reports time and how many injected duplicates and
+transfer legs were found. False positives are ledger rows that happen to
+share the day, amount and merchant with a row of the other account and
+are removed as duplicates; the app asks before removing those matches.
+
+    python -m benchmarks.bench_reconcile --rows 1000000 --overlap 0.05 --transfers 5000
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from analysis.reconcile import reconcile
+from benchmarks.datagen import make_ledger
+from parsers.schema import from_columns
+
+
+def make_statements(n_rows: int, overlap: float, transfers: int, seed: int = 0) -> tuple:
+    """
+    (frame with a `source` column, positions of injected duplicates,
+    positions of injected transfer legs).
+    """
+    rng = np.random.default_rng(seed)
+    ledger = make_ledger(n_rows, seed=seed)
+    ledger["source"] = np.where(rng.random(n_rows) < 0.5, "checking.csv", "card.csv")
+
+    checking = np.flatnonzero(ledger["source"] == "checking.csv")
+    repeated = ledger.iloc[checking[:int(len(checking) * overlap)]].assign(source="card.csv")
+    repeated["description"] = repeated["description"].str.upper()
+
+    days = np.datetime64("2019-01-01") + rng.integers(0, 5 * 365, transfers)
+    lag = rng.integers(0, 3, transfers)
+    amounts = np.round(rng.uniform(50, 2000, transfers), 2)
+    outgoing = pd.DataFrame({
+        "date": days.astype(str).astype(object),
+        "description": "Online Transfer to Card",
+        "amount": -amounts,
+        "category": "Transfer",
+        "source": "checking.csv",
+    })
+    incoming = pd.DataFrame({
+        "date": (days + lag).astype(str).astype(object),
+        "description": "PAYMENT THANK YOU",
+        "amount": amounts,
+        "category": "Transfer",
+        "source": "card.csv",
+    })
+
+    frame = pd.concat([ledger, repeated, outgoing, incoming], ignore_index=True)
+    df = from_columns(**{name: frame[name] for name in ("date", "description", "amount", "category")})
+    df["source"] = pd.Categorical(frame["source"])
+
+    duplicates = np.arange(n_rows, n_rows + len(repeated))
+    legs = np.arange(n_rows + len(repeated), len(frame))
+    return df, duplicates, legs
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--overlap", type=float, default=0.05, help="share of checking repeated in the card file")
+    parser.add_argument("--transfers", type=int, default=5000)
+    args = parser.parse_args(argv)
+
+    df, duplicates, legs = make_statements(args.rows, args.overlap, args.transfers)
+
+    start = time.perf_counter()
+    _, report = reconcile(df)
+    elapsed = time.perf_counter() - start
+
+    removed = {reason: set(report.index[report["reason"] == reason]) for reason in ("duplicate", "transfer")}
+    found_duplicates = len(removed["duplicate"] & set(duplicates))
+    found_legs = len(removed["transfer"] & set(legs))
+    false_positives = len(report) - found_duplicates - found_legs
+    print(
+        f"{len(df):>9,} rows  {elapsed:7.3f} s  duplicates {found_duplicates:,}/{len(duplicates):,}  "
+        f"transfer legs {found_legs:,}/{len(legs):,}  false positives {false_positives:,} "
+        f"({false_positives / len(df):.2%} of rows)"
+    )
+
+
+if __name__ == "__main__":
+    main()
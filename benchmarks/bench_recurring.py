@@ -0,0 +1,80 @@
+"""
+Benchmark for analysis.recurring: detection time on a synthetic ledger
+with injected weekly, monthly and annual subscriptions (with jittered
+dates and amounts), and how many of them are found.
+
+    python -m benchmarks.bench_recurring --rows 1000000 --subscriptions 200
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from analysis.recurring import detect_recurring
+from benchmarks.datagen import make_ledger
+from parsers.schema import from_columns
+
+# period -> (days between charges, typical amount)
+INJECTED = {
+    "weekly": (7, 12.0),
+    "monthly": (30, 15.0),
+    "annual": (365, 120.0),
+}
+
+
+def make_subscriptions(n: int, seed: int = 0, start: str = "2019-01-01", days: int = 5 * 365) -> pd.DataFrame:
+    """
+    `n` subscriptions named "SUBSCRIPTION <letters> <ref>", cycling through
+    the periods above, each charged from a random start to the end of the
+    ledger with +-1 day and +-3% noise.
+    """
+    rng = np.random.default_rng(seed)
+    frames = []
+    for i in range(n):
+        period = list(INJECTED)[i % len(INJECTED)]
+        step, amount = INJECTED[period]
+        first = rng.integers(0, step)
+        offsets = np.arange(first, days, step) + rng.integers(-1, 2, len(np.arange(first, days, step)))
+        offsets = np.clip(offsets, 0, days - 1)
+        name = "".join(chr(ord("a") + int(d)) for d in f"{i:04d}")
+        frames.append(pd.DataFrame({
+            "date": (np.datetime64(start) + offsets).astype(str).astype(object),
+            "description": [f"SUBSCRIPTION {name.upper()} {ref}" for ref in rng.integers(1000, 9999, len(offsets))],
+            "amount": -np.round(amount * (1 + rng.uniform(-0.03, 0.03, len(offsets))), 2),
+            "category": "Entertainment",
+            "period": period,
+        }))
+    return pd.concat(frames, ignore_index=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--subscriptions", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    subscriptions = make_subscriptions(args.subscriptions)
+    ledger = pd.concat([make_ledger(args.rows - len(subscriptions)), subscriptions.drop(columns="period")], ignore_index=True)
+    df = from_columns(**{name: ledger[name] for name in ledger.columns})
+
+    times = []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        found = detect_recurring(df)
+        times.append(time.perf_counter() - start)
+
+    expected = subscriptions.groupby(subscriptions["description"].str.rsplit(" ", n=1).str[0].str.lower())["period"].first()
+    hits = found.set_index("merchant")["period"].reindex(expected.index)
+    recall = (hits == expected).mean()
+    false_positives = (~found["merchant"].isin(expected.index)).sum()
+
+    print(
+        f"{len(df):>9,} rows  best {min(times):6.3f} s  found {len(found)} series  "
+        f"recall {recall:.1%} ({(hits == expected).sum()}/{len(expected)})  other series {false_positives}"
+    )
+
+
+if __name__ == "__main__":
+    main()
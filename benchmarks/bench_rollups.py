@@ -0,0 +1,51 @@
+"""
+Benchmark for analysis.rollups: building the day cube once, then each
+granularity from the cube, against grouping the raw transactions again
+for every granularity.
+
+    python -m benchmarks.bench_rollups --rows 1000000
+"""
+import argparse
+import time
+
+from analysis import rollups
+from benchmarks.datagen import make_ledger
+from parsers.schema import from_columns
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - start, result
+
+
+def raw_trend(df, freq: str):
+    """
+    Net amount per period straight from the transactions.
+    """
+    return df.groupby(df["date"].dt.to_period(freq))["amount"].sum()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args(argv)
+
+    ledger = make_ledger(args.rows)
+    df = from_columns(**{name: ledger[name] for name in ledger.columns})
+
+    build, cube = timed(rollups.build_cube, df)
+    print(f"cube     {args.rows:>9,} rows -> {len(cube):,} cells in {build:7.3f} s")
+
+    for label, freq in rollups.GRANULARITIES.items():
+        raw_time, _ = timed(raw_trend, df, freq)
+        cube_time, _ = timed(rollups.trend, cube, freq)
+        balance_time, _ = timed(rollups.running_balance, cube, freq)
+        print(
+            f"{label:>9}  raw groupby {raw_time * 1e3:8.1f} ms  from cube {cube_time * 1e3:6.1f} ms  "
+            f"running balance {balance_time * 1e3:6.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
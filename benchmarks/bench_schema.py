@@ -0,0 +1,91 @@
+"""
+Micro-benchmark for parsers.schema.
+
+  wide: header mapping on a frame with many columns, first call vs cached
+  long: normalize_frame on a long frame of plain and currency-formatted
+        amounts, against the original per-parser normalization
+
+    python -m benchmarks.bench_schema --rows 1000000 --columns 500
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.datagen import make_ledger
+from parsers import schema
+
+
+def reference_normalize(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    The normalization parse_csv/parse_excel used to carry inline.
+    """
+    df = df.copy()
+    df.columns = [c.strip().lower() for c in df.columns]
+
+    column_map = {}
+    for col in df.columns:
+        if "date" in col:
+            column_map[col] = "date"
+        elif "desc" in col or "merchant" in col or "detail" in col:
+            column_map[col] = "description"
+        elif "amount" in col or "amt" in col or "value" in col:
+            column_map[col] = "amount"
+        elif "category" in col or "type" in col:
+            column_map[col] = "category"
+
+    df = df.rename(columns=column_map)
+    if "category" not in df:
+        df["category"] = "Uncategorized"
+
+    df = df[["date", "description", "amount", "category"]]
+    df["amount"] = pd.to_numeric(df["amount"], errors="coerce").fillna(0)
+    return df
+
+
+def format_currency(amounts: np.ndarray) -> np.ndarray:
+    """
+    Renders amounts the way bank exports do: "$1,234.50" and "(45.00)".
+    """
+    text = np.char.mod("%.2f", np.abs(amounts))
+    text = np.char.add("$", text)
+    return np.where(amounts < 0, np.char.add(np.char.add("(", text), ")"), text).astype(object)
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - start, result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--columns", type=int, default=500)
+    args = parser.parse_args(argv)
+
+    # Wide: many unrelated columns around the four we need
+    headers = [f"Extra Field {i}" for i in range(args.columns)] + ["Posting Date", "Merchant", "Amount", "Category"]
+    schema._map_signature.cache_clear()
+    cold, _ = timed(schema.map_columns, headers)
+    warm, _ = timed(schema.map_columns, headers)
+    print(f"wide  {len(headers):>9,} columns  map_columns cold {cold * 1e3:8.3f} ms  cached {warm * 1e3:8.3f} ms")
+
+    # Long: plain float amounts, then currency-formatted strings
+    ledger = make_ledger(args.rows).rename(columns={"date": "Posting Date", "description": "Merchant"})
+    formatted = ledger.assign(amount=format_currency(ledger["amount"].to_numpy()))
+
+    for label, df in (("plain", ledger), ("currency", formatted)):
+        ref_time, ref = timed(reference_normalize, df)
+        new_time, new = timed(schema.normalize_frame, df)
+        parsed = np.isclose(new["amount"], ledger["amount"]).mean()
+        print(
+            f"long  {args.rows:>9,} rows {label:>8}  reference {ref_time:7.3f} s  "
+            f"schema {new_time:7.3f} s  amounts parsed correctly {parsed:6.1%} "
+            f"(reference {np.isclose(ref['amount'], ledger['amount']).mean():6.1%})"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Benchmark for storage.transactions on years of history.
+
+Ingests a synthetic ledger as monthly statements, then times metrics()
+for one quarter of one category and for the whole history, against
+loading every row back with query() and running compute_financial_metrics.
+
+    python -m benchmarks.bench_store --rows 1000000
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from analysis.finance_metrics import compute_financial_metrics
+from benchmarks.datagen import make_ledger
+from parsers.schema import from_columns
+from storage.transactions import TransactionStore
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args(argv)
+
+    ledger = make_ledger(args.rows)
+    df = from_columns(**{name: ledger[name] for name in ledger.columns})
+    months = df["date"].to_numpy().astype("datetime64[M]")
+
+    with tempfile.TemporaryDirectory() as directory:
+        store = TransactionStore(os.path.join(directory, "transactions.sqlite"))
+
+        start = time.perf_counter()
+        for month in np.unique(months):
+            store.add_frame(df[months == month], f"statement-{month}")
+        ingest = time.perf_counter() - start
+        size = os.path.getsize(store.path) / 1e6
+        print(f"ingest   {args.rows:>9,} rows  {ingest:7.3f} s  ({args.rows / ingest:,.0f} rows/s, {size:.0f} MB on disk)")
+
+        cases = {
+            "quarter": dict(start="2021-04-01", end="2021-07-01", categories=["Groceries"]),
+            "all": {},
+        }
+        for label, filters in cases.items():
+            store_time, metrics = timed(store.metrics, **filters)
+            load_time, rows = timed(store.query, **filters)
+            pandas_time, _ = timed(compute_financial_metrics, rows)
+            print(
+                f"{label:>8} {len(rows):>9,} rows  store.metrics {store_time:7.3f} s  "
+                f"query + compute_financial_metrics {load_time + pandas_time:7.3f} s  "
+                f"expenses ${metrics['total_expenses']:,.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Benchmark for parsers.text_parser on a synthetic chat-export expense log.
+
+Compares parse_text and parse_text_stream with the original regex parser
+(kept below as reference_parse_text) and reports throughput in MB/s.
+
+    python -m benchmarks.bench_text --lines 200000
+"""
+import argparse
+import io
+import re
+import time
+
+import pandas as pd
+
+from benchmarks.datagen import make_expense_log
+from parsers.text_parser import parse_text, parse_text_stream
+
+REFERENCE_PATTERN = re.compile(
+    r"(?P<amount>\$?\d+(?:\.\d+)?)\s*(?:on|for)?\s*(?P<desc>[A-Za-z][A-Za-z0-9\s\-\&\/]{1,60})",
+    re.IGNORECASE
+)
+
+
+def reference_parse_text(text: str) -> pd.DataFrame:
+    """
+    The original parse_text, used as the baseline.
+    """
+    rows = []
+    for match in REFERENCE_PATTERN.finditer(text):
+        amount_raw = match.group("amount").replace("$", "").strip()
+        desc = match.group("desc").strip().rstrip(",. ")
+        try:
+            amount = float(amount_raw)
+        except ValueError:
+            continue
+        rows.append({"date": "Unknown", "description": desc or "Unknown", "amount": amount, "category": "Uncategorized"})
+    return pd.DataFrame(rows)[["date", "description", "amount", "category"]]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lines", type=int, default=200_000)
+    args = parser.parse_args(argv)
+
+    text = make_expense_log(args.lines)
+    megabytes = len(text.encode("utf-8")) / 1e6
+    print(f"log: {args.lines:,} lines, {megabytes:.1f} MB")
+
+    runs = (
+        ("reference", lambda: reference_parse_text(text)),
+        ("parse_text", lambda: parse_text(text)),
+        ("parse_text_stream", lambda: parse_text_stream(io.StringIO(text))),
+    )
+    for label, fn in runs:
+        start = time.perf_counter()
+        df = fn()
+        elapsed = time.perf_counter() - start
+        dated = df["date"].notna().mean() if pd.api.types.is_datetime64_any_dtype(df["date"]) else 0.0
+        print(
+            f"{label:>18}  {elapsed:7.3f} s  {megabytes / elapsed:7.1f} MB/s  "
+            f"{len(df):>9,} rows  dated {dated:6.1%}  income rows {(df['amount'] > 0).sum():>8,}"
+        )
+
+
+if __name__ == "__main__":
+    main()
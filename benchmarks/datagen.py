@@ -0,0 +1,146 @@
+import io
+
+import numpy as np
+import pandas as pd
+
+CATEGORIES = [
+    "Groceries", "Dining", "Rent", "Utilities", "Transport",
+    "Entertainment", "Shopping", "Health", "Travel", "Salary",
+]
+
+MERCHANTS = [
+    "Whole Foods", "Trader Joes", "Starbucks", "Chipotle", "Shell",
+    "Uber", "Netflix", "Spotify", "Amazon", "Target",
+    "CVS Pharmacy", "Delta Airlines", "Comcast", "PG&E", "Landlord LLC",
+]
+
+
+def make_ledger(n_rows: int, seed: int = 0, start: str = "2019-01-01", days: int = 5 * 365) -> pd.DataFrame:
+    """
+    Deterministic synthetic ledger in the normalized schema:
+    date | description | amount | category
+    Dates are ISO strings, as they come out of the CSV/Excel parsers.
+    """
+    rng = np.random.default_rng(seed)
+
+    day_offsets = rng.integers(0, days, n_rows)
+    dates = (np.datetime64(start) + day_offsets).astype(str)
+
+    merchants = np.asarray(MERCHANTS, dtype=object)[rng.integers(0, len(MERCHANTS), n_rows)]
+    categories = np.asarray(CATEGORIES, dtype=object)[rng.integers(0, len(CATEGORIES), n_rows)]
+
+    # Mostly small expenses, some income, a heavy tail for the anomaly detector
+    amounts = -np.round(rng.lognormal(3.0, 1.0, n_rows), 2)
+    income = rng.random(n_rows) < 0.08
+    amounts[income] = np.round(rng.normal(2500, 400, income.sum()), 2)
+
+    return pd.DataFrame({
+        "date": dates.astype(object),
+        "description": merchants,
+        "amount": amounts,
+        "category": categories,
+    })
+
+
+def make_expense_log(n_lines: int, seed: int = 0) -> str:
+    """
+    Deterministic chat-export style expense log, one message per line,
+    with dates, times, thousands separators, credits and debits.
+    """
+    rng = np.random.default_rng(seed)
+
+    days = np.datetime64("2024-01-01") + rng.integers(0, 365, n_lines)
+    hours = rng.integers(0, 24, n_lines)
+    minutes = rng.integers(0, 60, n_lines)
+    merchants = np.asarray(MERCHANTS)[rng.integers(0, len(MERCHANTS), n_lines)]
+    amounts = np.round(rng.lognormal(3.0, 1.2, n_lines), 2)
+    kinds = rng.integers(0, 4, n_lines)
+
+    lines = []
+    for day, hour, minute, merchant, amount, kind in zip(
+        days.astype(str), hours, minutes, merchants, amounts, kinds
+    ):
+        if kind == 0:
+            text = f"spent ${amount:,.2f} on {merchant}"
+        elif kind == 1:
+            text = f"paid {amount:,.2f} for {merchant} and ${amount / 3:,.2f} for tips"
+        elif kind == 2:
+            text = f"received ${amount * 40:,.2f} salary from ACME"
+        else:
+            text = f"{merchant} - ${amount:,.2f}"
+        lines.append(f"[{day} {hour:02d}:{minute:02d}] me: {text}")
+
+    return "\n".join(lines) + "\n"
+
+
+def ledger_csv(n_rows: int, seed: int = 0) -> bytes:
+    """
+    make_ledger as the bytes of a bank CSV export.
+    """
+    return make_ledger(n_rows, seed=seed).to_csv(index=False).encode("utf-8")
+
+
+def ledger_xlsx(n_rows: int, seed: int = 0) -> bytes:
+    """
+    make_ledger as the bytes of a one-sheet .xlsx workbook.
+    """
+    from openpyxl import Workbook
+
+    ledger = make_ledger(n_rows, seed=seed)
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Transactions")
+    sheet.append(list(ledger.columns))
+    for row in ledger.itertuples(index=False):
+        sheet.append(list(row))
+
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
+
+
+def _pdf_document(pages: list) -> bytes:
+    """
+    Minimal uncompressed PDF with one Helvetica text line per entry of
+    each page's list of lines.
+    """
+    out = [b"%PDF-1.4\n"]
+    offsets = []
+
+    def add(body: bytes):
+        offsets.append(sum(len(part) for part in out))
+        out.append(f"{len(offsets)} 0 obj\n".encode() + body + b"\nendobj\n")
+
+    # Objects: 1 catalog, 2 page tree, 3 font, then a page and its content per page
+    page_ids = [4 + 2 * i for i in range(len(pages))]
+    add(b"<< /Type /Catalog /Pages 2 0 R >>")
+    add(f"<< /Type /Pages /Kids [{' '.join(f'{p} 0 R' for p in page_ids)}] /Count {len(pages)} >>".encode())
+    add(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    for page_id, lines in zip(page_ids, pages):
+        add(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {page_id + 1} 0 R >>".encode()
+        )
+        escaped = (line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)") for line in lines)
+        text = ("BT /F1 9 Tf 11 TL 40 760 Td " + " ".join(f"({line}) Tj T*" for line in escaped) + " ET").encode("latin-1")
+        add(f"<< /Length {len(text)} >>\nstream\n".encode() + text + b"\nendstream")
+
+    xref = sum(len(part) for part in out)
+    out.append(f"xref\n0 {len(offsets) + 1}\n0000000000 65535 f \n".encode())
+    out.extend(f"{offset:010d} 00000 n \n".encode() for offset in offsets)
+    out.append(f"trailer\n<< /Size {len(offsets) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode())
+    return b"".join(out)
+
+
+def ledger_pdf(n_rows: int, seed: int = 0, lines_per_page: int = 60) -> bytes:
+    """
+    make_ledger as a bank-statement style PDF, one transaction per line.
+    """
+    ledger = make_ledger(n_rows, seed=seed)
+    lines = [
+        f"{date} {description} {amount:,.2f}"
+        for date, description, amount in zip(ledger["date"], ledger["description"], ledger["amount"])
+    ]
+    pages = [lines[i:i + lines_per_page] for i in range(0, len(lines), lines_per_page)]
+    return _pdf_document(pages or [[]])
@@ -0,0 +1,261 @@
+"""
+Benchmark suite for every parser and the metrics path.
+
+Each case (stage x size) runs in a fresh child process on deterministic
+synthetic input and records:
+  seconds        best wall time over --repeat runs
+  peak_rss_mb    child's peak resident set size (ru_maxrss) after the runs
+  rss_delta_mb   peak RSS above the RSS right before the first run
+  alloc_peak_mb  peak Python allocations (tracemalloc) in one extra run
+
+Inputs are generated once and kept in --data-dir. Results can be saved as
+a JSON baseline and compared against one; a case that is slower or
+allocates more than the baseline by more than --threshold fails the run.
+
+    python -m benchmarks.suite --save benchmarks/baseline.json
+    python -m benchmarks.suite --compare benchmarks/baseline.json --threshold 0.25
+    python -m benchmarks.suite --quick --stages parse_csv,metrics
+
+parse_pdf's worker processes are not included in peak RSS.
+"""
+import argparse
+import io
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from benchmarks import datagen
+
+DATA_DIR = os.path.join(tempfile.gettempdir(), "ai-financial-analyzer-bench")
+
+# Rows (text: lines) per stage and size; --quick runs only the first size
+SIZES = {
+    "parse_csv": [10_000, 100_000, 1_000_000],
+    "parse_excel": [1_000, 10_000, 50_000],
+    "parse_pdf": [1_000, 10_000],
+    "parse_text": [10_000, 100_000],
+    "metrics": [10_000, 100_000, 1_000_000],
+}
+
+# Compared against the baseline; RSS depends too much on the allocator
+GATED = ("seconds", "alloc_peak_mb")
+
+# Cases faster than this are too noisy to gate on time
+MIN_GATED_SECONDS = 0.01
+
+
+def _input_path(data_dir: str, stage: str, size: int) -> str:
+    suffix = {"parse_csv": "csv", "parse_excel": "xlsx", "parse_pdf": "pdf", "parse_text": "txt"}.get(stage, "arrow")
+    kind = "ledger" if stage != "parse_text" else "log"
+    return os.path.join(data_dir, f"{kind}_{size}.{suffix}")
+
+
+def make_input(data_dir: str, stage: str, size: int) -> str:
+    """
+    Writes the input file for a case unless it already exists.
+    """
+    path = _input_path(data_dir, stage, size)
+    if os.path.exists(path):
+        return path
+
+    os.makedirs(data_dir, exist_ok=True)
+    if stage == "parse_csv":
+        data = datagen.ledger_csv(size)
+    elif stage == "parse_excel":
+        data = datagen.ledger_xlsx(size)
+    elif stage == "parse_pdf":
+        data = datagen.ledger_pdf(size)
+    elif stage == "parse_text":
+        data = datagen.make_expense_log(size).encode("utf-8")
+    else:
+        from parsers.schema import from_columns
+
+        ledger = datagen.make_ledger(size)
+        frame = from_columns(**{name: ledger[name] for name in ledger.columns})
+        frame.to_feather(path + ".tmp")
+        os.replace(path + ".tmp", path)
+        return path
+
+    with open(path + ".tmp", "wb") as fh:
+        fh.write(data)
+    os.replace(path + ".tmp", path)
+    return path
+
+
+def _runner(stage: str, path: str):
+    """
+    Loads the case input and returns a zero-argument function running the
+    stage on a fresh copy of it.
+    """
+    if stage == "metrics":
+        from analysis.finance_metrics import compute_financial_metrics
+
+        frame = pd.read_feather(path)
+        return lambda: compute_financial_metrics(frame)
+
+    with open(path, "rb") as fh:
+        data = fh.read()
+
+    if stage == "parse_text":
+        from parsers.text_parser import parse_text
+
+        text = data.decode("utf-8")
+        return lambda: parse_text(text)
+
+    from parsers.dispatch import parser_for
+
+    parser = parser_for(path)
+    return lambda: parser(io.BytesIO(data))
+
+
+def _rss_mb() -> float:
+    with open("/proc/self/statm") as fh:
+        return int(fh.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1e6
+
+
+def _measure(stage: str, path: str, repeat: int, queue):
+    """
+    Child process body: times the stage, then traces one more run.
+    """
+    try:
+        run = _runner(stage, path)
+        rss_before = _rss_mb()
+
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            run()
+            times.append(time.perf_counter() - start)
+
+        # ru_maxrss is in kilobytes on Linux
+        peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1e3
+
+        tracemalloc.start()
+        run()
+        _, alloc_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        queue.put({
+            "seconds": round(min(times), 4),
+            "peak_rss_mb": round(peak_rss, 1),
+            "rss_delta_mb": round(max(peak_rss - rss_before, 0.0), 1),
+            "alloc_peak_mb": round(alloc_peak / 1e6, 1),
+        })
+    except Exception as e:
+        queue.put({"error": f"{type(e).__name__}: {e}"})
+
+
+def run_case(stage: str, size: int, data_dir: str = DATA_DIR, repeat: int = 3) -> dict:
+    """
+    Runs one case in a fresh process so peak RSS is its own.
+    """
+    path = make_input(data_dir, stage, size)
+
+    context = multiprocessing.get_context("fork")
+    queue = context.Queue()
+    process = context.Process(target=_measure, args=(stage, path, repeat, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+
+def environment() -> dict:
+    return {
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """
+    Regressions of `results` against `baseline` beyond `threshold`
+    (0.25 = 25% worse), as readable strings.
+    """
+    regressions = []
+
+    for case, current in results.items():
+        previous = baseline.get(case)
+        if previous is None or "error" in current or "error" in previous:
+            continue
+
+        for field in GATED:
+            if field == "seconds" and previous[field] < MIN_GATED_SECONDS:
+                continue
+            if previous[field] > 0 and current[field] > previous[field] * (1 + threshold):
+                change = current[field] / previous[field] - 1
+                regressions.append(f"{case} {field}: {previous[field]} -> {current[field]} (+{change:.0%})")
+
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--stages", default=",".join(SIZES), help="comma-separated subset of: " + ", ".join(SIZES))
+    parser.add_argument("--quick", action="store_true", help="smallest size of each stage only")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--data-dir", default=DATA_DIR)
+    parser.add_argument("--save", help="write results to this JSON file")
+    parser.add_argument("--compare", help="baseline JSON file to check for regressions")
+    parser.add_argument("--threshold", type=float, default=0.25)
+    args = parser.parse_args(argv)
+
+    stages = [stage for stage in args.stages.split(",") if stage]
+    unknown = [stage for stage in stages if stage not in SIZES]
+    if unknown:
+        parser.error(f"unknown stage(s): {', '.join(unknown)}")
+
+    results = {}
+    print(f"{'case':>24} {'seconds':>9} {'peak RSS MB':>12} {'RSS +MB':>8} {'alloc MB':>9}")
+    for stage in stages:
+        for size in SIZES[stage][:1] if args.quick else SIZES[stage]:
+            case = f"{stage}/{size}"
+            result = run_case(stage, size, args.data_dir, args.repeat)
+            results[case] = result
+
+            if "error" in result:
+                print(f"{case:>24}  FAILED {result['error']}")
+            else:
+                print(
+                    f"{case:>24} {result['seconds']:>9.4f} {result['peak_rss_mb']:>12.1f} "
+                    f"{result['rss_delta_mb']:>8.1f} {result['alloc_peak_mb']:>9.1f}"
+                )
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as fh:
+            json.dump({"environment": environment(), "results": results}, fh, indent=2)
+        print(f"Results written to {args.save}")
+
+    failed = any("error" in result for result in results.values())
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as fh:
+            baseline = json.load(fh)
+
+        if baseline.get("environment") != environment():
+            print(f"Note: baseline was recorded on {baseline.get('environment')}")
+
+        regressions = compare(results, baseline.get("results", {}), args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            return 1
+        print(f"No regressions beyond {args.threshold:.0%} against {args.compare}")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
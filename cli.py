@@ -0,0 +1,187 @@
+"""
+Headless batch mode: analyze a directory (or glob) of statements.
+
+    python cli.py statements/ --out results.json
+    python cli.py "exports/**/*.csv" --out results.parquet --workers 4
+    python cli.py statements/ --store ~/.ai-financial-analyzer/transactions.sqlite
+
+Each CSV/XLSX/PDF/TXT file is parsed and analyzed in a process pool, then
+all parsed rows are reconciled (transfers between the files' accounts
+removed, and with --drop-duplicates transactions repeated across files)
+and analyzed together. A file that fails is reported and skipped; the rest
+of the batch still runs.
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import pandas as pd
+
+from analysis.categorize import categorize
+from analysis.finance_metrics import compute_financial_metrics, metrics_to_dict
+from analysis.reconcile import TRANSFER_WINDOW_DAYS, reconcile, summarize
+from analysis.recurring import detect_recurring
+from parsers.dispatch import PARSERS_BY_EXTENSION, parse_path
+from parsers.multi import merge_frames
+from storage.transactions import TransactionStore
+
+
+def collect_files(inputs, recursive: bool = True) -> list:
+    """
+    Expands directories and glob patterns into a sorted list of supported files.
+    """
+    files = set()
+
+    for item in inputs:
+        if os.path.isdir(item):
+            pattern = os.path.join(item, "**", "*") if recursive else os.path.join(item, "*")
+            candidates = glob.glob(pattern, recursive=recursive)
+        else:
+            candidates = glob.glob(item, recursive=True) or [item]
+
+        for path in candidates:
+            if os.path.isfile(path) and os.path.splitext(path)[1].lower() in PARSERS_BY_EXTENSION:
+                files.add(path)
+
+    return sorted(files)
+
+
+def analyze(df: pd.DataFrame) -> dict:
+    return {**compute_financial_metrics(df), "recurring": detect_recurring(df)}
+
+
+def analyze_file(path: str, workers: int = None) -> dict:
+    """
+    Parses and analyzes one file. Errors are returned, not raised, so one
+    bad statement does not abort the batch. `workers` caps parse_pdf's own
+    page pool; inside a batch worker process it is 1.
+    """
+    start = time.perf_counter()
+
+    try:
+        df = categorize(parse_path(path, workers=workers))
+        metrics = analyze(df)
+    except Exception as e:
+        return {
+            "file": path,
+            "ok": False,
+            "error": f"{type(e).__name__}: {e}",
+            "seconds": time.perf_counter() - start,
+        }
+
+    return {
+        "file": path,
+        "ok": True,
+        "rows": len(df),
+        "seconds": time.perf_counter() - start,
+        "metrics": metrics_to_dict(metrics),
+        "frame": df,
+    }
+
+
+def run_batch(files, workers: int = None, store=None, drop_duplicates: bool = False) -> tuple:
+    """
+    Analyzes `files` in a process pool. Returns (per-file results, aggregate
+    metrics dict or None if nothing parsed). The aggregate is computed after
+    analysis.reconcile and reports what it removed under "reconciled"; with
+    `drop_duplicates` transactions repeated across files are removed too.
+    With a TransactionStore, every parsed file is also added to it as a
+    statement.
+    """
+    workers = workers or os.cpu_count() or 1
+
+    if workers > 1 and len(files) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(partial(analyze_file, workers=1), files))
+    else:
+        results = [analyze_file(path) for path in files]
+
+    frames = [(result["file"], result.pop("frame")) for result in results if result["ok"]]
+    if store is not None:
+        for result, (_, frame) in zip((r for r in results if r["ok"]), frames):
+            result["stored"] = store.add_frame(frame, result["file"])
+    aggregate = None
+    if frames:
+        df, report = reconcile(merge_frames(frames), TRANSFER_WINDOW_DAYS, drop_duplicates)
+        aggregate = {**metrics_to_dict(analyze(df)), "reconciled": summarize(report)}
+
+    return results, aggregate
+
+
+def write_results(path: str, results: list, aggregate):
+    """
+    Writes JSON (full metrics) or Parquet (one summary row per file).
+    """
+    if path.lower().endswith(".parquet"):
+        rows = []
+        for result in results:
+            metrics = result.get("metrics", {})
+            rows.append({
+                "file": result["file"],
+                "ok": result["ok"],
+                "error": result.get("error"),
+                "rows": result.get("rows", 0),
+                "seconds": result["seconds"],
+                "total_income": metrics.get("total_income"),
+                "total_expenses": metrics.get("total_expenses"),
+                "net_savings": metrics.get("net_savings"),
+                "savings_rate": metrics.get("savings_rate"),
+            })
+        pd.DataFrame(rows).to_parquet(path, index=False)
+        return
+
+    with open(path, "w", encoding="utf-8") as fh:
+        json.dump({"files": results, "aggregate": aggregate}, fh, indent=2, default=str)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("inputs", nargs="+", help="files, directories or glob patterns")
+    parser.add_argument("--out", default="results.json", help="output path (.json or .parquet)")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: one per CPU)")
+    parser.add_argument("--no-recursive", action="store_true", help="do not descend into subdirectories")
+    parser.add_argument("--store", help="also add the transactions to this history database (SQLite)")
+    parser.add_argument(
+        "--drop-duplicates", action="store_true",
+        help="leave transactions repeated in another file (same day, amount and description) out of the aggregate",
+    )
+    args = parser.parse_args(argv)
+
+    files = collect_files(args.inputs, recursive=not args.no_recursive)
+    if not files:
+        print("No CSV/XLSX/PDF/TXT files found", file=sys.stderr)
+        return 2
+
+    start = time.perf_counter()
+    store = TransactionStore(args.store) if args.store else None
+    results, aggregate = run_batch(files, workers=args.workers, store=store, drop_duplicates=args.drop_duplicates)
+    elapsed = time.perf_counter() - start
+
+    for result in results:
+        status = f"{result['rows']:>9,} rows" if result["ok"] else f"FAILED {result['error']}"
+        if "stored" in result:
+            status += f", {result['stored']:,} new in store"
+        print(f"{result['seconds']:>8.3f}s  {result['file']}  {status}")
+
+    failed = sum(not result["ok"] for result in results)
+    print(f"{len(files)} files in {elapsed:.2f}s ({len(files) / elapsed:.1f} files/sec), {failed} failed")
+    if aggregate is not None:
+        removed = aggregate["reconciled"]
+        print(
+            f"Aggregate: {removed['transfer']['rows']:,} transfer and "
+            f"{removed['duplicate']['rows']:,} duplicate transactions left out"
+        )
+
+    write_results(args.out, results, aggregate)
+    print(f"Results written to {args.out}")
+
+    return 1 if failed == len(files) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
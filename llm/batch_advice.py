@@ -0,0 +1,236 @@
+"""
+Advice for many metrics dicts at once (e.g. a nightly run over client
+portfolios).
+
+Requests are fanned out with asyncio onto a thread pool that shares the
+pooled session of llm_client, under a concurrency cap and a requests-per-
+second rate limit. Timeouts, connection errors and 429/5xx replies are
+retried with exponential backoff and jitter (or the server's Retry-After);
+any other error fails only its own item. Metrics that produce the same
+prompt text are requested once.
+
+    python -m llm.batch_advice results.json --concurrency 8 --rate 5 --out advice.json
+
+The input is a JSON list of metrics dicts, a JSON Lines file of them, or
+the output of cli.py (its "files" entries' metrics are used).
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import requests
+
+from llm.llm_client import DEFAULT_MODEL, APIError, build_prompt, generate_ai_advice
+from monitoring.instrumentation import instrumented
+
+# Requests in flight at once; above llm_client's pool size (16) connections
+# are no longer reused
+DEFAULT_CONCURRENCY = 8
+
+# Requests started per second, across all workers
+DEFAULT_RATE_PER_SECOND = 5.0
+
+# Attempts per prompt, including the first
+MAX_ATTEMPTS = 4
+
+BACKOFF_BASE_SECONDS = 1.0
+BACKOFF_MAX_SECONDS = 30.0
+
+# Replies worth retrying; other statuses (bad request, auth) fail at once
+RETRY_STATUS = {408, 409, 425, 429, 500, 502, 503, 504}
+
+RETRY_EXCEPTIONS = (requests.Timeout, requests.ConnectionError, requests.exceptions.ChunkedEncodingError)
+
+
+class RateLimiter:
+    """
+    Spaces request starts at least 1 / rate seconds apart.
+    """
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate else 0.0
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self):
+        if not self.interval:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            delay = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+def _retryable(error: Exception) -> bool:
+    if isinstance(error, APIError):
+        return error.status_code in RETRY_STATUS
+    return isinstance(error, RETRY_EXCEPTIONS)
+
+
+def backoff_seconds(attempt: int, error: Exception = None) -> float:
+    """
+    Delay before retry number `attempt` (1-based): the server's Retry-After
+    if given, else full jitter over an exponentially growing window.
+    """
+    retry_after = getattr(error, "retry_after", None)
+    if retry_after is not None:
+        return min(retry_after, BACKOFF_MAX_SECONDS)
+    return random.uniform(0, min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** (attempt - 1)))
+
+
+async def _advise_one(metrics: dict, model: str, api_url: str, semaphore, limiter, executor) -> dict:
+    """
+    Advice for one prompt with retries. Returns a result dict, never raises.
+    """
+    loop = asyncio.get_running_loop()
+    errors = []
+
+    for attempt in range(1, MAX_ATTEMPTS + 1):
+        async with semaphore:
+            await limiter.wait()
+            start = time.perf_counter()
+            try:
+                advice = await loop.run_in_executor(executor, generate_ai_advice, metrics, model, api_url)
+            except Exception as e:
+                latency = time.perf_counter() - start
+                errors.append(f"{type(e).__name__}: {e}")
+                error = e
+            else:
+                return {
+                    "ok": True,
+                    "advice": advice,
+                    "error": None,
+                    "attempts": attempt,
+                    "latency_s": time.perf_counter() - start,
+                }
+
+        if not _retryable(error) or attempt == MAX_ATTEMPTS:
+            break
+        await asyncio.sleep(backoff_seconds(attempt, error))
+
+    return {
+        "ok": False,
+        "advice": None,
+        "error": errors[-1],
+        "attempts": len(errors),
+        "latency_s": latency,
+    }
+
+
+async def advise_many(metrics_list, model: str = DEFAULT_MODEL, api_url: str = None,
+                      concurrency: int = DEFAULT_CONCURRENCY, rate: float = DEFAULT_RATE_PER_SECOND) -> list:
+    """
+    Advice for every metrics dict, as a list of result dicts in input order:
+    ok, advice, error, attempts, latency_s (last attempt) and duplicate_of
+    (index of the item whose request it shares, or None). Items share a
+    request only when their prompts are identical.
+    """
+    metrics_list = list(metrics_list)
+    prompts = [build_prompt(metrics) for metrics in metrics_list]
+    first_of = {}
+    for i, prompt in enumerate(prompts):
+        first_of.setdefault(prompt, i)
+
+    semaphore = asyncio.Semaphore(concurrency)
+    limiter = RateLimiter(rate)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        unique = list(first_of.values())
+        outcomes = await asyncio.gather(*(
+            _advise_one(metrics_list[i], model, api_url, semaphore, limiter, executor) for i in unique
+        ))
+
+    by_index = dict(zip(unique, outcomes))
+    results = []
+    for i, prompt in enumerate(prompts):
+        first = first_of[prompt]
+        results.append({**by_index[first], "index": i, "duplicate_of": first if first != i else None})
+    return results
+
+
+def summarize(results: list, seconds: float) -> dict:
+    """
+    Counts, throughput (items per second) and p50/p95 latency of requested prompts.
+    """
+    requested = [r for r in results if r["duplicate_of"] is None]
+    latencies = np.array([r["latency_s"] for r in requested if r["ok"]])
+
+    return {
+        "items": len(results),
+        "requests": len(requested),
+        "ok": sum(r["ok"] for r in results),
+        "failed": sum(not r["ok"] for r in results),
+        "retries": sum(r["attempts"] - 1 for r in requested),
+        "seconds": round(seconds, 3),
+        "items_per_s": round(len(results) / seconds, 2) if seconds else None,
+        "p50_latency_s": round(float(np.percentile(latencies, 50)), 3) if len(latencies) else None,
+        "p95_latency_s": round(float(np.percentile(latencies, 95)), 3) if len(latencies) else None,
+    }
+
+
+@instrumented("llm.advice_batch")
+def generate_advice_batch(metrics_list, model: str = DEFAULT_MODEL, api_url: str = None,
+                          concurrency: int = DEFAULT_CONCURRENCY, rate: float = DEFAULT_RATE_PER_SECOND) -> tuple:
+    """
+    Blocking wrapper around advise_many. Returns (results, summary).
+    """
+    start = time.perf_counter()
+    results = asyncio.run(advise_many(metrics_list, model, api_url, concurrency, rate))
+    return results, summarize(results, time.perf_counter() - start)
+
+
+def load_metrics(path: str) -> list:
+    """
+    Metrics dicts from a JSON list, JSON Lines or a cli.py results file.
+    """
+    with open(path, encoding="utf-8") as fh:
+        text = fh.read()
+
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError:
+        return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+    if isinstance(data, dict) and "files" in data:
+        return [entry["metrics"] for entry in data["files"] if entry.get("ok")]
+    return data if isinstance(data, list) else [data]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input", help="JSON / JSON Lines file of metrics dicts, or cli.py output")
+    parser.add_argument("--out", default="advice.json")
+    parser.add_argument("--model", default=DEFAULT_MODEL)
+    parser.add_argument("--api-url", default=None, help="chat completions endpoint (e.g. a local mock)")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+    parser.add_argument("--rate", type=float, default=DEFAULT_RATE_PER_SECOND, help="requests started per second")
+    args = parser.parse_args(argv)
+
+    metrics_list = load_metrics(args.input)
+    results, summary = generate_advice_batch(metrics_list, args.model, args.api_url, args.concurrency, args.rate)
+
+    for result in results:
+        if not result["ok"]:
+            print(f"item {result['index']}: FAILED after {result['attempts']} attempt(s): {result['error']}")
+    print(
+        f"{summary['items']} items ({summary['requests']} requests, {summary['retries']} retries) in "
+        f"{summary['seconds']:.2f}s, {summary['items_per_s']} items/s, "
+        f"p50 {summary['p50_latency_s']}s, p95 {summary['p95_latency_s']}s, {summary['failed']} failed"
+    )
+
+    with open(args.out, "w", encoding="utf-8") as fh:
+        json.dump({"results": results, "summary": summary}, fh, indent=2)
+    print(f"Results written to {args.out}")
+
+    return 1 if summary["failed"] == summary["items"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
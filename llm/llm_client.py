@@ -1,15 +1,114 @@
+import json
 import os
+import threading
+import time
+from collections import OrderedDict
+
 import requests
+from requests.adapters import HTTPAdapter
 
-OPENROUTER_API_URL = "https://openrouter.ai/api/v1/chat/completions"
+from monitoring.instrumentation import instrumented
 
-def generate_ai_advice(metrics: dict) -> str:
-    api_key = os.getenv("OPENROUTER_API_KEY")
+OPENROUTER_API_URL = os.getenv("OPENROUTER_API_URL", "https://openrouter.ai/api/v1/chat/completions")
 
-    if not api_key:
-        raise RuntimeError("OPENROUTER_API_KEY is missing. AI advisory cannot run.")
+DEFAULT_MODEL = "meta-llama/llama-3.1-8b-instruct"
+
+REQUEST_TIMEOUT = 30
+
+# Advice for the same prompt is reused for this long
+CACHE_TTL_SECONDS = 60 * 60
+CACHE_MAX_ENTRIES = 256
+
+# Merchant categories suggested by the model, kept for the process lifetime
+CATEGORY_BATCH_SIZE = 50
+CATEGORY_CACHE_MAX_ENTRIES = 10_000
+
+# Recurring payments listed in the prompt, largest annual cost first
+PROMPT_RECURRING_ROWS = 10
+
+_session = None
+_session_lock = threading.Lock()
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+_category_cache = OrderedDict()
+_category_cache_lock = threading.Lock()
+
+_stats = {
+    "requests": 0,
+    "cache_hits": 0,
+    "errors": 0,
+    "last_latency_s": None,
+    "last_ttft_s": None,
+    "total_latency_s": 0.0,
+    "total_ttft_s": 0.0,
+}
+_stats_lock = threading.Lock()
+
+
+class APIError(RuntimeError):
+    """
+    Non-200 reply from the chat completions API. `retry_after` is the
+    server's Retry-After in seconds, if it sent one.
+    """
+
+    def __init__(self, response):
+        super().__init__(f"OpenRouter API error: {response.text}")
+        self.status_code = response.status_code
+        try:
+            self.retry_after = float(response.headers.get("Retry-After"))
+        except (TypeError, ValueError):
+            self.retry_after = None
+
+
+def get_session() -> requests.Session:
+    """
+    Shared HTTP session so every call reuses pooled keep-alive connections.
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session = session
+    return _session
+
+
+def _recurring_records(metrics: dict) -> list:
+    """
+    Active recurring payments as records, whether the metrics hold the
+    detector's DataFrame or the JSON records of metrics_to_dict.
+    """
+    recurring = metrics.get("recurring")
+    if recurring is None:
+        return []
+    records = recurring.to_dict(orient="records") if hasattr(recurring, "to_dict") else list(recurring)
+    return [record for record in records if record.get("active", True)]
 
-    prompt = f"""
+
+def _recurring_section(metrics: dict) -> str:
+    records = _recurring_records(metrics)
+    if not records:
+        return ""
+
+    lines = [
+        f"- {r['description']} ({r['category']}): ${r['amount']} {r['period']}, "
+        f"${r['annualized_cost']}/year, next expected {str(r['next_expected'])[:10]}"
+        for r in records[:PROMPT_RECURRING_ROWS]
+    ]
+    total = round(sum(float(r["annualized_cost"]) for r in records), 2)
+    return (
+        f"\nRecurring payments ({len(records)} active, ${total}/year in total):\n"
+        + "\n".join(lines)
+        + "\n"
+    )
+
+
+def build_prompt(metrics: dict) -> str:
+    return f"""
 You are a financial analysis assistant.
 
 Using the following computed metrics, generate clear, practical financial insights.
@@ -20,7 +119,7 @@ Metrics:
 - Total Expenses: ${metrics['total_expenses']}
 - Net Savings: ${metrics['net_savings']}
 - Savings Rate: {metrics['savings_rate']}%
-
+{_recurring_section(metrics)}
 Provide:
 1. A short summary
 2. Key observations
@@ -30,28 +129,243 @@ End with:
 "This is educational financial guidance, not professional financial advice."
 """
 
+
+def cache_key(metrics: dict, model: str) -> tuple:
+    """
+    The model and the exact prompt: metrics that differ in anything the
+    prompt shows never share advice, while reruns on the same data do.
+    """
+    return model, build_prompt(metrics)
+
+
+def _cache_get(key):
+    with _cache_lock:
+        entry = _cache.get(key)
+        if entry is None:
+            return None
+        stored_at, advice = entry
+        if time.monotonic() - stored_at > CACHE_TTL_SECONDS:
+            del _cache[key]
+            return None
+        _cache.move_to_end(key)
+        return advice
+
+
+def _cache_put(key, advice: str):
+    with _cache_lock:
+        _cache[key] = (time.monotonic(), advice)
+        _cache.move_to_end(key)
+        while len(_cache) > CACHE_MAX_ENTRIES:
+            _cache.popitem(last=False)
+
+
+def _record(latency=None, ttft=None, hit=False, error=False):
+    with _stats_lock:
+        _stats["requests"] += 1
+        if hit:
+            _stats["cache_hits"] += 1
+        if error:
+            _stats["errors"] += 1
+        if latency is not None:
+            _stats["last_latency_s"] = latency
+            _stats["total_latency_s"] += latency
+        if ttft is not None:
+            _stats["last_ttft_s"] = ttft
+            _stats["total_ttft_s"] += ttft
+
+
+def advisor_stats() -> dict:
+    """
+    Request count, cache hit rate, and latency / time-to-first-token
+    (last and mean over calls that reached the API).
+    """
+    with _stats_lock:
+        stats = dict(_stats)
+
+    calls = stats["requests"] - stats["cache_hits"] - stats["errors"]
+    stats["cache_hit_rate"] = round(stats["cache_hits"] / stats["requests"], 4) if stats["requests"] else 0.0
+    stats["mean_latency_s"] = stats.pop("total_latency_s") / calls if calls else None
+    stats["mean_ttft_s"] = stats.pop("total_ttft_s") / calls if calls else None
+    return stats
+
+
+def _api_key() -> str:
+    api_key = os.getenv("OPENROUTER_API_KEY")
+
+    if not api_key:
+        raise RuntimeError("OPENROUTER_API_KEY is missing. AI advisory cannot run.")
+
+    return api_key
+
+
+@instrumented("llm.advice")
+def stream_ai_advice(metrics: dict, model: str = DEFAULT_MODEL, api_url: str = None):
+    """
+    Yields the advice text as it arrives from the API (server-sent events).
+    Cached advice for the same prompt and model is yielded at once.
+    """
+    key = cache_key(metrics, model)
+    prompt = key[1]
+    cached = _cache_get(key)
+    if cached is not None:
+        _record(hit=True)
+        yield cached
+        return
+
     payload = {
-        "model": "meta-llama/llama-3.1-8b-instruct",
+        "model": model,
         "messages": [
             {"role": "user", "content": prompt}
         ],
         "temperature": 0.3,
-        "max_tokens": 400
+        "max_tokens": 400,
+        "stream": True
     }
 
     headers = {
-        "Authorization": f"Bearer {api_key}",
+        "Authorization": f"Bearer {_api_key()}",
         "Content-Type": "application/json"
     }
 
-    response = requests.post(
-        OPENROUTER_API_URL,
-        headers=headers,
-        json=payload,
-        timeout=30
-    )
+    start = time.perf_counter()
+    ttft = None
+    parts = []
+
+    try:
+        response = get_session().post(
+            api_url or OPENROUTER_API_URL,
+            headers=headers,
+            json=payload,
+            timeout=REQUEST_TIMEOUT,
+            stream=True
+        )
+
+        with response:
+            if response.status_code != 200:
+                raise APIError(response)
+
+            for line in response.iter_lines(decode_unicode=True):
+                if not line or not line.startswith("data:"):
+                    continue
+
+                data = line[len("data:"):].strip()
+                if data == "[DONE]":
+                    break
+
+                choice = json.loads(data)["choices"][0]
+                content = (choice.get("delta") or choice.get("message") or {}).get("content")
+                if not content:
+                    continue
+
+                if ttft is None:
+                    ttft = time.perf_counter() - start
+                parts.append(content)
+                yield content
+    except Exception:
+        _record(error=True)
+        raise
+
+    _record(latency=time.perf_counter() - start, ttft=ttft)
+    if parts:
+        _cache_put(key, "".join(parts))
+
+
+def generate_ai_advice(metrics: dict, model: str = DEFAULT_MODEL, api_url: str = None) -> str:
+    return "".join(stream_ai_advice(metrics, model=model, api_url=api_url))
+
+
+def build_category_prompt(merchants: list, categories: list) -> str:
+    listing = "\n".join(f"- {merchant}" for merchant in merchants)
+    return f"""
+Assign each merchant or transaction description below to exactly one of
+these categories: {", ".join(categories)}.
+
+Descriptions:
+{listing}
+
+Answer with a single JSON object mapping each description, exactly as
+written above, to its category. Use "Uncategorized" if none fits.
+"""
+
+
+def _parse_categories(content: str, categories: list) -> dict:
+    """
+    The JSON object in a model reply, keeping only known categories.
+    """
+    start, end = content.find("{"), content.rfind("}")
+    if start < 0 or end < start:
+        return {}
+
+    try:
+        mapping = json.loads(content[start:end + 1])
+    except json.JSONDecodeError:
+        return {}
+
+    allowed = set(categories)
+    return {str(k): v for k, v in mapping.items() if v in allowed} if isinstance(mapping, dict) else {}
+
+
+@instrumented("llm.categorize")
+def categorize_merchants(merchants, categories: list, model: str = DEFAULT_MODEL, api_url: str = None,
+                         batch_size: int = CATEGORY_BATCH_SIZE) -> dict:
+    """
+    Asks the model to categorize descriptions the keyword rules did not
+    match, `batch_size` per request. Returns {description: category} for
+    the ones it placed; answers are cached per (model, description), so
+    each merchant is sent at most once per process.
+    """
+    result = {}
+    missing = []
+
+    with _category_cache_lock:
+        for merchant in dict.fromkeys(merchants):
+            key = (model, merchant)
+            if key in _category_cache:
+                _category_cache.move_to_end(key)
+                if _category_cache[key] is not None:
+                    result[merchant] = _category_cache[key]
+            else:
+                missing.append(merchant)
+
+    if not missing:
+        return result
+
+    headers = {
+        "Authorization": f"Bearer {_api_key()}",
+        "Content-Type": "application/json"
+    }
+
+    for i in range(0, len(missing), batch_size):
+        batch = missing[i:i + batch_size]
+        payload = {
+            "model": model,
+            "messages": [
+                {"role": "user", "content": build_category_prompt(batch, categories)}
+            ],
+            "temperature": 0,
+            "max_tokens": 30 * len(batch),
+        }
+
+        response = get_session().post(
+            api_url or OPENROUTER_API_URL,
+            headers=headers,
+            json=payload,
+            timeout=REQUEST_TIMEOUT
+        )
+        if response.status_code != 200:
+            raise APIError(response)
+
+        content = response.json()["choices"][0]["message"]["content"]
+        answers = _parse_categories(content, categories)
+
+        with _category_cache_lock:
+            for merchant in batch:
+                # Unplaced merchants are cached too, so they are not re-sent
+                _category_cache[(model, merchant)] = answers.get(merchant)
+                _category_cache.move_to_end((model, merchant))
+            while len(_category_cache) > CATEGORY_CACHE_MAX_ENTRIES:
+                _category_cache.popitem(last=False)
 
-    if response.status_code != 200:
-        raise RuntimeError(f"OpenRouter API error: {response.text}")
+        result.update({merchant: answers[merchant] for merchant in batch if merchant in answers})
 
-    return response.json()["choices"][0]["message"]["content"]
+    return result
@@ -3,14 +3,24 @@ import streamlit as st # Imports the Streamlit library for creating web applicat
 import pandas as pd # Imports the Pandas library, typically used for data manipulation and analysis, especially DataFrames.
 
 # --- Import custom parser functions ---
-from parsers.csv_parser import parse_csv # Imports the function to read and process CSV files.
-from parsers.excel_parser import parse_excel # Imports the function to read and process Excel files.
-from parsers.pdf_parser import parse_pdf # Imports the function to read and process PDF files.
 from parsers.text_parser import parse_text # Imports the function to read and process free-form text input.
+from parsers.schema import memory_bytes # Imports the helper that measures how much memory the parsed data takes.
 
-# --- Import custom analysis and LLM functions ---
-from analysis.finance_metrics import compute_financial_metrics # Imports the function to calculate key financial figures.
-from llm.llm_client import generate_ai_advice # Imports the function to generate advice using a Large Language Model (LLM).
+# --- Import custom pipeline and LLM functions ---
+from analysis.anomalies import DETECTORS, DEFAULT_DETECTOR # Imports the available anomaly detectors and the default one.
+from analysis.rollups import GRANULARITIES # Imports the trend granularities (daily to yearly) offered in the trend chart.
+from analysis.reconcile import summarize as summarize_reconciliation # Imports the helper that totals the rows and money removed by reconciliation.
+from pipeline import stages # Imports the pipeline stages that reuse earlier results when their inputs have not changed.
+from pipeline import presentation # Imports the helpers that keep what is sent to the browser small (pages, top categories, downsampled trends).
+from monitoring import instrumentation # Imports the optional timing layer for parsers, metrics and LLM calls.
+from parsers.cache import default_cache # Imports the on-disk cache of parsed uploads, to report how often it was used.
+from llm.llm_client import stream_ai_advice, advisor_stats # Imports the functions to stream advice from a Large Language Model (LLM) and report its latency and cache use.
+from storage.transactions import TransactionStore # Imports the persistent store that keeps transactions from every statement for history queries.
+
+STREAM_CSV_BYTES = 50 * 1024 * 1024 # CSV uploads larger than this are streamed in chunks instead of loaded whole.
+PREVIEW_ROWS = 1000 # Number of rows shown in the preview when a CSV is streamed.
+
+instrumentation.serve_metrics() # Starts the Prometheus /metrics endpoint once, if FINANCE_ANALYZER_METRICS_PORT is set.
 
 st.set_page_config(page_title="AI Financial Analyzer", layout="wide") # Configures the Streamlit page: sets the browser tab title and uses a wider layout.
 st.title("AI Financial Analyzer") # Displays the main title "AI Financial Analyzer" on the web page.
@@ -23,9 +33,10 @@ st.write( # Displays a multiline descriptive text block on the web page.
 # -------- Input Section --------
 st.header("1. Provide Your Data") # Displays a section header for the data input area.
 
-uploaded_file = st.file_uploader( # Creates an object for the file upload widget, storing the uploaded file object.
-    "Upload CSV, Excel (.xlsx), or PDF", # Text prompt displayed above the upload widget.
-    type=["csv", "xlsx", "pdf"] # Specifies the accepted file extensions for the upload widget.
+uploaded_files = st.file_uploader( # Creates an object for the file upload widget, storing the list of uploaded file objects.
+    "Upload CSV, Excel (.xlsx), PDF or text files (select several to analyze them together)", # Text prompt displayed above the upload widget.
+    type=["csv", "xlsx", "pdf", "txt"], # Specifies the accepted file extensions for the upload widget.
+    accept_multiple_files=True # Lets the user upload several statements at once, e.g. a year of monthly exports.
 )
 
 text_input = st.text_area( # Creates an object for the text input area widget, storing the user's entered text.
@@ -34,23 +45,40 @@ text_input = st.text_area( # Creates an object for the text input area widget, s
 )
 
 df = None # Initializing the variable 'df' (for DataFrame) to hold the parsed financial data, setting it to None.
+metrics = None # Initializing the variable 'metrics' to hold metrics computed while streaming a large CSV, setting it to None.
 error = None # Initializing the variable 'error' to capture any parsing exceptions, setting it to None.
+run = stages.PipelineRun(st.session_state.setdefault("stage_memo", stages.StageMemo())) # Creates an object that times each pipeline stage and reuses this session's results from earlier reruns, up to a memory budget.
+key = None # Initializing the variable 'key' to hold the fingerprint of the parsed data, setting it to None.
+file_results = [] # Initializing the list that holds each uploaded file's parse outcome (rows, time, error).
+payloads = {} # Initializing the dictionary that records how many bytes each table or chart sends to the browser.
 
 try: # Starts a block of code to be tested for errors (exception handling).
-    if uploaded_file is not None: # Checks if a file has been successfully uploaded by the user.
-        if uploaded_file.name.lower().endswith(".csv"): # Checks if the uploaded file's name ends with ".csv" (case-insensitive).
-            df = parse_csv(uploaded_file) # Calls the imported function to process the CSV file, creating the DataFrame 'df'.
-        elif uploaded_file.name.lower().endswith(".xlsx"): # Checks if the uploaded file's name ends with ".xlsx" (case-insensitive).
-            df = parse_excel(uploaded_file) # Calls the imported function to process the Excel file, creating the DataFrame 'df'.
-        elif uploaded_file.name.lower().endswith(".pdf"): # Checks if the uploaded file's name ends with ".pdf" (case-insensitive).
-            df = parse_pdf(uploaded_file) # Calls the imported function to process the PDF file, creating the DataFrame 'df'.
+    if uploaded_files: # Checks if at least one file has been successfully uploaded by the user.
+        single = uploaded_files[0] if len(uploaded_files) == 1 else None # Keeps the upload when there is exactly one, for the large-CSV check.
+        if single is not None and single.name.lower().endswith(".csv") and single.size > STREAM_CSV_BYTES: # Checks if the upload is a single CSV too large to load whole.
+            key, df, metrics = stages.ingest_streamed_csv(run, single, PREVIEW_ROWS) # Computes the metrics chunk by chunk and keeps only the first rows for the preview.
+        else: # Handles any number of CSV, Excel, PDF or text files.
+            progress = st.progress(0.0, text=f"Parsing {len(uploaded_files)} file(s)...") # Creates a progress bar object that fills as files finish parsing.
+
+            def show_progress(done, total, result): # Defines the callback the parser runs each time one file finishes.
+                status = f"{result['rows']:,} rows" if result["ok"] else "failed" # Builds a short status for the finished file.
+                progress.progress(done / total, text=f"Parsed {done}/{total}: {result['file']} ({status})") # Advances the progress bar and names the finished file.
+
+            key, df, file_results = stages.ingest_many(run, uploaded_files, show_progress) # Parses all files in parallel, each with the parser for its extension, and merges them into one DataFrame 'df' with a 'source' column naming each row's file.
+            progress.empty() # Removes the progress bar once every file is parsed.
+            if df is None: # Checks if no file could be parsed at all.
+                error = "; ".join(f"{r['file']}: {r['error']}" for r in file_results) # Combines every file's error message into one.
 
     elif text_input.strip(): # Checks if the text input area contains non-whitespace text.
-        df = parse_text(text_input) # Calls the imported function to process the free text, creating the DataFrame 'df'.
+        key, df = stages.ingest(run, parse_text, text_input) # Calls the imported function to process the free text, creating the DataFrame 'df'.
 
 except Exception as e: # Catches any unexpected error (Exception object 'e') that occurred in the 'try' block.
     error = str(e) # Stores the error message (converted to a string) in the 'error' variable.
 
+for result in file_results: # Loops over each uploaded file's parse outcome.
+    if not result["ok"] and df is not None: # Checks if this file failed while others parsed fine.
+        st.warning(f"Skipped {result['file']}: {result['error']}") # Displays a warning naming the file that could not be parsed.
+
 if error: # Checks if the 'error' variable contains a message (i.e., an exception occurred).
     st.error(error) # Displays the captured error message as a Streamlit error alert.
     st.stop() # Stops the execution of the Streamlit script, preventing further code from running.
@@ -59,12 +87,64 @@ if df is None or df.empty: # Checks if the DataFrame 'df' is still None OR if it
     st.info("Please upload a file or enter text to begin.") # Displays an informational message to guide the user.
     st.stop() # Stops the execution of the Streamlit script until data is provided.
 
+streamed = metrics is not None # Remembers whether the metrics came from streaming a large CSV, in which case 'df' holds only the preview rows.
+key, df = stages.normalize(run, key, df) # Brings the parsed data to the standard compact schema (reused on reruns).
+
+use_ai_categories = st.checkbox("Use AI to categorize merchants the keyword rules do not recognize") # Creates a checkbox object; when ticked, unknown merchants are sent to the LLM in batches.
+try: # Starts a block of code to be tested for errors (exception handling).
+    key, df = stages.categorize(run, key, df, use_ai_categories) # Fills in missing categories from each transaction's description (reused on reruns).
+except Exception as e: # Catches an error from the AI categorization request.
+    st.warning(f"AI categorization failed, using keyword rules only: {e}") # Displays a warning and explains the fallback.
+    key, df = stages.categorize(run, key, df) # Fills in missing categories with the keyword rules alone.
+
+removed = None # Initializing the variable 'removed' to hold the transactions dropped by reconciliation, setting it to None.
+if not streamed and st.checkbox("Remove transfers between my own accounts", value=True): # Creates a checkbox (on by default) that stops both legs of internal transfers from counting as income and expenses.
+    _, repeated = stages.duplicates(run, key, df) # Finds rows that repeat a transaction from another uploaded file (same day, amount and description), without removing them yet.
+    drop_repeated = len(repeated) > 0 and st.checkbox( # Asks before removing them, since two accounts can have separate charges that happen to match.
+        f"Also remove {len(repeated):,} transactions that repeat one from another file (same day, amount and description)", # Label naming how many rows would go.
+        value=False # Leaves them in until the user confirms they are overlapping statements of the same account.
+    )
+    key, (df, removed) = stages.reconcile(run, key, df, drop_repeated) # Drops transfer rows (and the confirmed duplicates), keeping a report of what was removed (reused on reruns).
+
 # -------- Preview --------
 st.header("2. Parsed Data Preview") # Displays a section header for the data preview.
-st.dataframe(df, use_container_width=True) # Displays the parsed DataFrame 'df' as an interactive table, using the full width.
+pages = presentation.page_count(len(df)) # Counts the preview pages, so only one page of rows is sent to the browser at a time.
+page_number = st.number_input(f"Page (of {pages:,})", min_value=1, max_value=pages, value=1) if pages > 1 else 1 # Creates a page picker when the data does not fit on one page.
+preview = presentation.page(df, page_number) # Selects the rows of the chosen page.
+st.dataframe(preview, use_container_width=True) # Displays the current page of the parsed DataFrame 'df' as an interactive table, using the full width.
+payloads["preview"] = presentation.payload_bytes(preview) # Records the size of the preview page sent to the browser.
+st.caption(f"{len(df):,} rows | {memory_bytes(df) / 1e6:.1f} MB in memory") # Displays the row count and in-memory size of the parsed data.
+if len(file_results) > 1: # Checks if several files were uploaded together.
+    with st.expander("Files"): # Creates a collapsible panel listing the uploaded files.
+        st.dataframe(pd.DataFrame(file_results), use_container_width=True) # Displays each file's row count, parse time in seconds and any error.
+
+if "store" not in st.session_state: # Checks if this session has not opened the history database yet.
+    st.session_state["store"] = TransactionStore() # Opens (or creates) the local transaction history database once per session.
+store = st.session_state["store"] # Reuses the session's handle to the history database on every rerun.
+if metrics is None and st.checkbox("Save these transactions to my history"): # Creates a checkbox (not for streamed CSVs, whose rows are not all kept); when ticked, the parsed transactions are added to the history database.
+    history_name = ", ".join(f.name for f in uploaded_files) if uploaded_files else "Text input" # Names the saved statement after the uploaded file(s).
+    _, added = stages.save_history(run, key, df, store, history_name) # Stores the transactions once; statements and transactions already saved are skipped.
+    st.caption(f"{added:,} new transactions saved to {store.path}") # Displays how many transactions were new to the history.
+
+if removed is not None and not removed.empty: # Checks if reconciliation removed any transactions.
+    with st.expander(f"Removed {len(removed):,} duplicate or transfer transactions"): # Creates a collapsible panel explaining what was removed.
+        st.dataframe(pd.DataFrame(summarize_reconciliation(removed)).T, use_container_width=True) # Displays the rows, income and expenses removed per reason.
+        removed_page = presentation.page(removed, 1) # Keeps the first page of the removed transactions, so the table stays small.
+        st.dataframe(removed_page, use_container_width=True) # Displays each removed transaction with the reason and the row it matched.
+        payloads["removed"] = presentation.payload_bytes(removed_page) # Records the size of the removed-transactions table.
 
 # -------- Analysis --------
-metrics = compute_financial_metrics(df) # Calls the function to calculate financial metrics from the DataFrame 'df', storing the results in the 'metrics' dictionary object.
+if metrics is None: # Checks if the metrics still need computing (they are already set for streamed CSVs).
+    key, metrics = stages.metrics(run, key, df) # Calls the function to calculate financial metrics from the DataFrame 'df' (reused on reruns), storing the results in the 'metrics' dictionary object.
+    detector = st.selectbox( # Creates a dropdown to choose how anomalous transactions are detected.
+        "Anomaly baseline", # Label displayed above the dropdown.
+        list(DETECTORS), # Options: per-category or per-merchant rolling baselines, or the global IQR check.
+        index=list(DETECTORS).index(DEFAULT_DETECTOR) # Preselects the default detector.
+    )
+    key, metrics = stages.anomalies(run, key, df, metrics, detector) # Scores each transaction against its baseline and keeps the flagged ones in 'metrics' (reused on reruns).
+    key, metrics = stages.recurring(run, key, df, metrics) # Finds subscriptions and other regular payments and adds them to 'metrics' for the table and the AI advice (reused on reruns).
+
+chart_key, charts = stages.charts(run, key, metrics) # Prepares the chart series from the metrics (reused on reruns).
 
 st.header("3. Financial Summary") # Displays a section header for the financial summary.
 
@@ -75,46 +155,129 @@ col3.metric("Net Savings", f"${metrics['net_savings']}") # Displays the Net Savi
 col4.metric("Savings Rate", f"{metrics['savings_rate']}%") # Displays the Savings Rate metric in the fourth column.
 
 # Category Spend
-if metrics["category_spend"] is not None and not metrics["category_spend"].empty: # Checks if category spending data exists and is not empty.
+if charts["category_spend"] is not None and not charts["category_spend"].empty: # Checks if category spending data exists and is not empty.
     st.subheader("Category-wise Spending") # Displays a smaller header for the category spending chart.
-    st.bar_chart(metrics["category_spend"]) # Displays a bar chart using the category spending data.
+    st.bar_chart(charts["category_spend"]) # Displays a bar chart of the largest categories, the rest combined as "Other".
+    payloads["category_spend"] = presentation.payload_bytes(charts["category_spend"]) # Records the size of the category chart data.
 
-# Monthly Trend
-if metrics["monthly_trend"] is not None and not metrics["monthly_trend"].empty: # Checks if monthly trend data exists and is not empty.
+# Trend
+if streamed and charts["monthly_trend"] is not None and not charts["monthly_trend"].empty: # Checks if a streamed CSV has monthly trend data (its rows are not kept for other granularities).
     st.subheader("Monthly Trend") # Displays a smaller header for the monthly trend chart.
-    st.line_chart(metrics["monthly_trend"]) # Displays a line chart using the monthly trend data.
+    st.line_chart(charts["monthly_trend"]) # Displays a line chart using the monthly trend data (downsampled if very long).
+    payloads["monthly_trend"] = presentation.payload_bytes(charts["monthly_trend"]) # Records the size of the trend chart data.
+elif not streamed and not charts["monthly_trend"].empty: # Checks if there are dated transactions to chart over time.
+    cube_key, cube = stages.rollups(run, key, df) # Builds the daily totals per category and sign once per dataset (reused on reruns).
+    granularity = st.selectbox("Trend granularity", list(GRANULARITIES), index=list(GRANULARITIES).index("Monthly")) # Creates a dropdown to choose daily, weekly, monthly, quarterly or yearly periods.
+    _, trends = stages.trend_charts(run, cube_key, cube, GRANULARITIES[granularity]) # Rolls the daily totals up to the chosen period, without going back to the transactions.
+    st.subheader(f"{granularity} Trend") # Displays a smaller header for the trend chart.
+    st.line_chart(trends["trend"]) # Displays the net amount per period.
+    st.subheader("Running Balance") # Displays a smaller header for the running balance chart.
+    st.line_chart(trends["balance"]) # Displays the cumulative net amount at the end of each period.
+    payloads["trend"] = presentation.payload_bytes(trends["trend"]) # Records the size of the trend chart data.
+    payloads["balance"] = presentation.payload_bytes(trends["balance"]) # Records the size of the running balance chart data.
+
+    st.subheader("Forecast") # Displays a smaller header for the cash-flow projection.
+    horizon = st.slider("Months to project", 3, 60, 12) # Creates a slider to choose how far ahead to project.
+    what_if_category = st.selectbox("What if I change spending on", sorted(cube["category"].cat.categories.astype(str))) # Creates a dropdown to choose the category of the what-if scenario.
+    what_if_change = st.slider("Change in that spending (%)", -100, 100, -20, step=5) # Creates a slider for how much that category's spending goes up or down.
+    new_expense = st.number_input("New monthly expense ($)", min_value=0.0, value=0.0, step=50.0) # Creates an input for a new recurring cost, such as rent.
+    scenarios = [{"name": f"{what_if_category} {what_if_change:+d}%", "changes": [{"category": what_if_category, "scale": 1 + what_if_change / 100}]}] # Describes the what-if scenario for the chosen category.
+    if new_expense > 0: # Checks if a new monthly expense was entered.
+        scenarios.append({"name": f"New ${new_expense:,.0f}/month", "changes": [{"category": "New expense", "shift": -new_expense}]}) # Adds a scenario with the new expense charged every month.
+    _, projection = stages.forecast(run, cube_key, cube, scenarios, horizon) # Projects every category with its seasonal pattern and applies all scenarios in one computation (reused on reruns).
+    if projection is not None: # Checks if there was enough dated history to project.
+        st.caption("Projected cumulative savings from next month on, for the baseline and each what-if scenario.") # Explains what the forecast chart shows.
+        st.line_chart(projection) # Displays the projected savings per month, one line per scenario.
+        payloads["forecast"] = presentation.payload_bytes(projection) # Records the size of the forecast chart data.
 
 # Anomalies
-if metrics["anomalies"] is not None and not metrics["anomalies"].empty: # Checks if anomaly data exists and is not empty.
+if charts["anomalies"] is not None and not charts["anomalies"].empty: # Checks if anomaly data exists and is not empty.
     st.subheader("Anomalous Transactions") # Displays a smaller header for the anomalous transactions table.
-    st.dataframe(metrics["anomalies"], use_container_width=True) # Displays the DataFrame of anomalous transactions.
+    st.dataframe(charts["anomalies"], use_container_width=True) # Displays the DataFrame of anomalous transactions (the largest ones if there are very many).
+    anomaly_count = metrics.get("anomaly_count", len(metrics["anomalies"])) # Counts every anomalous transaction (a streamed CSV keeps only the most extreme rows but counts them all).
+    if len(charts["anomalies"]) < anomaly_count: # Checks if the table was cut to the largest amounts.
+        st.caption(f"Showing the {len(charts['anomalies']):,} largest of {anomaly_count:,} anomalous transactions.") # Explains that only part of the list is shown.
+    payloads["anomalies"] = presentation.payload_bytes(charts["anomalies"]) # Records the size of the anomalies table.
+
+# Recurring payments
+recurring = metrics.get("recurring") # Gets the detected regular payments (not computed for streamed CSVs, whose rows are not kept).
+if recurring is not None and not recurring.empty: # Checks if any subscriptions or other regular payments were found.
+    st.subheader("Recurring Payments") # Displays a smaller header for the recurring payments table.
+    active = recurring[recurring["active"]] # Keeps the series that are still being charged.
+    st.caption(f"{len(active):,} active recurring payments cost ${active['annualized_cost'].sum():,.2f} per year.") # Summarizes the yearly cost of the active ones.
+    st.dataframe(recurring.head(presentation.MAX_ANOMALY_ROWS), use_container_width=True) # Displays each series with its period, amount, next expected charge and yearly cost.
+    payloads["recurring"] = presentation.payload_bytes(recurring.head(presentation.MAX_ANOMALY_ROWS)) # Records the size of the recurring payments table.
 
 # -------- AI Advisory --------
 st.header("4. AI Financial Advice (NVIDIA LLM)") # Displays a section header for the AI advice feature.
 
 if st.button("Generate AI Advice"): # Creates an object for a button labeled "Generate AI Advice" and checks if it's clicked.
     with st.spinner("Generating AI-powered financial insights..."): # Creates a context manager that displays a spinning loading indicator while code runs.
-        advice = generate_ai_advice(metrics) # Calls the function to get financial advice from the LLM, passing the calculated metrics. The output text is stored in 'advice'.
-        st.text_area("AI Advice", advice, height=300) # Displays the generated advice text in a non-editable text area.
+        advice = st.write_stream(stream_ai_advice(metrics)) # Renders the LLM's advice token by token as it arrives, passing the calculated metrics. The full text is stored in 'advice'.
+    stats = advisor_stats() # Reads the advisory client's latency, time-to-first-token and cache counters.
+    st.caption( # Displays the advisory call statistics in small text under the advice.
+        f"Latency: {stats['last_latency_s'] or 0:.2f}s | " # Time the last API call took end to end.
+        f"First token: {stats['last_ttft_s'] or 0:.2f}s | " # Time until the first piece of advice arrived.
+        f"Cache hit rate: {stats['cache_hit_rate']:.0%}" # Share of advice requests answered from the cache.
+    )
 
 # -------- Download Report --------
 st.header("5. Download Report") # Displays a section header for the report download feature.
 
-report_text = f""" # Starts the creation of a multiline string object using f-string formatting for the downloadable report content.
-AI Financial Analyzer Report # Line of text in the report.
-
-Total Income: ${metrics['total_income']} # Inserts the calculated total income into the report text.
-Total Expenses: ${metrics['total_expenses']} # Inserts the calculated total expenses into the report text.
-Net Savings: ${metrics['net_savings']} # Inserts the calculated net savings into the report text.
-Savings Rate: {metrics['savings_rate']}% # Inserts the calculated savings rate into the report text.
-
-Disclaimer: # Line of text in the report.
-This is educational financial guidance, not professional financial advice. # Line of text in the report.
-""" # Ends the multiline string definition.
+report_key, report_text = stages.report(run, key, metrics) # Builds the downloadable report text from the metrics (reused on reruns).
 
 st.download_button( # Creates an object for a download button widget.
     label="Download Report (TXT)", # Sets the label text displayed on the button.
     data=report_text, # Provides the 'report_text' string object as the content to be downloaded.
     file_name="financial_report.txt", # Specifies the default filename for the downloaded file.
     mime="text/plain" # Specifies the MIME type of the file (plain text).
-)
\ No newline at end of file
+)
+
+# -------- History --------
+st.header("6. History") # Displays a section header for queries over every saved statement.
+
+history_key, overview = stages.history_overview(run, store) # Reads the saved date range, categories and statements, again only after something new is saved.
+if overview["first"] is None: # Checks if nothing has been saved to the history yet.
+    st.info("Tick 'Save these transactions to my history' to build a history across statements.") # Explains how to start a history.
+else: # Runs the history query when saved transactions exist.
+    history_range = st.date_input("Date range", value=(overview["first"].date(), overview["last"].date())) # Creates a date range picker, defaulting to all saved history.
+    history_categories = st.multiselect("Categories", overview["categories"]) # Creates a picker for the categories to include; none selected means all.
+    if isinstance(history_range, (tuple, list)) and len(history_range) == 2: # Checks that both ends of the range have been picked.
+        history_end = pd.Timestamp(history_range[1]) + pd.Timedelta(days=1) # Day after the last day, since the end is exclusive.
+        _, history_repeated = stages.history_repeats(run, history_key, store, history_range[0], history_end, history_categories or None) # Counts saved transactions that repeat one from an earlier statement.
+        drop_history_repeats = history_repeated > 0 and st.checkbox( # Lets the user confirm before repeated transactions are left out, since two statements can hold genuinely separate charges.
+            f"Leave out {history_repeated:,} transactions that repeat one from an earlier statement (same day, amount and description)", # Checkbox label with the number of repeated transactions.
+            value=False # Keeps every saved transaction unless the user confirms.
+        )
+        _, history = stages.history_metrics( # Aggregates the saved transactions inside the database, reusing the result while the filters and the history are unchanged.
+            run, # Records the query in the pipeline stage timings.
+            history_key, # Ties the result to the current contents of the history.
+            store, # The history database to query.
+            history_range[0], # First day included.
+            history_end, # Day after the last day included.
+            history_categories or None, # Restricts to the chosen categories, if any.
+            drop_history_repeats # Leaves out the repeated transactions only once confirmed.
+        )
+        hcol1, hcol2, hcol3 = st.columns(3) # Creates three column layout objects for the history totals.
+        hcol1.metric("Income", f"${history['total_income']}") # Displays the income in the chosen range.
+        hcol2.metric("Expenses", f"${history['total_expenses']}") # Displays the expenses in the chosen range.
+        hcol3.metric("Net Savings", f"${history['net_savings']}") # Displays the net savings in the chosen range.
+        if not history["monthly_trend"].empty: # Checks if any dated transactions matched.
+            st.line_chart(presentation.downsample(history["monthly_trend"]).to_timestamp()) # Displays the monthly net amount over the chosen range.
+        if history["anomaly_count"]: # Checks if any saved transactions in the range are unusually large.
+            st.caption(f"{history['anomaly_count']:,} unusually large transactions in this range.") # Displays how many anomalies the history holds, counted in the database.
+    with st.expander("Saved statements"): # Creates a collapsible panel listing what the history holds.
+        st.dataframe(overview["statements"], use_container_width=True) # Displays each saved statement with its row count and date added.
+
+# -------- Debug --------
+with st.expander("Debug: pipeline stages"): # Creates a collapsible panel for diagnostic information.
+    st.dataframe(run.timings(), use_container_width=True) # Displays each stage's input fingerprint, cache hit/miss and time in milliseconds.
+    parse_cache = default_cache().stats() # Reads the parse cache's counters, including uploads parsed in worker processes.
+    st.caption( # Displays the parse cache statistics in small text under the stage timings.
+        f"Parse cache: {parse_cache['hits']} hits | {parse_cache['misses']} misses | " # Uploads served from the cache and uploads that had to be parsed.
+        f"hit rate {parse_cache['hit_rate']:.0%} | {parse_cache['bytes_saved'] / 1e6:.1f} MB not re-parsed | " # Share of lookups that hit and the upload bytes whose parsing was skipped.
+        f"{parse_cache['size_bytes'] / 1e6:.1f} MB on disk, {parse_cache['evictions']} evicted" # Size of the cache directory and files removed to stay under its limit.
+    )
+    st.dataframe(pd.Series(payloads, name="bytes", dtype="int64").rename_axis("widget"), use_container_width=True) # Displays how many bytes each table and chart sent to the browser.
+    if instrumentation.is_enabled(): # Checks if instrumentation was switched on with FINANCE_ANALYZER_INSTRUMENT=1.
+        st.code(instrumentation.prometheus_text(), language="text") # Displays call counts, rows, bytes, memory and duration histograms per parser, metrics step and LLM call, followed by the parse cache counters.
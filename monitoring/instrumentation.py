@@ -0,0 +1,328 @@
+"""
+Lightweight timing of the analyzer's hot paths.
+
+Functions decorated with @instrumented("name") record, per call, the
+duration, rows returned, bytes received and resident memory change. Calls
+are aggregated per name for a Prometheus text exposition (file or HTTP
+endpoint) and each one is logged as a JSON line on the
+"finance_analyzer.instrumentation" logger.
+
+Recording is off unless FINANCE_ANALYZER_INSTRUMENT=1 or enable() is
+called; a disabled decorator costs one flag check per call. Calls made in
+worker processes (parse_pdf's pool, multi-file uploads) are not seen by
+the parent.
+
+Components that keep their own counters (the parse cache) register a
+collector, read whenever the exposition is rendered.
+"""
+import atexit
+import functools
+import inspect
+import json
+import logging
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ENV_ENABLED = "FINANCE_ANALYZER_INSTRUMENT"
+ENV_PROM_FILE = "FINANCE_ANALYZER_PROM_FILE"
+ENV_PROM_PORT = "FINANCE_ANALYZER_METRICS_PORT"
+
+METRIC_PREFIX = "finance_analyzer"
+
+# The Prometheus file is rewritten at most this often (and at exit)
+PROM_FILE_INTERVAL_SECONDS = 1.0
+
+# Upper bounds (seconds) of the duration histogram buckets
+DURATION_BUCKETS = (0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0)
+
+logger = logging.getLogger("finance_analyzer.instrumentation")
+
+_enabled = os.getenv(ENV_ENABLED, "").lower() in ("1", "true", "yes")
+_prom_file = os.getenv(ENV_PROM_FILE)
+_prom_written_at = 0.0
+
+_totals = {}
+_totals_lock = threading.Lock()
+_collectors = {}
+_server = None
+_server_lock = threading.Lock()
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def enable(flag: bool = True, prom_file: str = None):
+    """
+    Turns recording on or off; `prom_file` is rewritten as calls come in.
+    """
+    global _enabled, _prom_file
+    _enabled = flag
+    if prom_file is not None:
+        _prom_file = prom_file
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def reset():
+    with _totals_lock:
+        _totals.clear()
+
+
+def register_collector(name: str, collect, counters=()):
+    """
+    Adds `collect()` -> {field: number} to the exposition as
+    finance_analyzer_<name>_<field>; fields listed in `counters` are
+    exported as counters, the rest as gauges.
+    """
+    with _totals_lock:
+        _collectors[name] = (collect, tuple(counters))
+
+
+def _rss_bytes():
+    """
+    Current resident set size, or None where /proc is unavailable.
+    """
+    try:
+        with open("/proc/self/statm") as fh:
+            return int(fh.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _size_of(value):
+    """
+    Bytes in an input (bytes, text, file upload or array), None if unknown.
+    """
+    if isinstance(value, (bytes, bytearray, str)):
+        return len(value)
+    if hasattr(value, "getbuffer"):
+        return value.getbuffer().nbytes
+    if isinstance(getattr(value, "size", None), int) and hasattr(value, "getvalue"):
+        return value.size
+    if hasattr(value, "nbytes"):
+        return int(value.nbytes)
+    return None
+
+
+def _rows_of(value):
+    if hasattr(value, "shape") and getattr(value, "ndim", 0) >= 1:
+        return int(value.shape[0])
+    return None
+
+
+def record(name: str, seconds: float, rows=None, bytes_in=None, memory_delta=None, error=None):
+    """
+    Adds one call to the aggregates and logs it.
+    """
+    with _totals_lock:
+        totals = _totals.get(name)
+        if totals is None:
+            totals = _totals[name] = {
+                "calls": 0,
+                "errors": 0,
+                "seconds": 0.0,
+                "rows": 0,
+                "bytes_in": 0,
+                "memory_delta_bytes": 0,
+                "buckets": [0] * len(DURATION_BUCKETS),
+            }
+        totals["calls"] += 1
+        totals["errors"] += error is not None
+        totals["seconds"] += seconds
+        totals["rows"] += rows or 0
+        totals["bytes_in"] += bytes_in or 0
+        totals["memory_delta_bytes"] = memory_delta or 0
+        for i, bound in enumerate(DURATION_BUCKETS):
+            if seconds <= bound:
+                totals["buckets"][i] += 1
+
+    logger.info(json.dumps({
+        "event": "span",
+        "name": name,
+        "seconds": round(seconds, 6),
+        "rows": rows,
+        "bytes_in": bytes_in,
+        "memory_delta_bytes": memory_delta,
+        "error": error,
+    }))
+
+    global _prom_written_at
+    if _prom_file and time.monotonic() - _prom_written_at >= PROM_FILE_INTERVAL_SECONDS:
+        _prom_written_at = time.monotonic()
+        write_prometheus(_prom_file)
+
+
+class _Span:
+    """
+    Measures one call; `rows` can be set by the caller before it ends.
+    """
+
+    def __init__(self, name: str, bytes_in=None):
+        self.name = name
+        self.bytes_in = bytes_in
+        self.rows = None
+
+    def __enter__(self):
+        self._rss = _rss_bytes()
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        seconds = time.perf_counter() - self._start
+        rss = _rss_bytes()
+        delta = rss - self._rss if rss is not None and self._rss is not None else None
+        error = f"{exc_type.__name__}: {exc}" if exc_type is not None else None
+        record(self.name, seconds, self.rows, self.bytes_in, delta, error)
+        return False
+
+
+class _NullSpan:
+    rows = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def span(name: str, bytes_in=None):
+    """
+    Context manager timing a block:  with span("metrics.totals") as s: ...
+    """
+    return _Span(name, bytes_in) if _enabled else _NULL_SPAN
+
+
+def instrumented(name: str):
+    """
+    Decorator recording every call of a function under `name`. Bytes in
+    are taken from the first argument, rows from a returned frame or array.
+    Generator functions are timed until the generator is exhausted.
+    """
+
+    def decorate(fn):
+        if inspect.isgeneratorfunction(fn):
+            @functools.wraps(fn)
+            def generator_wrapper(*args, **kwargs):
+                if not _enabled:
+                    return (yield from fn(*args, **kwargs))
+                with _Span(name, _size_of(args[0]) if args else None):
+                    return (yield from fn(*args, **kwargs))
+
+            return generator_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            with _Span(name, _size_of(args[0]) if args else None) as measured:
+                result = fn(*args, **kwargs)
+                measured.rows = _rows_of(result)
+            return result
+
+        return wrapper
+
+    return decorate
+
+
+def snapshot() -> dict:
+    """
+    Copy of the aggregates per name.
+    """
+    with _totals_lock:
+        return {name: {**totals, "buckets": list(totals["buckets"])} for name, totals in _totals.items()}
+
+
+def prometheus_text() -> str:
+    """
+    Aggregates in the Prometheus text exposition format.
+    """
+    totals = snapshot()
+    lines = []
+
+    def family(metric: str, kind: str, help_text: str, field: str):
+        lines.append(f"# HELP {METRIC_PREFIX}_{metric} {help_text}")
+        lines.append(f"# TYPE {METRIC_PREFIX}_{metric} {kind}")
+        for name, values in sorted(totals.items()):
+            lines.append(f'{METRIC_PREFIX}_{metric}{{stage="{name}"}} {values[field]}')
+
+    family("calls_total", "counter", "Calls per instrumented stage.", "calls")
+    family("errors_total", "counter", "Calls that raised.", "errors")
+    family("rows_total", "counter", "Rows returned.", "rows")
+    family("input_bytes_total", "counter", "Bytes of input received.", "bytes_in")
+    family("memory_delta_bytes", "gauge", "Resident memory change during the last call.", "memory_delta_bytes")
+
+    metric = f"{METRIC_PREFIX}_duration_seconds"
+    lines.append(f"# HELP {metric} Wall time per call.")
+    lines.append(f"# TYPE {metric} histogram")
+    for name, values in sorted(totals.items()):
+        for bound, count in zip(DURATION_BUCKETS, values["buckets"]):
+            lines.append(f'{metric}_bucket{{stage="{name}",le="{bound}"}} {count}')
+        lines.append(f'{metric}_bucket{{stage="{name}",le="+Inf"}} {values["calls"]}')
+        lines.append(f'{metric}_sum{{stage="{name}"}} {values["seconds"]:.6f}')
+        lines.append(f'{metric}_count{{stage="{name}"}} {values["calls"]}')
+
+    with _totals_lock:
+        collectors = dict(_collectors)
+    for name, (collect, counters) in sorted(collectors.items()):
+        for field, value in collect().items():
+            kind = "counter" if field in counters else "gauge"
+            metric = f"{METRIC_PREFIX}_{name}_{field}" + ("_total" if kind == "counter" else "")
+            lines.append(f"# TYPE {metric} {kind}")
+            lines.append(f"{metric} {value}")
+
+    return "\n".join(lines) + "\n"
+
+
+def write_prometheus(path: str):
+    """
+    Writes the exposition atomically (for node_exporter's textfile collector).
+    """
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as fh:
+        fh.write(prometheus_text())
+    os.replace(tmp_path, path)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.rstrip("/") not in ("", "/metrics"):
+            self.send_error(404)
+            return
+
+        body = prometheus_text().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def serve_metrics(port: int = None, host: str = "0.0.0.0"):
+    """
+    Serves /metrics from a background thread, once per process. The port
+    defaults to FINANCE_ANALYZER_METRICS_PORT; nothing starts without one.
+    """
+    global _server
+    port = port or int(os.getenv(ENV_PROM_PORT, 0))
+
+    with _server_lock:
+        if _server is None and port:
+            _server = ThreadingHTTPServer((host, port), _MetricsHandler)
+            threading.Thread(target=_server.serve_forever, daemon=True).start()
+    return _server
+
+
+@atexit.register
+def _flush_prometheus():
+    if _prom_file and _totals:
+        write_prometheus(_prom_file)
@@ -0,0 +1,220 @@
+import hashlib
+import os
+import tempfile
+import threading
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+from monitoring import instrumentation
+
+CACHE_DIR = os.getenv(
+    "FINANCE_ANALYZER_CACHE_DIR",
+    os.path.join(tempfile.gettempdir(), "ai-financial-analyzer-cache"),
+)
+
+# Total size of cached frames on disk before the least recently used are evicted
+MAX_CACHE_BYTES = int(os.getenv("FINANCE_ANALYZER_CACHE_BYTES", 512 * 1024 * 1024))
+
+CACHE_SUFFIX = ".arrow"
+
+# Counters that only grow; worker processes report them back to the parent
+COUNTERS = ("hits", "misses", "bytes_saved", "evictions")
+
+# Part of every cache key; bump it whenever a parser's output changes so
+# frames cached by the old code are never served
+CACHE_VERSION = 6
+
+# Parser options that change how a file is parsed, not the frame that comes
+# out (parse_pdf's process count); left out of cache keys
+UNKEYED_OPTIONS = ("workers",)
+
+
+class ParseCache:
+    """
+    Content-addressed on-disk cache of parsed uploads.
+
+    Frames are stored as uncompressed Arrow (Feather v2) files named by the
+    SHA-256 of the parser name, its options and the uploaded bytes, and are
+    memory-mapped back on a hit so numeric columns are not copied. The
+    directory is kept under `max_bytes` by evicting the least recently used
+    files.
+    """
+
+    def __init__(self, directory: str = CACHE_DIR, max_bytes: int = MAX_CACHE_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key(parser_name: str, data: bytes, options: dict = None) -> str:
+        """
+        Cache key of `data` parsed by `parser_name` with keyword `options`
+        (e.g. all_sheets=True for parse_excel). UNKEYED_OPTIONS are ignored.
+        """
+        options = sorted((name, value) for name, value in (options or {}).items() if name not in UNKEYED_OPTIONS)
+        digest = hashlib.sha256(f"{CACHE_VERSION}:{parser_name}:{options!r}".encode())
+        digest.update(b"\0")
+        digest.update(data)
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + CACHE_SUFFIX)
+
+    def get(self, key: str, source_bytes: int = 0):
+        """
+        Returns the cached frame for `key`, or None on a miss.
+        """
+        path = self._path(key)
+        try:
+            table = feather.read_table(path, memory_map=True)
+        except (FileNotFoundError, pa.ArrowInvalid):
+            with self._lock:
+                self.misses += 1
+            return None
+
+        # Touch the file so eviction treats it as recently used
+        os.utime(path)
+
+        with self._lock:
+            self.hits += 1
+            self.bytes_saved += source_bytes
+
+        return table.to_pandas(split_blocks=True)
+
+    def put(self, key: str, df: pd.DataFrame):
+        """
+        Stores a parsed frame. Frames Arrow cannot represent are skipped.
+        """
+        try:
+            table = pa.Table.from_pandas(df, preserve_index=False)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            return
+
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        os.close(fd)
+        try:
+            feather.write_feather(table, tmp_path, compression="uncompressed")
+            os.replace(tmp_path, self._path(key))
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+        self._evict()
+
+    def _evict(self):
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(CACHE_SUFFIX):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, name))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                continue
+            total -= size
+            with self._lock:
+                self.evictions += 1
+
+    def size_bytes(self) -> int:
+        return sum(
+            os.path.getsize(os.path.join(self.directory, name))
+            for name in os.listdir(self.directory)
+            if name.endswith(CACHE_SUFFIX)
+        )
+
+    def counters(self) -> dict:
+        with self._lock:
+            return {name: getattr(self, name) for name in COUNTERS}
+
+    def add(self, counts: dict):
+        """
+        Adds counter deltas measured by another process's cache (a worker
+        of parse_uploads' pool) so stats() covers every upload.
+        """
+        with self._lock:
+            for name in COUNTERS:
+                setattr(self, name, getattr(self, name) + counts.get(name, 0))
+
+    def stats(self) -> dict:
+        """
+        Counters for monitoring: hits, misses, hit rate, source bytes whose
+        parsing was skipped, evictions and current size on disk.
+        """
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "bytes_saved": self.bytes_saved,
+            "evictions": self.evictions,
+            "size_bytes": self.size_bytes(),
+        }
+
+
+_default_cache = None
+
+
+def default_cache() -> ParseCache:
+    """
+    Process-wide cache shared by every caller of cached_parse; its stats
+    are exported with the instrumentation metrics.
+    """
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = ParseCache()
+        instrumentation.register_collector("parse_cache", lambda: default_cache().stats(), counters=COUNTERS)
+    return _default_cache
+
+
+def source_bytes(source) -> bytes:
+    """
+    Bytes of an uploaded file-like object or, for parse_text, a string.
+    """
+    if isinstance(source, str):
+        data = source.encode("utf-8")
+    elif hasattr(source, "getvalue"):
+        data = source.getvalue()
+    else:
+        data = source.read()
+
+    return data.encode("utf-8") if isinstance(data, str) else data
+
+
+def cached_parse(parser, source, cache: ParseCache = None, key: str = None, **options) -> pd.DataFrame:
+    """
+    Runs `parser(source, **options)` unless the same bytes were parsed
+    before with the same options. `source` is an uploaded file-like object
+    or, for parse_text, a string. `key` is the ParseCache.key of the source
+    when the caller has already hashed it, so the bytes are not hashed twice.
+    """
+    cache = cache or default_cache()
+
+    data = source_bytes(source)
+    if key is None:
+        key = cache.key(parser.__name__, data, options)
+    df = cache.get(key, source_bytes=len(data))
+    if df is not None:
+        return df
+
+    if hasattr(source, "seek"):
+        source.seek(0)
+
+    df = parser(source, **options)
+    cache.put(key, df)
+    return df
@@ -1,7 +1,14 @@
 import pandas as pd
 
-REQUIRED_COLUMNS = ["date", "description", "amount", "category"]
+from analysis.incremental import IncrementalMetrics
+from monitoring.instrumentation import instrumented
+from parsers.schema import REQUIRED_COLUMNS, normalize_frame
 
+# Rows per chunk when streaming large CSV exports
+DEFAULT_CHUNKSIZE = 100_000
+
+
+@instrumented("parse_csv")
 def parse_csv(file) -> pd.DataFrame:
     """
     Reads a CSV file-like object and normalizes it to:
@@ -10,39 +17,39 @@ def parse_csv(file) -> pd.DataFrame:
 
     df = pd.read_csv(file)
 
-    # Normalize column names
-    df.columns = [c.strip().lower() for c in df.columns]
+    return normalize_frame(df, source="CSV")
 
-    # Map flexible column names
-    column_map = {}
 
-    for col in df.columns:
-        if "date" in col:
-            column_map[col] = "date"
-        elif "desc" in col or "merchant" in col or "detail" in col:
-            column_map[col] = "description"
-        elif "amount" in col or "amt" in col or "value" in col:
-            column_map[col] = "amount"
-        elif "category" in col or "type" in col:
-            column_map[col] = "category"
+def iter_csv_chunks(file, chunksize: int = DEFAULT_CHUNKSIZE):
+    """
+    Reads a CSV file-like object in chunks of `chunksize` rows and yields
+    each chunk normalized to:
+    date | description | amount | category
+    The column mapping is worked out once from the header and cached.
+    """
 
-    df = df.rename(columns=column_map)
+    with pd.read_csv(file, chunksize=chunksize) as reader:
+        for chunk in reader:
+            yield normalize_frame(chunk, source="CSV")
 
-    # Ensure required columns exist
-    if "date" not in df:
-        df["date"] = "Unknown"
-    if "description" not in df:
-        df["description"] = "Unknown"
-    if "category" not in df:
-        df["category"] = "Uncategorized"
 
-    if "amount" not in df:
-        raise ValueError("CSV must contain an amount column")
+def stream_csv_metrics(file, chunksize: int = DEFAULT_CHUNKSIZE, transform=None) -> dict:
+    """
+    Computes the compute_financial_metrics dict for a CSV without loading it
+    whole, in one pass: every chunk is folded into an IncrementalMetrics.
+    Peak memory is one chunk plus the quantile sketch and at most
+    2 x MAX_ANOMALY_ROWS anomalous rows; "anomaly_count" holds how many
+    rows fall outside the fences. The file is read once, so it need not be
+    seekable. `transform`, if given, is applied to every normalized chunk
+    first.
+    """
 
-    # Keep only standard schema
-    df = df[REQUIRED_COLUMNS]
+    chunks = iter_csv_chunks(file, chunksize)
+    if transform is not None:
+        chunks = map(transform, chunks)
 
-    # Clean amount
-    df["amount"] = pd.to_numeric(df["amount"], errors="coerce").fillna(0)
+    metrics = IncrementalMetrics()
+    for chunk in chunks:
+        metrics.update(chunk)
 
-    return df
+    return metrics.to_metrics()
@@ -0,0 +1,230 @@
+import re
+import threading
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+# Tried in order; on a tie the earlier format wins (US month/day first)
+DATE_FORMATS = [
+    "%Y-%m-%d",
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%dT%H:%M:%S",
+    "%Y-%m-%d %H:%M",
+    "%Y/%m/%d",
+    "%m/%d/%Y",
+    "%d/%m/%Y",
+    "%m/%d/%Y %H:%M",
+    "%d/%m/%Y %H:%M",
+    "%m/%d/%Y %H:%M:%S",
+    "%d/%m/%Y %H:%M:%S",
+    "%m/%d/%y",
+    "%d/%m/%y",
+    "%m-%d-%Y",
+    "%d-%m-%Y",
+    "%d.%m.%Y",
+    "%Y%m%d",
+    "%d-%b-%Y",
+    "%d %b %Y",
+    "%b %d, %Y",
+    "%b %d %Y",
+    "%d-%b-%y",
+]
+
+# Distinct values used to pick a format
+SAMPLE_SIZE = 256
+
+# Formats remembered per value signature
+MAX_CACHED_SIGNATURES = 256
+
+# If more than this share of values miss the cached format, infer again
+# from the column itself rather than trusting the cache
+REINFER_MISS_RATE = 0.05
+
+# Largest day / second an impossible value rolls forward to (Feb 31 ->
+# Mar 3, :61 -> :01)
+ROLLOVER_MAX_DAY = 3
+ROLLOVER_MAX_SECOND = 1
+
+# Columns whose leading rows are mostly distinct are parsed without
+# deduplicating first, since hashing every string would cost more
+DISTINCT_PROBE_ROWS = 10_000
+DISTINCT_RATIO = 0.5
+
+_SHAPE_LETTERS = re.compile(r"[A-Za-z]+")
+_SHAPE_DIGITS = re.compile(r"\d")
+
+_formats = {}
+_formats_lock = threading.Lock()
+
+
+def _shape(value: str) -> str:
+    return _SHAPE_DIGITS.sub("9", _SHAPE_LETTERS.sub("a", value.strip()))
+
+
+def _canonical(strings: pa.Array) -> pa.Array:
+    """
+    Lower case with leading zeros of numbers dropped: "05-Jan-2024" and
+    "5-jan-2024" compare equal.
+    """
+    return pc.replace_substring_regex(pc.utf8_lower(strings), pattern=r"(^|\D)0+(\d)", replacement=r"\1\2")
+
+
+def _strptime(strings: pa.Array, fmt: str) -> pa.Array:
+    """
+    Timestamps parsed with `fmt`, null where a value does not parse or is
+    not a real date. pc.strptime rolls impossible values forward
+    (2024-02-30 -> 2024-03-01, :60 seconds -> the next minute), so results
+    that could have rolled over are formatted back and compared with their
+    input.
+    """
+    trimmed = pc.utf8_trim_whitespace(strings)
+    parsed = pc.strptime(trimmed, format=fmt, unit="s", error_is_null=True)
+    if parsed.null_count == len(parsed):
+        return parsed
+
+    # A rolled-over day lands on the 1st to 3rd of the next month and a
+    # rolled-over second on :00 or :01; only those rows are checked
+    suspect = pc.less_equal(pc.day(parsed), ROLLOVER_MAX_DAY)
+    if "%S" in fmt:
+        suspect = pc.or_(suspect, pc.less_equal(pc.second(parsed), ROLLOVER_MAX_SECOND))
+    rows = pc.indices_nonzero(pc.fill_null(suspect, False))
+    if len(rows) == 0:
+        return parsed
+
+    formatted = pc.strftime(pc.take(parsed, rows), format=fmt)
+    same = pc.equal(_canonical(formatted), _canonical(pc.take(trimmed, rows)))
+
+    valid = np.ones(len(parsed), dtype=bool)
+    valid[rows.to_numpy()] = same.to_numpy(zero_copy_only=False)
+    return pc.if_else(pa.array(valid), parsed, pa.scalar(None, type=parsed.type))
+
+
+def infer_date_format(sample) -> str:
+    """
+    The format in DATE_FORMATS that parses most of `sample` (strings), or
+    None if none parses any.
+    """
+    strings = pa.array([str(v) for v in sample], type=pa.string())
+    best, best_parsed = None, 0
+
+    for fmt in DATE_FORMATS:
+        parsed = len(strings) - _strptime(strings, fmt).null_count
+        if parsed > best_parsed:
+            best, best_parsed = fmt, parsed
+            if parsed == len(strings):
+                break
+
+    return best
+
+
+def _sample(strings: np.ndarray) -> list:
+    present = [s for s in pd.unique(strings[:SAMPLE_SIZE * 16]) if isinstance(s, str) and s.strip()]
+    return present[:SAMPLE_SIZE]
+
+
+def _signature(sample: list) -> tuple:
+    """
+    The set of value shapes in a sample: "01/31/2024" -> "99/99/9999".
+    """
+    return tuple(sorted({_shape(s) for s in sample}))
+
+
+def _remember(signature: tuple, fmt):
+    with _formats_lock:
+        if signature not in _formats and len(_formats) >= MAX_CACHED_SIGNATURES:
+            _formats.pop(next(iter(_formats)))
+        _formats[signature] = fmt
+
+
+def date_format_for(strings: np.ndarray) -> tuple:
+    """
+    Date format for a column of strings, inferred from a sample once per
+    signature so files with the same layout skip inference.
+    Returns (format or None, signature, whether it came from the cache).
+    """
+    sample = _sample(strings)
+    signature = _signature(sample)
+
+    with _formats_lock:
+        if signature in _formats:
+            return _formats[signature], signature, True
+
+    fmt = infer_date_format(sample)
+    _remember(signature, fmt)
+    return fmt, signature, False
+
+
+def _as_strings(values: pd.Series) -> np.ndarray:
+    """
+    Object array of str or None; non-strings (numbers, datetime objects
+    from Excel) are stringified.
+    """
+    if pd.api.types.infer_dtype(values, skipna=True) not in ("string", "empty"):
+        values = values.where(values.isna(), values.astype(str))
+    return values.to_numpy(dtype=object, na_value=None)
+
+
+def _parse(strings: np.ndarray, fmt) -> tuple:
+    """
+    Parses with one explicit format; values that do not conform go through
+    pandas' per-value "mixed" parser. Returns (datetime64[ns] array with NaT
+    where nothing parsed, share of non-empty values the format missed).
+    """
+    array = pa.array(strings, type=pa.string(), from_pandas=True)
+    if fmt is None:
+        parsed = np.full(len(strings), np.datetime64("NaT"), dtype="datetime64[ns]")
+    else:
+        parsed = _strptime(array, fmt).to_numpy(zero_copy_only=False).astype("datetime64[ns]")
+
+    non_empty = pc.fill_null(pc.greater(pc.utf8_length(pc.utf8_trim_whitespace(array)), 0), False)
+    missing = np.isnat(parsed) & non_empty.to_numpy(zero_copy_only=False)
+    miss_rate = missing.sum() / max(pc.sum(non_empty).as_py() or 0, 1)
+
+    if missing.any():
+        # Offsets are converted to UTC, so values with different time zones
+        # end up in one naive column
+        fallback = pd.to_datetime(pd.Series(strings[missing], dtype=object), errors="coerce", format="mixed", utc=True)
+        parsed[missing] = fallback.dt.tz_convert(None).to_numpy(dtype="datetime64[ns]")
+
+    return parsed, miss_rate
+
+
+def parse_date_strings(values) -> np.ndarray:
+    """
+    Converts a column of date strings to datetime64[ns] (NaT for missing or
+    unparseable values) using one explicit format inferred from a sample
+    and cached, with a per-value fallback for rows that do not conform.
+    Low-cardinality columns are parsed once per distinct value.
+    """
+    values = pd.Series(values, dtype=object)
+    if len(values) == 0:
+        return np.empty(0, dtype="datetime64[ns]")
+
+    probe = values.iloc[:DISTINCT_PROBE_ROWS]
+    dedupe = probe.nunique(dropna=False) <= DISTINCT_RATIO * len(probe)
+    if dedupe:
+        codes, uniques = pd.factorize(values)
+        values = pd.Series(uniques, dtype=object)
+
+    strings = _as_strings(values)
+
+    fmt, signature, cached = date_format_for(strings)
+    parsed, miss_rate = _parse(strings, fmt)
+
+    # A cached format that misses often came from a file with the same
+    # layout but another order (day/month vs month/day); infer from all of
+    # this column's values instead
+    if cached and miss_rate > REINFER_MISS_RATE:
+        fresh = infer_date_format(strings[pd.notna(strings)])
+        if fresh != fmt:
+            _remember(signature, fresh)
+            parsed, _ = _parse(strings, fresh)
+
+    if not dedupe:
+        return parsed
+
+    dates = parsed[codes] if len(parsed) else np.full(len(codes), np.datetime64("NaT"), dtype="datetime64[ns]")
+    dates[codes < 0] = np.datetime64("NaT")
+    return dates
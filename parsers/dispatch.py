@@ -0,0 +1,38 @@
+import os
+
+from parsers.csv_parser import parse_csv
+from parsers.excel_parser import parse_excel
+from parsers.pdf_parser import parse_pdf
+from parsers.text_parser import parse_text, parse_text_stream
+
+PARSERS_BY_EXTENSION = {
+    ".csv": parse_csv,
+    ".xlsx": parse_excel,
+    ".pdf": parse_pdf,
+    ".txt": parse_text,
+}
+
+
+def parser_for(name: str):
+    """
+    Returns the parse_* function for a file name, or None if unsupported.
+    """
+    return PARSERS_BY_EXTENSION.get(os.path.splitext(name)[1].lower())
+
+
+def parse_path(path: str, workers: int = None):
+    """
+    Parses a file on disk with the parser matching its extension. `workers`
+    is passed to parse_pdf, which otherwise starts one process per CPU; text
+    files are streamed line by line rather than read whole.
+    """
+    parser = parser_for(path)
+    if parser is None:
+        raise ValueError(f"Unsupported file type: {path}")
+
+    if parser is parse_text:
+        with open(path, encoding="utf-8", errors="replace") as fh:
+            return parse_text_stream(fh)
+
+    with open(path, "rb") as fh:
+        return parser(fh, workers=workers) if parser is parse_pdf else parser(fh)
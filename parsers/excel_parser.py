@@ -1,59 +1,83 @@
 import pandas as pd
+from openpyxl import load_workbook
+from pandas.api.types import union_categoricals
 
-REQUIRED_COLUMNS = ["date", "description", "amount", "category"]
+from monitoring.instrumentation import instrumented
+from parsers.schema import REQUIRED_COLUMNS, from_columns, map_columns, normalize_header
 
-def parse_excel(file) -> pd.DataFrame:
+
+def _sheet_headers(ws) -> list:
     """
-    Reads an Excel (.xlsx) file, auto-detects the first valid sheet,
-    and normalizes it to:
-    date | description | amount | category
+    Reads only the first row of a worksheet, normalized to lower case.
+    """
+    for row in ws.iter_rows(min_row=1, max_row=1, values_only=True):
+        return [normalize_header(c) for c in row]
+    return []
+
+
+def _read_columns(ws, column_map: dict) -> dict:
+    """
+    Streams the data rows of a worksheet, keeping only the mapped columns.
     """
+    positions = sorted(column_map)
+    first, last = positions[0], positions[-1]
+    offsets = [p - first for p in positions]
+    columns = {column_map[p]: [] for p in positions}
+    targets = [columns[column_map[p]] for p in positions]
 
-    xls = pd.ExcelFile(file)
-    df = None
+    for row in ws.iter_rows(min_row=2, min_col=first + 1, max_col=last + 1, values_only=True):
+        values = [row[o] if o < len(row) else None for o in offsets]
+        if all(v is None for v in values):
+            continue
+        for target, value in zip(targets, values):
+            target.append(value)
 
-    # Find the first sheet with an amount-like column
-    for sheet_name in xls.sheet_names:
-        temp_df = xls.parse(sheet_name)
-        temp_df.columns = [c.strip().lower() for c in temp_df.columns]
+    return columns
 
-        if any("amount" in c or "amt" in c or "value" in c for c in temp_df.columns):
-            df = temp_df
-            break
 
-    if df is None:
-        raise ValueError("No valid sheet with amount column found in Excel file")
+def _stack(frames: list) -> pd.DataFrame:
+    """
+    Stacks per-sheet frames. A plain concat turns categoricals with
+    different categories into object columns, so description and category
+    are rebuilt over the union of every sheet's categories.
+    """
+    df = pd.concat(frames, ignore_index=True)
+    for column in ("description", "category"):
+        df[column] = union_categoricals([frame[column] for frame in frames])
+    return df
+
 
-    # Normalize column names
-    column_map = {}
+@instrumented("parse_excel")
+def parse_excel(file, all_sheets: bool = False) -> pd.DataFrame:
+    """
+    Reads an Excel (.xlsx) file, auto-detects the first valid sheet,
+    and normalizes it to:
+    date | description | amount | category
 
-    for col in df.columns:
-        if "date" in col:
-            column_map[col] = "date"
-        elif "desc" in col or "merchant" in col or "detail" in col:
-            column_map[col] = "description"
-        elif "amount" in col or "amt" in col or "value" in col:
-            column_map[col] = "amount"
-        elif "category" in col or "type" in col:
-            column_map[col] = "category"
+    Only the header row of each sheet is read to pick the target sheet,
+    then that sheet is streamed in read-only mode keeping just the mapped
+    columns. With all_sheets=True every sheet with an amount-like column is
+    read and the results are stacked into one frame.
+    """
 
-    df = df.rename(columns=column_map)
+    wb = load_workbook(file, read_only=True, data_only=True)
 
-    # Ensure required columns
-    if "date" not in df:
-        df["date"] = "Unknown"
-    if "description" not in df:
-        df["description"] = "Unknown"
-    if "category" not in df:
-        df["category"] = "Uncategorized"
+    try:
+        frames = []
 
-    if "amount" not in df:
-        raise ValueError("Excel file must contain an amount column")
+        # Find sheets with an amount-like column
+        for ws in wb.worksheets:
+            column_map = map_columns(_sheet_headers(ws))
+            if "amount" not in column_map.values():
+                continue
 
-    # Keep only standard schema
-    df = df[REQUIRED_COLUMNS]
+            frames.append(from_columns(**_read_columns(ws, column_map)))
+            if not all_sheets:
+                break
+    finally:
+        wb.close()
 
-    # Clean amount
-    df["amount"] = pd.to_numeric(df["amount"], errors="coerce").fillna(0)
+    if not frames:
+        raise ValueError("No valid sheet with amount column found in Excel file")
 
-    return df
+    return _stack(frames) if len(frames) > 1 else frames[0]
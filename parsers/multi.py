@@ -0,0 +1,99 @@
+import io
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+from parsers.cache import cached_parse, default_cache
+from parsers.dispatch import parser_for
+from parsers.pdf_parser import parse_pdf
+from parsers.schema import REQUIRED_COLUMNS, from_columns
+from parsers.text_parser import parse_text
+
+
+def _parse_one(name: str, data: bytes, key: str = None, workers: int = None) -> dict:
+    """
+    Parses one uploaded file's bytes (`key`: its parse-cache key, if known;
+    `workers`: passed to parse_pdf). Errors are returned, not raised, so one
+    bad statement does not abort the whole upload. "cache" holds the parse
+    cache's counter changes, which a worker process's cache would otherwise
+    keep to itself.
+    """
+    start = time.perf_counter()
+    before = default_cache().counters()
+
+    try:
+        parser = parser_for(name)
+        if parser is None:
+            raise ValueError(f"Unsupported file type: {name}")
+
+        source = data.decode("utf-8", errors="replace") if parser is parse_text else io.BytesIO(data)
+        options = {"workers": workers} if parser is parse_pdf else {}
+        df = cached_parse(parser, source, key=key, **options)
+    except Exception as e:
+        result = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+    else:
+        result = {"ok": True, "rows": len(df), "frame": df}
+
+    after = default_cache().counters()
+    return {
+        "file": name,
+        **result,
+        "seconds": time.perf_counter() - start,
+        "cache": {counter: after[counter] - before[counter] for counter in after},
+    }
+
+
+def merge_frames(frames: list) -> pd.DataFrame:
+    """
+    Combines (file name, parsed frame) pairs into one compact frame with a
+    categorical `source` column. Every row is kept; transactions repeated
+    across files are left to analysis.reconcile, which reports what it drops.
+    """
+    merged = pd.concat(
+        [df[REQUIRED_COLUMNS].assign(source=name) for name, df in frames],
+        ignore_index=True,
+    )
+
+    df = from_columns(**{name: merged[name] for name in REQUIRED_COLUMNS})
+    df["source"] = pd.Categorical(merged["source"].to_numpy(), categories=list(dict.fromkeys(name for name, _ in frames)))
+    return df
+
+
+def parse_uploads(files, workers: int = None, on_progress=None, keys=None) -> tuple:
+    """
+    Parses several uploaded files concurrently, each with the parser for its
+    extension, in a process pool. `on_progress(done, total, result)` is
+    called as each file finishes; `keys`, if given, are the files'
+    parse-cache keys already computed by the caller. Inside the pool PDFs
+    are parsed with one worker each, so parse_pdf does not start a pool of
+    its own in every process. Returns (merged frame,
+    per-file results in upload order); the frame is None if no file parsed.
+    """
+    keys = keys or [None] * len(files)
+    uploads = [(f.name, f.getvalue(), key) for f, key in zip(files, keys)]
+    workers = min(workers or os.cpu_count() or 1, len(uploads))
+    results = [None] * len(uploads)
+
+    def finished(position, result):
+        results[position] = result
+        if on_progress is not None:
+            on_progress(sum(r is not None for r in results), len(uploads), result)
+
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(_parse_one, *upload, workers=1): i for i, upload in enumerate(uploads)}
+            for future in as_completed(futures):
+                result = future.result()
+                default_cache().add(result.pop("cache"))
+                finished(futures[future], result)
+    else:
+        # Parsed in this process, so the default cache already counted them
+        for i, upload in enumerate(uploads):
+            result = _parse_one(*upload)
+            del result["cache"]
+            finished(i, result)
+
+    frames = [(result["file"], result.pop("frame")) for result in results if result["ok"]]
+    return (merge_frames(frames) if frames else None), results
@@ -1,28 +1,29 @@
-import pandas as pd
+import io
+import os
 import re
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
 from PyPDF2 import PdfReader
 
-REQUIRED_COLUMNS = ["date", "description", "amount", "category"]
+from monitoring.instrumentation import instrumented
+from parsers.schema import from_columns
 
 AMOUNT_REGEX = re.compile(r"[-+]?\$?\d+(?:,\d{3})*(?:\.\d+)?")
 
-def parse_pdf(file) -> pd.DataFrame:
-    """
-    Parses a PDF bank statement or expense summary.
-    Falls back to text extraction if structured tables are unavailable.
-    """
+# Below this many pages per worker the process pool costs more than it saves
+MIN_PAGES_PER_WORKER = 8
 
-    reader = PdfReader(file)
-    text = ""
+# Page ranges handed to each worker at a time
+PAGES_PER_TASK = 4
 
-    for page in reader.pages:
-        extracted = page.extract_text()
-        if extracted:
-            text += extracted + "\n"
+_worker_reader = None
 
-    if not text.strip():
-        raise ValueError("Unable to extract text from PDF")
 
+def _scan_page(text):
+    """
+    Extracts (description, amount) rows from the text of one page.
+    """
     rows = []
 
     for line in text.splitlines():
@@ -37,18 +38,75 @@ def parse_pdf(file) -> pd.DataFrame:
             continue
 
         description = line.replace(amounts[-1], "").strip()
+        rows.append((description if description else "Unknown", amount))
+
+    return rows
+
+
+def _extract_pages(reader, start: int, stop: int) -> list:
+    """
+    Rows for pages [start, stop), one list per page; None for pages
+    without extractable text.
+    """
+    pages = []
+
+    for index in range(start, stop):
+        extracted = reader.pages[index].extract_text()
+        if extracted and extracted.strip():
+            pages.append(_scan_page(extracted))
+        else:
+            pages.append(None)
+
+    return pages
+
+
+def _init_worker(data: bytes):
+    global _worker_reader
+    _worker_reader = PdfReader(io.BytesIO(data))
+
+
+def _worker_extract(page_range):
+    return _extract_pages(_worker_reader, *page_range)
+
+
+@instrumented("parse_pdf")
+def parse_pdf(file, workers: int = None) -> pd.DataFrame:
+    """
+    Parses a PDF bank statement or expense summary.
+    Falls back to text extraction if structured tables are unavailable.
+
+    Pages are extracted and scanned independently; with more than one
+    worker (default: one per CPU) long documents are split into page ranges
+    handled by a process pool. Rows are always returned in page order.
+    """
+
+    if hasattr(file, "read"):
+        data = file.read()
+    else:
+        with open(file, "rb") as fh:
+            data = fh.read()
+
+    reader = PdfReader(io.BytesIO(data))
+    n_pages = len(reader.pages)
+
+    workers = workers or os.cpu_count() or 1
+    workers = min(workers, n_pages // MIN_PAGES_PER_WORKER)
+
+    if workers > 1:
+        ranges = [(start, min(start + PAGES_PER_TASK, n_pages)) for start in range(0, n_pages, PAGES_PER_TASK)]
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(data,)) as pool:
+            pages = [page for chunk in pool.map(_worker_extract, ranges) for page in chunk]
+    else:
+        pages = _extract_pages(reader, 0, n_pages)
+
+    if all(page is None for page in pages):
+        raise ValueError("Unable to extract text from PDF")
 
-        rows.append({
-            "date": "Unknown",
-            "description": description if description else "Unknown",
-            "amount": amount,
-            "category": "Uncategorized"
-        })
+    rows = [row for page in pages if page for row in page]
 
     if not rows:
         raise ValueError("No financial rows detected in PDF")
 
-    df = pd.DataFrame(rows)
-    df = df[REQUIRED_COLUMNS]
+    descriptions, amounts = zip(*rows)
 
-    return df
+    return from_columns(description=list(descriptions), amount=list(amounts))
@@ -0,0 +1,203 @@
+import re
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from parsers.dates import parse_date_strings
+
+REQUIRED_COLUMNS = ["date", "description", "amount", "category"]
+
+# Fill values for text columns a source does not have; a missing date is NaT
+DEFAULTS = {
+    "description": "Unknown",
+    "category": "Uncategorized",
+}
+
+# Header keywords per schema column, checked in this order; first rule wins
+HEADER_RULES = [
+    ("date", ("date",)),
+    ("description", ("desc", "merchant", "detail")),
+    ("amount", ("amount", "amt", "value")),
+    ("category", ("category", "type")),
+]
+
+_COMPILED_RULES = [
+    (name, re.compile("|".join(re.escape(keyword) for keyword in keywords)))
+    for name, keywords in HEADER_RULES
+]
+
+# Pieces of a formatted amount that are not part of the number
+_CURRENCY_NOISE = r"[\$€£¥₹,\s]|USD|EUR|GBP|INR"
+
+# Leading values checked to decide whether an amount column needs cleanup
+AMOUNT_SAMPLE_ROWS = 1000
+
+
+def normalize_header(col) -> str:
+    return "" if col is None else str(col).strip().lower()
+
+
+@lru_cache(maxsize=256)
+def _map_signature(headers: tuple) -> tuple:
+    mapping = []
+    taken = set()
+
+    for position, col in enumerate(headers):
+        for name, pattern in _COMPILED_RULES:
+            if pattern.search(col):
+                if name not in taken:
+                    mapping.append((position, name))
+                    taken.add(name)
+                break
+
+    return tuple(mapping)
+
+
+def map_columns(headers) -> dict:
+    """
+    Maps column positions to schema names for a header row.
+    Headers are normalized (stripped, lower-cased) first; when several
+    columns match the same name the first one wins. Results are cached per
+    header signature, so repeated uploads of the same export skip matching.
+    """
+    return dict(_map_signature(tuple(normalize_header(c) for c in headers)))
+
+
+def _to_float(text: pd.Series) -> np.ndarray:
+    """
+    Casts cleaned Arrow strings to float64, coercing failures to NaN.
+    """
+    try:
+        return pc.cast(pa.array(text), pa.float64()).to_numpy(zero_copy_only=False)
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+        return pd.to_numeric(text, errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def parse_amounts(values) -> pd.Series:
+    """
+    Parses an amount column to float64 without a Python loop. Plain numbers
+    take the fast path; the rest may carry currency symbols and thousands
+    separators ("$1,234.50"), accounting negatives ("(45.00)"), trailing
+    signs ("45.00-") or credit/debit markers ("12.00 CR", "12.00 DR", debit
+    being negative). Anything still unparseable becomes 0.
+    """
+    values = pd.Series(values)
+    if pd.api.types.is_numeric_dtype(values):
+        return values.astype(np.float64).fillna(0)
+
+    # A sample decides whether the column is plain numbers; formatted
+    # columns skip straight to the cleanup so nothing is converted twice
+    sample = values.iloc[:AMOUNT_SAMPLE_ROWS]
+    if pd.to_numeric(sample, errors="coerce").count() == sample.count():
+        amounts = pd.to_numeric(values, errors="coerce").astype(np.float64)
+        pending = amounts.isna() & values.notna()
+        if not pending.any():
+            return amounts.fillna(0)
+    else:
+        amounts = pd.Series(np.nan, index=values.index)
+        pending = values.notna()
+
+    text = values[pending].astype("string[pyarrow]").str.strip().str.upper()
+    stripped = (
+        text.str.replace(r"(CR|DR)$", "", regex=True)
+        .str.replace(_CURRENCY_NOISE, "", regex=True)
+    )
+
+    negative = (
+        (stripped.str.startswith("(") & stripped.str.endswith(")"))
+        | stripped.str.startswith("-")
+        | stripped.str.endswith("-")
+        | text.str.endswith("DR")
+    )
+    negative = negative.fillna(False).to_numpy(dtype=bool)
+
+    parsed = _to_float(stripped.str.strip("()+-"))
+    amounts[pending] = np.where(negative, -np.abs(parsed), parsed)
+
+    return amounts.fillna(0)
+
+
+def normalize_frame(df: pd.DataFrame, source: str = "File") -> pd.DataFrame:
+    """
+    Maps a raw frame's columns to the standard schema:
+    date | description | amount | category
+    Missing date/description/category are filled with defaults; a missing
+    amount column raises ValueError naming `source`.
+    """
+    mapping = map_columns(df.columns)
+
+    if "amount" not in mapping.values():
+        raise ValueError(f"{source} must contain an amount column")
+
+    columns = {name: df.iloc[:, position] for position, name in mapping.items()}
+
+    return from_columns(
+        date=columns.get("date"),
+        description=columns.get("description"),
+        amount=columns["amount"],
+        category=columns.get("category"),
+        index=df.index,
+    )
+
+
+def parse_dates(values) -> np.ndarray:
+    """
+    Converts a date column to datetime64[ns], NaT where missing or
+    unparseable. Strings are parsed with an explicit format inferred once
+    per value layout (see parsers.dates).
+    """
+    values = pd.Series(values)
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values.to_numpy(dtype="datetime64[ns]")
+
+    return parse_date_strings(values)
+
+
+def _text_column(values, default: str, length: int) -> pd.Categorical:
+    """
+    Dictionary-encodes a text column; missing entries get `default`.
+    """
+    if values is None:
+        return pd.Categorical.from_codes(np.zeros(length, dtype=np.int8), categories=[default])
+
+    column = pd.Series(values).astype("category")
+    if column.isna().any():
+        if default not in column.cat.categories:
+            column = column.cat.add_categories([default])
+        column = column.fillna(default)
+    return column.array
+
+
+def from_columns(date=None, description=None, amount=None, category=None, index=None) -> pd.DataFrame:
+    """
+    Builds a compact schema frame straight from column arrays:
+    date as datetime64 (NaT when unknown), description and category as
+    categoricals, amount as float64 parsed with parse_amounts.
+    """
+    amount = parse_amounts(amount)
+    if index is not None:
+        amount.index = index
+
+    length = len(amount)
+
+    df = pd.DataFrame(
+        {
+            "date": parse_dates(date) if date is not None else np.full(length, np.datetime64("NaT"), dtype="datetime64[ns]"),
+            "description": _text_column(description, DEFAULTS["description"], length),
+            "amount": amount.to_numpy(),
+            "category": _text_column(category, DEFAULTS["category"], length),
+        },
+        index=amount.index,
+    )
+
+    return df[REQUIRED_COLUMNS]
+
+
+def memory_bytes(df: pd.DataFrame) -> int:
+    """
+    Deep memory footprint of a frame, including string payloads.
+    """
+    return int(df.memory_usage(deep=True).sum())
@@ -1,45 +1,219 @@
 import pandas as pd
 import re
+from datetime import date as calendar_date
+from functools import lru_cache
 
-REQUIRED_COLUMNS = ["date", "description", "amount", "category"]
+from monitoring.instrumentation import instrumented
+from parsers.schema import from_columns
 
-# Captures: "$120 on flight tickets" or "120 for hotel"
-PATTERN = re.compile(
-    r"(?P<amount>\$?\d+(?:\.\d+)?)\s*(?:on|for)?\s*(?P<desc>[A-Za-z][A-Za-z0-9\s\-\&\/]{1,60})",
-    re.IGNORECASE
+MONTHS = r"(?:jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)[a-z]*\.?"
+TIME = r"\d{1,2}:\d{2}(?::\d{2})?(?:\s?[ap]m)?"
+
+# One pass over the text: every token kind is an alternative of one regex.
+# The leading lookahead skips positions inside words (and words no keyword
+# or month starts with) cheaply, dates are tried before bare numbers and
+# swallow a following time of day, and each amount carries the description
+# text that follows it. Ordinals ("1st") are never amounts.
+TOKEN_REGEX = (
+    r"(?=[\d$€£(+\-]|\b[abcdefgijmnoprs])(?:"
+    r"(?P<date>\d{4}-\d{2}-\d{2}|\d{1,2}/\d{1,2}/\d{2,4}"
+    rf"|\d{{1,2}}(?:st|nd|rd|th)?\s+(?:of\s+)?{MONTHS}(?:,?\s+\d{{4}})?"
+    rf"|\b{MONTHS}\s+\d{{1,2}}(?:st|nd|rd|th)?(?:,?\s+\d{{4}})?)(?:[\sTt]+{TIME})?"
+    rf"|(?P<time>{TIME})"
+    r"|\b(?:(?P<credit>received|receive|got|earned|refund(?:ed)?|salary|income|deposit(?:ed)?|paid me|reimbursed)"
+    r"|(?P<debit>spent|spend|paid|pay|bought|cost|costs|charged|owe))\b"
+    r"|(?:(?P<sign>[-+]|\()\s?)?(?:[$€£]\s?)?(?P<number>\d{1,3}(?:,\d{3})+(?:\.\d+)?|\d+(?:\.\d+)?)"
+    r"(?!\d|(?:st|nd|rd|th)\b)\)?"
+    r"(?P<desc>(?:[^\n,.;:!?$€£(\d\s]+|[^\S\n]+(?!and\b))*))"
 )
+TOKEN_PATTERN = re.compile(TOKEN_REGEX, re.IGNORECASE)
+
+# Year of a matched date: four digits, or two after the last slash (1/2/24)
+YEAR_PATTERN = re.compile(r"\b\d{4}\b|(?<=/)\d{2}$")
+
+# Matching lower-cased text without IGNORECASE is about a fifth faster;
+# descriptions are still cut from the original text
+_LOWER_TOKEN_PATTERN = re.compile(TOKEN_REGEX)
+
+DESC_PREFIXES = {"on", "for", "at", "from", "to", "in", "-"}
+
+# Punctuation and brackets trimmed from both ends of a description
+DESC_EDGES = " \t\r-:;,.[]"
+
+# Free-text descriptions are cut to this length
+MAX_DESCRIPTION = 60
+
+# Distinct raw descriptions whose cleaned form is remembered; chat logs
+# repeat the same few merchants
+MAX_MEMO_DESCRIPTIONS = 50_000
+
+# Lines handed to the scanner at a time when streaming from a file
+STREAM_BLOCK_LINES = 10_000
+
+
+@lru_cache(maxsize=MAX_MEMO_DESCRIPTIONS)
+def _clean_description(text: str) -> str:
+    text = text.strip(DESC_EDGES)
+
+    head, _, rest = text.partition(" ")
+    if head.lower() in DESC_PREFIXES:
+        text = rest.lstrip(DESC_EDGES)
+
+    rest, _, tail = text.rpartition(" ")
+    if rest and tail.lower() in DESC_PREFIXES:
+        text = rest.rstrip(DESC_EDGES)
+
+    return text[:MAX_DESCRIPTION]
+
+
+def _leading_description(text: str) -> str:
+    """
+    Description for an amount with nothing usable after it: the text
+    before it on the same line, after any "name:" chat speaker or
+    "date:" label.
+    """
+    return _clean_description(text.rpartition("\n")[2].rpartition(": ")[2])
+
+
+def _year_of(date: str):
+    """
+    Four-digit year written in a matched date, or None ("jan 3").
+    """
+    found = YEAR_PATTERN.search(date)
+    if found is None:
+        return None
+    year = found.group()
+    return year if len(year) == 4 else "20" + year
+
+
+def _scan(text: str, columns: dict, state: dict):
+    """
+    Scans one block of text and appends every transaction found to the
+    column lists. `state` carries the current date and the last year
+    written in a date across blocks; dates without a year ("Jan 3", "5th
+    March") take that year, and are left for _to_frame while none is known.
+    """
+    dates = columns["date"]
+    descriptions = columns["description"]
+    amounts = columns["amount"]
+    date = state["date"]
+
+    scanned = text.lower()
+    pattern = _LOWER_TOKEN_PATTERN
+    if len(scanned) != len(text):
+        # Some characters change length when lower-cased; spans would not line up
+        scanned, pattern = text, TOKEN_PATTERN
 
+    # A credit word applies to amounts after it on the same line
+    credit_until = -1
+    last_end = 0
+
+    for match in pattern.finditer(scanned):
+        kind = match.lastgroup
+
+        if kind != "desc":
+            if kind == "date":
+                date = match.group("date")
+                year = _year_of(date)
+                if year is not None:
+                    state["year"] = year
+                    state.setdefault("first_year", year)
+                elif state.get("year"):
+                    date = f"{date} {state['year']}"
+            elif kind == "credit":
+                credit_until = scanned.find("\n", match.end())
+                if credit_until < 0:
+                    credit_until = len(text)
+            elif kind == "debit":
+                credit_until = -1
+            last_end = match.end()
+            continue
+
+        start, end = match.span()
+        sign, number = match.group("sign", "number")
+        amount = float(number.replace(",", ""))
+        if sign == "-" or sign == "(" or (sign != "+" and start > credit_until):
+            amount = -amount
+
+        desc = _clean_description(text[match.start("desc"):end])
+        if not desc:
+            desc = _leading_description(text[last_end:start])
+
+        dates.append(date)
+        descriptions.append(desc or "Unknown")
+        amounts.append(amount)
+        last_end = end
+
+    state["date"] = date
+
+
+def _parse_dates(raw: list, year: str) -> pd.Series:
+    """
+    Free-text dates come in mixed formats, so each distinct string is
+    parsed on its own; `year` completes those still written without one.
+    """
+    values = pd.Series(raw, dtype=object)
+    codes, uniques = pd.factorize(values)
+    uniques = [value if _year_of(value) else f"{value} {year}" for value in uniques]
+    parsed = pd.to_datetime(pd.Series(uniques, dtype=object), errors="coerce", format="mixed")
+    return pd.Series(parsed.to_numpy()[codes] if len(uniques) else pd.NaT, index=values.index).where(codes >= 0)
+
+
+def _to_frame(columns: dict, state: dict) -> pd.DataFrame:
+    """
+    Builds the frame; dates before the first year written in the text take
+    that year, or the current one if the text names none.
+    """
+    if not columns["amount"]:
+        raise ValueError("No transactions detected in text. Example: 'I spent $20 on coffee.'")
+
+    year = state.get("first_year") or str(calendar_date.today().year)
+    return from_columns(
+        date=_parse_dates(columns["date"], year),
+        description=columns["description"],
+        amount=columns["amount"],
+    )
+
+
+@instrumented("parse_text")
 def parse_text(text: str) -> pd.DataFrame:
     """
     Extracts transactions from free text into:
     date | description | amount | category
-    date defaults to 'Unknown', category defaults to 'Uncategorized'
+    Amounts are expenses (negative) unless preceded by a credit word such as
+    "received" or "salary", or signed explicitly. A date applies to every
+    amount after it until the next date; category defaults to 'Uncategorized'.
     """
 
     text = (text or "").strip()
     if not text:
         raise ValueError("Text input is empty")
 
-    rows = []
-    for match in PATTERN.finditer(text):
-        amount_raw = match.group("amount").replace("$", "").strip()
-        desc = match.group("desc").strip().rstrip(",. ")
+    columns = {"date": [], "description": [], "amount": []}
+    state = {"date": None}
+    _scan(text, columns, state)
 
-        try:
-            amount = float(amount_raw)
-        except ValueError:
-            continue
+    return _to_frame(columns, state)
 
-        rows.append({
-            "date": "Unknown",
-            "description": desc if desc else "Unknown",
-            "amount": amount,
-            "category": "Uncategorized"
-        })
 
-    if not rows:
-        raise ValueError("No transactions detected in text. Example: 'I spent $20 on coffee.'")
+@instrumented("parse_text_stream")
+def parse_text_stream(fh, block_lines: int = STREAM_BLOCK_LINES) -> pd.DataFrame:
+    """
+    Like parse_text, but reads an open text file line by line in blocks of
+    `block_lines`, so large logs are never held in memory as one string.
+    """
+
+    columns = {"date": [], "description": [], "amount": []}
+    state = {"date": None}
+    block = []
+
+    for line in fh:
+        block.append(line)
+        if len(block) >= block_lines:
+            _scan("".join(block), columns, state)
+            block = []
+
+    if block:
+        _scan("".join(block), columns, state)
 
-    df = pd.DataFrame(rows)
-    df = df[REQUIRED_COLUMNS]
-    return df
+    return _to_frame(columns, state)
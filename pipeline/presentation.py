@@ -0,0 +1,155 @@
+"""
+What the app sends to the browser, bounded regardless of ledger size.
+
+Streamlit serializes every st.dataframe / chart argument as Arrow over the
+websocket, so tables are served a page at a time, the category chart keeps
+the largest categories plus an "Other" bar, long trends are downsampled
+with largest-triangle-three-buckets and long anomaly lists are cut to the
+most anomalous rows. Arrow sends a categorical column's whole dictionary,
+so every slice drops the categories its rows do not use. payload_bytes()
+measures what a widget will receive.
+"""
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+# Rows per page of the data preview
+PAGE_ROWS = 500
+
+# Bars in the category chart, the last one being "Other"
+TOP_CATEGORIES = 12
+OTHER_LABEL = "Other"
+
+# Points kept in a trend line
+MAX_TREND_POINTS = 500
+
+# Anomalous transactions listed, highest scores (or largest amounts) first
+MAX_ANOMALY_ROWS = 1000
+
+
+def page_count(rows: int, page_rows: int = PAGE_ROWS) -> int:
+    return max(1, -(-rows // page_rows))
+
+
+def compact(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    A slice with unused categories removed from its categorical columns;
+    otherwise a 500-row page of a frame with a million distinct
+    descriptions would still send all million of them.
+    """
+    categorical = [name for name, dtype in df.dtypes.items() if isinstance(dtype, pd.CategoricalDtype)]
+    if not categorical:
+        return df
+    return df.assign(**{name: df[name].cat.remove_unused_categories() for name in categorical})
+
+
+def page(df: pd.DataFrame, number: int, page_rows: int = PAGE_ROWS) -> pd.DataFrame:
+    """
+    Rows of page `number` (1-based, clamped to the last page), compacted.
+    """
+    number = min(max(number, 1), page_count(len(df), page_rows))
+    start = (number - 1) * page_rows
+    return compact(df.iloc[start:start + page_rows])
+
+
+def top_n(series: pd.Series, n: int = TOP_CATEGORIES, other_label: str = OTHER_LABEL) -> pd.Series:
+    """
+    The n - 1 largest values and their remainder summed as `other_label`;
+    series with at most n values are returned unchanged.
+    """
+    if len(series) <= n:
+        return series
+
+    ordered = series.sort_values(ascending=False, kind="stable")
+    kept = ordered.iloc[:n - 1]
+    other = pd.Series([ordered.iloc[n - 1:].sum()], index=pd.Index([other_label], name=series.index.name))
+    return pd.concat([kept, other]).rename(series.name)
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    Positions of the points largest-triangle-three-buckets keeps: the first
+    and last point, and per bucket the point forming the largest triangle
+    with the previously kept point and the next bucket's average.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    edges = (np.arange(threshold - 1) * ((n - 2) / (threshold - 2))).astype(np.int64) + 1
+    edges[-1] = n - 1
+
+    # Next-bucket averages from cumulative sums; the last bucket looks at the last point
+    x_sums = np.concatenate(([0.0], np.cumsum(x)))
+    y_sums = np.concatenate(([0.0], np.cumsum(y)))
+    next_start = edges[1:]
+    next_end = np.append(edges[2:], n)
+    next_end[-1] = n
+    widths = next_end - next_start
+    avg_x = (x_sums[next_end] - x_sums[next_start]) / widths
+    avg_y = (y_sums[next_end] - y_sums[next_start]) / widths
+
+    kept = np.empty(threshold, dtype=np.int64)
+    kept[0], kept[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        areas = np.abs((x[a] - avg_x[i]) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y[i] - y[a]))
+        a = start + int(np.argmax(areas))
+        kept[i + 1] = a
+    return kept
+
+
+def _positions(index: pd.Index) -> np.ndarray:
+    if isinstance(index, pd.PeriodIndex):
+        return index.asi8.astype(np.float64)
+    if isinstance(index, pd.DatetimeIndex):
+        return index.asi8.astype(np.float64)
+    if pd.api.types.is_numeric_dtype(index):
+        return index.to_numpy(dtype=np.float64)
+    return np.arange(len(index), dtype=np.float64)
+
+
+def downsample(series: pd.Series, max_points: int = MAX_TREND_POINTS) -> pd.Series:
+    """
+    At most `max_points` of a trend, chosen by LTTB so peaks and dips stay visible.
+    """
+    if len(series) <= max_points:
+        return series
+    values = series.to_numpy(dtype=np.float64, na_value=0.0)
+    return series.iloc[lttb_indices(_positions(series.index), values, max_points)]
+
+
+def largest_rows(df: pd.DataFrame, limit: int = MAX_ANOMALY_ROWS) -> pd.DataFrame:
+    """
+    The `limit` most anomalous rows, in their original order and compacted:
+    ranked by absolute `score` when a detector added one, else by absolute
+    amount.
+    """
+    if len(df) <= limit:
+        return compact(df)
+    ranking = df["score"] if "score" in df else pd.to_numeric(df["amount"], errors="coerce")
+    magnitude = np.abs(ranking.to_numpy(dtype=np.float64, na_value=0.0))
+    keep = np.sort(np.argpartition(-magnitude, limit - 1)[:limit])
+    return compact(df.iloc[keep])
+
+
+def payload_bytes(value) -> int:
+    """
+    Size of the Arrow IPC stream Streamlit would send for a frame or series.
+    """
+    if value is None:
+        return 0
+    if isinstance(value, pd.Series):
+        value = value.to_frame()
+    try:
+        table = pa.Table.from_pandas(value)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        table = pa.Table.from_pandas(value.astype(str))
+
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().size
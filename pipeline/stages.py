@@ -0,0 +1,406 @@
+import hashlib
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from analysis.anomalies import detect_anomalies
+from analysis.categorize import categorize as categorize_frame
+from analysis.finance_metrics import compute_financial_metrics
+from analysis.forecast import balance_frame, forecast as forecast_cube
+from analysis.reconcile import TRANSFER_WINDOW_DAYS, find_duplicates, reconcile as reconcile_frame
+from analysis.recurring import detect_recurring
+from analysis.rollups import build_cube, running_balance, trend
+from parsers.cache import ParseCache, cached_parse, source_bytes
+from parsers.csv_parser import stream_csv_metrics
+from parsers.multi import parse_uploads
+from parsers.dispatch import parser_for
+from parsers.schema import REQUIRED_COLUMNS, from_columns, memory_bytes
+from pipeline import presentation
+
+# Bytes of stage results one session keeps in memory across Streamlit reruns
+MAX_MEMO_BYTES = int(os.getenv("FINANCE_ANALYZER_MEMO_BYTES", 256 * 1024 * 1024))
+
+
+def fingerprint(*parts) -> str:
+    """
+    Stable hash of a stage's inputs: upstream fingerprints, bytes or params.
+    """
+    digest = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, str):
+            part = part.encode("utf-8")
+        elif not isinstance(part, bytes):
+            part = repr(part).encode("utf-8")
+        digest.update(part)
+        digest.update(b"\0")
+    return digest.hexdigest()[:16]
+
+
+def result_bytes(value) -> int:
+    """
+    Approximate memory held by a stage result: frames and series deep,
+    arrays by their buffer, containers as the sum of their items.
+    """
+    if isinstance(value, pd.DataFrame):
+        return memory_bytes(value)
+    if isinstance(value, (pd.Series, pd.Index)):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(result_bytes(item) for item in value.values())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(result_bytes(item) for item in value)
+    return sys.getsizeof(value)
+
+
+class StageMemo:
+    """
+    Stage results per (stage, fingerprint), least recently used evicted
+    first once they hold more than `max_bytes`. The app keeps one per
+    session in st.session_state, so sessions neither share results nor
+    grow each other's memory; a result larger than the whole budget is
+    not kept.
+    """
+
+    def __init__(self, max_bytes: int = MAX_MEMO_BYTES):
+        self.max_bytes = max_bytes
+        self.size_bytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key) -> tuple:
+        """
+        Returns (found, result).
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False, None
+            self._entries.move_to_end(key)
+            return True, entry[0]
+
+    def put(self, key, result):
+        size = result_bytes(result)
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.size_bytes -= previous[1]
+            if size > self.max_bytes:
+                return
+
+            self._entries[key] = (result, size)
+            self.size_bytes += size
+            while self.size_bytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.size_bytes -= evicted
+
+
+class PipelineRun:
+    """
+    One pass of the app pipeline (ingest -> normalize -> metrics -> charts
+    -> report). Each stage is memoized on its input fingerprint in `memo`,
+    so a rerun sharing it only recomputes stages whose inputs changed.
+    `stages` records timing and cache status per stage for the debug panel.
+    """
+
+    def __init__(self, memo: StageMemo = None):
+        self.memo = memo if memo is not None else StageMemo()
+        self.stages = []
+
+    def stage(self, name: str, key: str, fn, *args):
+        """
+        Returns fn(*args), reusing the memoized result for (name, key).
+        """
+        start = time.perf_counter()
+
+        cached, result = self.memo.get((name, key))
+        if not cached:
+            result = fn(*args)
+            self.memo.put((name, key), result)
+
+        self.stages.append({
+            "stage": name,
+            "fingerprint": key,
+            "cache": "hit" if cached else "miss",
+            "ms": round((time.perf_counter() - start) * 1000, 2),
+        })
+        return result
+
+    def timings(self) -> pd.DataFrame:
+        return pd.DataFrame(self.stages, columns=["stage", "fingerprint", "cache", "ms"])
+
+
+def _upload_key(parser, data: bytes):
+    """
+    Parse-cache key of an upload (None for unsupported files); the stage
+    fingerprint is derived from it, so the bytes are hashed only once.
+    """
+    return ParseCache.key(parser.__name__, data) if parser is not None else None
+
+
+def ingest(run: PipelineRun, parser, source) -> tuple:
+    """
+    Parses an upload (or text) once per distinct content.
+    Returns (fingerprint, frame).
+    """
+    upload_key = _upload_key(parser, source_bytes(source))
+    key = fingerprint(upload_key)
+    return key, run.stage("ingest", key, cached_parse, parser, source, None, upload_key)
+
+
+def ingest_many(run: PipelineRun, files, on_progress=None) -> tuple:
+    """
+    Parses several uploads concurrently and merges them into one frame with
+    a `source` column. Returns (fingerprint, frame or None, per-file results).
+    """
+    upload_keys = [_upload_key(parser_for(f.name), f.getvalue()) for f in files]
+    key = fingerprint("ingest_many", *(part for f, upload_key in zip(files, upload_keys) for part in (f.name, upload_key)))
+    df, results = run.stage("ingest", key, parse_uploads, files, None, on_progress, upload_keys)
+    return key, df, results
+
+
+def ingest_streamed_csv(run: PipelineRun, source, preview_rows: int) -> tuple:
+    """
+    For CSVs too large to load: metrics are computed while streaming (with
+    keyword categorization) and only the first `preview_rows` rows are
+    kept, from the same single pass over the upload. Returns (fingerprint,
+    preview frame, metrics).
+    """
+    key = fingerprint("stream_csv", source_bytes(source), preview_rows)
+
+    def stream():
+        preview = []
+
+        def categorize_and_keep(chunk):
+            chunk = categorize_frame(chunk)
+            kept = sum(len(part) for part in preview)
+            if kept < preview_rows:
+                preview.append(chunk.head(preview_rows - kept))
+            return chunk
+
+        metrics = stream_csv_metrics(source, transform=categorize_and_keep)
+        return pd.concat(preview) if preview else pd.DataFrame(columns=REQUIRED_COLUMNS), metrics
+
+    preview, metrics = run.stage("ingest", key, stream)
+    return key, preview, metrics
+
+
+def _normalize(df: pd.DataFrame) -> pd.DataFrame:
+    compact = (
+        pd.api.types.is_datetime64_any_dtype(df["date"])
+        and isinstance(df["description"].dtype, pd.CategoricalDtype)
+        and isinstance(df["category"].dtype, pd.CategoricalDtype)
+        and pd.api.types.is_float_dtype(df["amount"])
+    )
+    # Extra columns such as `source` from a multi-file upload are kept
+    extra = [name for name in df.columns if name not in REQUIRED_COLUMNS]
+    if compact:
+        return df[REQUIRED_COLUMNS + extra]
+    return from_columns(**{name: df[name] for name in REQUIRED_COLUMNS}, index=df.index).join(df[extra])
+
+
+def normalize(run: PipelineRun, upstream: str, df: pd.DataFrame) -> tuple:
+    """
+    Brings a parsed frame to the compact schema (a no-op for parser output).
+    """
+    key = fingerprint("normalize", upstream)
+    return key, run.stage("normalize", key, _normalize, df)
+
+
+def categorize(run: PipelineRun, upstream: str, df: pd.DataFrame, llm_fallback: bool = False) -> tuple:
+    """
+    Fills in 'Uncategorized' rows from their descriptions, optionally asking
+    the LLM about merchants the keyword rules do not know.
+    """
+    key = fingerprint("categorize", upstream, llm_fallback)
+    return key, run.stage("categorize", key, categorize_frame, df, llm_fallback)
+
+
+def duplicates(run: PipelineRun, upstream: str, df: pd.DataFrame) -> tuple:
+    """
+    Rows that repeat a transaction from another uploaded file, as
+    (row, matched_row) positions, so the user can confirm removing them.
+    """
+    key = fingerprint("duplicates", upstream)
+    return key, run.stage("duplicates", key, find_duplicates, df)
+
+
+def reconcile(run: PipelineRun, upstream: str, df: pd.DataFrame, drop_duplicates: bool = True) -> tuple:
+    """
+    Removes internal transfer pairs and, if `drop_duplicates`, duplicates
+    across uploaded files.
+    Returns (fingerprint, (reconciled frame, report of removed rows)).
+    """
+    key = fingerprint("reconcile", upstream, drop_duplicates)
+    return key, run.stage("reconcile", key, reconcile_frame, df, TRANSFER_WINDOW_DAYS, drop_duplicates)
+
+
+def metrics(run: PipelineRun, upstream: str, df: pd.DataFrame) -> tuple:
+    key = fingerprint("metrics", upstream)
+    return key, run.stage("metrics", key, compute_financial_metrics, df)
+
+
+def _with_anomalies(df: pd.DataFrame, metrics: dict, detector: str) -> dict:
+    return {**metrics, "anomalies": detect_anomalies(df, detector)}
+
+
+def anomalies(run: PipelineRun, upstream: str, df: pd.DataFrame, metrics: dict, detector: str) -> tuple:
+    """
+    Replaces the metrics' global IQR anomalies with those of the chosen
+    detector from analysis.anomalies.
+    """
+    key = fingerprint("anomalies", upstream, detector)
+    return key, run.stage("anomalies", key, _with_anomalies, df, metrics, detector)
+
+
+def _with_recurring(df: pd.DataFrame, metrics: dict) -> dict:
+    return {**metrics, "recurring": detect_recurring(df)}
+
+
+def recurring(run: PipelineRun, upstream: str, df: pd.DataFrame, metrics: dict) -> tuple:
+    """
+    Adds the subscriptions and other regular payments found by
+    analysis.recurring to the metrics, so the AI advice can refer to them.
+    """
+    key = fingerprint("recurring", upstream)
+    return key, run.stage("recurring", key, _with_recurring, df, metrics)
+
+
+def rollups(run: PipelineRun, upstream: str, df: pd.DataFrame) -> tuple:
+    """
+    The day x category x sign cube every trend granularity is derived from.
+    """
+    key = fingerprint("rollups", upstream)
+    return key, run.stage("rollups", key, build_cube, df)
+
+
+def _trend_charts(cube: pd.DataFrame, freq: str) -> dict:
+    charts = {}
+    for name, series in (("trend", trend(cube, freq)), ("balance", running_balance(cube, freq))):
+        series = presentation.downsample(series)
+        charts[name] = series.set_axis(series.index.to_timestamp())
+    return charts
+
+
+def trend_charts(run: PipelineRun, upstream: str, cube: pd.DataFrame, freq: str) -> tuple:
+    """
+    Net amount and running balance per period of `freq`, from the cube.
+    """
+    key = fingerprint("trend", upstream, freq)
+    return key, run.stage("trend", key, _trend_charts, cube, freq)
+
+
+def _forecast_chart(cube: pd.DataFrame, scenarios: list, horizon: int) -> pd.DataFrame:
+    result = forecast_cube(cube, scenarios, horizon)
+    return balance_frame(result) if result else None
+
+
+def forecast(run: PipelineRun, upstream: str, cube: pd.DataFrame, scenarios: list, horizon: int) -> tuple:
+    """
+    Projected cumulative savings per month for the baseline and every
+    what-if scenario, from the cube (see analysis.forecast).
+    """
+    key = fingerprint("forecast", upstream, scenarios, horizon)
+    return key, run.stage("forecast", key, _forecast_chart, cube, scenarios, horizon)
+
+
+def _save_history(store, df: pd.DataFrame, name: str) -> int:
+    # A multi-file upload is stored as one statement per file
+    if "source" not in df:
+        return store.add_frame(df, name)
+    return sum(store.add_frame(part, str(source)) for source, part in df.groupby("source", observed=True, sort=False))
+
+
+def save_history(run: PipelineRun, upstream: str, df: pd.DataFrame, store, name: str) -> tuple:
+    """
+    Adds the transactions to the persistent store once per distinct data.
+    Returns (fingerprint, number of transactions that were new).
+    """
+    key = fingerprint("history", upstream, store.path)
+    return key, run.stage("history", key, _save_history, store, df, name)
+
+
+def _history_overview(store) -> dict:
+    first, last = store.date_range()
+    return {"first": first, "last": last, "categories": store.categories(), "statements": store.statements()}
+
+
+def history_overview(run: PipelineRun, store) -> tuple:
+    """
+    Date range, categories and statements of the saved history, read again
+    only when the store's revision changes (something was saved).
+    Returns (fingerprint, dict).
+    """
+    key = fingerprint("history_overview", store.path, store.revision())
+    return key, run.stage("history_overview", key, _history_overview, store)
+
+
+def history_repeats(run: PipelineRun, upstream: str, store, start, end, categories) -> tuple:
+    """
+    How many saved transactions in the filter repeat one from an earlier
+    statement, for the user to confirm before they are left out.
+    """
+    key = fingerprint("history_repeats", upstream, start, end, categories)
+    return key, run.stage("history_repeats", key, store.repeats, start, end, categories)
+
+
+def _history_metrics(store, start, end, categories, drop_repeats: bool) -> dict:
+    return store.metrics(start, end, categories, drop_repeats=drop_repeats)
+
+
+def history_metrics(run: PipelineRun, upstream: str, store, start, end, categories, drop_repeats: bool = False) -> tuple:
+    """
+    store.metrics for a date range and category filter, keyed on the
+    overview's fingerprint so a rerun with the same filters and an
+    unchanged store does not query it again.
+    """
+    key = fingerprint("history_metrics", upstream, start, end, categories, drop_repeats)
+    return key, run.stage("history_metrics", key, _history_metrics, store, start, end, categories, drop_repeats)
+
+
+def _charts(metrics: dict) -> dict:
+    trend = presentation.downsample(metrics["monthly_trend"])
+    if isinstance(trend.index, pd.PeriodIndex):
+        trend = trend.set_axis(trend.index.to_timestamp())
+    anomalies = metrics["anomalies"]
+    return {
+        "category_spend": presentation.top_n(metrics["category_spend"]),
+        "monthly_trend": trend,
+        "anomalies": presentation.largest_rows(anomalies) if anomalies is not None else None,
+    }
+
+
+def charts(run: PipelineRun, upstream: str, metrics: dict) -> tuple:
+    """
+    Chart- and table-ready data derived from the metrics, bounded in size
+    (see pipeline.presentation).
+    """
+    key = fingerprint("charts", upstream)
+    return key, run.stage("charts", key, _charts, metrics)
+
+
+def build_report(metrics: dict) -> str:
+    return f"""AI Financial Analyzer Report
+
+Total Income: ${metrics['total_income']}
+Total Expenses: ${metrics['total_expenses']}
+Net Savings: ${metrics['net_savings']}
+Savings Rate: {metrics['savings_rate']}%
+
+Disclaimer:
+This is educational financial guidance, not professional financial advice.
+"""
+
+
+def report(run: PipelineRun, upstream: str, metrics: dict) -> tuple:
+    key = fingerprint("report", upstream)
+    return key, run.stage("report", key, build_report, metrics)
@@ -0,0 +1,390 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from contextlib import closing, contextmanager
+
+import numpy as np
+import pandas as pd
+
+from analysis.finance_metrics import IQR_MULTIPLIER, build_metrics, net_by_month
+from analysis.incremental import MAX_ANOMALY_ROWS
+from monitoring.instrumentation import instrumented
+from parsers.schema import REQUIRED_COLUMNS, from_columns
+
+STORE_PATH = os.getenv(
+    "FINANCE_ANALYZER_STORE",
+    os.path.join(os.path.expanduser("~"), ".ai-financial-analyzer", "transactions.sqlite"),
+)
+
+# Repeats of the same (date, description, amount) within a statement are
+# numbered so each one is stored; across statements such a row is only
+# reported as a repeat, never dropped unless the caller asks
+DEDUPE_COLUMNS = ["date", "description", "amount"]
+
+# Kept in PRAGMA user_version. Version 0 stores made transactions unique
+# across statements and are rebuilt on open
+SCHEMA_VERSION = 1
+
+# Rows per executemany() call while ingesting
+INSERT_BATCH_ROWS = 50_000
+
+# Dates are stored as ISO text ("2024-04-01T00:00:00") so range filters and
+# month grouping work on the index without date functions
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS statements (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    digest TEXT NOT NULL UNIQUE,
+    rows INTEGER NOT NULL,
+    added_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS transactions (
+    id INTEGER PRIMARY KEY,
+    statement_id INTEGER NOT NULL REFERENCES statements(id),
+    date TEXT,
+    description TEXT NOT NULL,
+    amount REAL NOT NULL,
+    category TEXT NOT NULL,
+    occurrence INTEGER NOT NULL,
+    repeated INTEGER NOT NULL DEFAULT 0,
+    UNIQUE (statement_id, date, description, amount, occurrence)
+);
+CREATE INDEX IF NOT EXISTS transactions_date ON transactions (date, amount, category);
+CREATE INDEX IF NOT EXISTS transactions_category ON transactions (category, date, amount);
+CREATE INDEX IF NOT EXISTS transactions_description ON transactions (description, date, amount);
+CREATE INDEX IF NOT EXISTS transactions_amount ON transactions (amount, date, category, repeated);
+CREATE INDEX IF NOT EXISTS transactions_repeat ON transactions (date, description, amount, occurrence, statement_id);
+"""
+
+INDEXES = ["transactions_date", "transactions_category", "transactions_description", "transactions_amount"]
+
+# A dated row that an earlier statement also holds (same date, description,
+# amount and occurrence). Statements are only ever added, so this is
+# evaluated once per new statement and kept in the `repeated` column
+REPEAT_CLAUSE = (
+    "date IS NOT NULL AND EXISTS (SELECT 1 FROM transactions earlier WHERE earlier.date = transactions.date "
+    "AND earlier.description = transactions.description AND earlier.amount = transactions.amount "
+    "AND earlier.occurrence = transactions.occurrence AND earlier.statement_id < transactions.statement_id)"
+)
+
+
+def _iso(value) -> str:
+    """
+    A date bound as stored: "2024-04-01T00:00:00".
+    """
+    return np.datetime_as_string(np.datetime64(pd.Timestamp(value), "s"))
+
+
+def _filters(start=None, end=None, categories=None, descriptions=None, contains=None, drop_repeats=False) -> tuple:
+    """
+    WHERE clause and parameters shared by every query. `drop_repeats`
+    leaves out rows an earlier statement also holds.
+    """
+    clauses, params = [], []
+
+    if start is not None:
+        clauses.append("date >= ?")
+        params.append(_iso(start))
+    if end is not None:
+        clauses.append("date < ?")
+        params.append(_iso(end))
+    if categories is not None:
+        categories = list(categories)
+        clauses.append(f"category IN ({', '.join('?' * len(categories))})")
+        params.extend(categories)
+    if descriptions is not None:
+        descriptions = list(descriptions)
+        clauses.append(f"description IN ({', '.join('?' * len(descriptions))})")
+        params.extend(descriptions)
+    if contains:
+        escaped = contains.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        clauses.append("description LIKE ? ESCAPE '\\'")
+        params.append(f"%{escaped}%")
+    if drop_repeats:
+        clauses.append("repeated = 0")
+
+    return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+
+def _migrate(conn):
+    """
+    Rebuilds a version 0 transactions table (unique across statements)
+    with the per-statement key, keeping its rows.
+    """
+    exists = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'transactions'").fetchone()
+    if not exists:
+        return
+    for index in INDEXES:
+        conn.execute(f"DROP INDEX IF EXISTS {index}")
+    conn.execute("ALTER TABLE transactions RENAME TO transactions_v0")
+    conn.executescript(SCHEMA)
+    conn.execute(
+        "INSERT INTO transactions (id, statement_id, date, description, amount, category, occurrence) "
+        "SELECT id, statement_id, date, description, amount, category, occurrence FROM transactions_v0"
+    )
+    conn.execute("DROP TABLE transactions_v0")
+    conn.execute(f"UPDATE transactions SET repeated = 1 WHERE {REPEAT_CLAUSE}")
+
+
+def frame_digest(df: pd.DataFrame) -> str:
+    """
+    Content hash of a normalized frame, to recognise a statement ingested before.
+    """
+    hashes = pd.util.hash_pandas_object(df[REQUIRED_COLUMNS], index=False)
+    return hashlib.sha256(hashes.to_numpy().tobytes()).hexdigest()
+
+
+class TransactionStore:
+    """
+    Persistent SQLite store of normalized transactions across statements.
+
+    Transactions are indexed by date, category, description and amount, and
+    metrics() answers compute_financial_metrics for a date range and
+    category/merchant filter with SQL aggregates, so only the aggregated
+    series and the most extreme anomalous rows are ever read back into
+    pandas.
+
+    A statement whose content was ingested before is skipped; every row of
+    a new statement is stored. Two statements can hold the same dated
+    transaction (overlapping exports) or genuinely separate charges on the
+    same day, for the same amount and merchant, so such rows are kept and
+    counted by repeats(); queries leave them out only with
+    drop_repeats=True, once the user has confirmed, as analysis.reconcile
+    does for uploads.
+    """
+
+    def __init__(self, path: str = STORE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._connect() as conn:
+            if conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+                _migrate(conn)
+            conn.executescript(SCHEMA)
+            conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    @contextmanager
+    def _connect(self):
+        """
+        A connection per operation (Streamlit reruns on other threads),
+        committing on success.
+        """
+        with closing(sqlite3.connect(self.path, timeout=30)) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            with conn:
+                yield conn
+
+    @instrumented("store.ingest")
+    def add_frame(self, df: pd.DataFrame, name: str, digest: str = None) -> int:
+        """
+        Stores a normalized frame as one statement. Returns the number of
+        transactions added (0 if the statement was already stored).
+        """
+        digest = digest or frame_digest(df)
+        df = df.reset_index(drop=True)
+
+        dates = df["date"].to_numpy(dtype="datetime64[s]")
+        date_text = np.datetime_as_string(dates).astype(object)
+        date_text[np.isnat(dates)] = None
+
+        amounts = pd.to_numeric(df["amount"], errors="coerce").fillna(0.0)
+        occurrence = df.assign(amount=amounts).groupby(DEDUPE_COLUMNS, dropna=False, observed=True, sort=False).cumcount()
+
+        columns = zip(
+            date_text.tolist(),
+            df["description"].astype(str).tolist(),
+            amounts.astype(float).tolist(),
+            df["category"].astype(str).tolist(),
+            occurrence.astype(int).tolist(),
+        )
+
+        with self._lock, self._connect() as conn:
+            cursor = conn.execute(
+                "INSERT OR IGNORE INTO statements (name, digest, rows, added_at) VALUES (?, ?, ?, ?)",
+                (name, digest, len(df), time.time()),
+            )
+            if cursor.rowcount == 0:
+                return 0
+            statement_id = cursor.lastrowid
+
+            before = conn.total_changes
+            rows = [(statement_id, *row) for row in columns]
+            for i in range(0, len(rows), INSERT_BATCH_ROWS):
+                conn.executemany(
+                    "INSERT INTO transactions "
+                    "(statement_id, date, description, amount, category, occurrence) VALUES (?, ?, ?, ?, ?, ?)",
+                    rows[i:i + INSERT_BATCH_ROWS],
+                )
+            added = conn.total_changes - before
+
+            conn.execute(f"UPDATE transactions SET repeated = 1 WHERE statement_id = ? AND {REPEAT_CLAUSE}", (statement_id,))
+            return added
+
+    def statements(self) -> pd.DataFrame:
+        """
+        Ingested statements, oldest first.
+        """
+        with self._connect() as conn:
+            return pd.read_sql_query(
+                "SELECT s.id, s.name, s.rows, datetime(s.added_at, 'unixepoch') AS added_at, "
+                "(SELECT COUNT(*) FROM transactions t WHERE t.statement_id = s.id) AS stored "
+                "FROM statements s ORDER BY s.id",
+                conn,
+            )
+
+    def revision(self) -> tuple:
+        """
+        (last statement id, last transaction id). Rows are only ever added,
+        so this changes whenever the store does; read off the primary keys
+        without counting rows.
+        """
+        with self._connect() as conn:
+            return conn.execute(
+                "SELECT (SELECT MAX(id) FROM statements), (SELECT MAX(id) FROM transactions)"
+            ).fetchone()
+
+    def categories(self) -> list:
+        with self._connect() as conn:
+            return [row[0] for row in conn.execute("SELECT DISTINCT category FROM transactions ORDER BY category")]
+
+    def date_range(self) -> tuple:
+        """
+        (first, last) stored date as Timestamps, or (None, None) when empty.
+        """
+        with self._connect() as conn:
+            first, last = conn.execute("SELECT MIN(date), MAX(date) FROM transactions").fetchone()
+        return (pd.Timestamp(first) if first else None), (pd.Timestamp(last) if last else None)
+
+    def repeats(self, start=None, end=None, categories=None, descriptions=None, contains=None) -> int:
+        """
+        Matching transactions that an earlier statement also holds (same
+        date, description and amount, counting repeats within a statement).
+        """
+        where, params = _filters(start, end, categories, descriptions, contains)
+        both = " AND " if where else " WHERE "
+        with self._connect() as conn:
+            return conn.execute(f"SELECT COUNT(*) FROM transactions{where}{both}repeated = 1", params).fetchone()[0]
+
+    def query(self, start=None, end=None, categories=None, descriptions=None, contains=None, limit: int = None,
+              drop_repeats: bool = False) -> pd.DataFrame:
+        """
+        Matching transactions as a normalized frame, ordered by date.
+        `end` is exclusive; `contains` matches part of the description;
+        `drop_repeats` leaves out the rows counted by repeats().
+        """
+        where, params = _filters(start, end, categories, descriptions, contains, drop_repeats)
+        sql = f"SELECT date, description, amount, category FROM transactions{where} ORDER BY date"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+
+        with self._connect() as conn:
+            rows = conn.execute(sql, params).fetchall()
+        return _to_frame(rows)
+
+    def _quantiles(self, conn, where: str, params: list, qs) -> list:
+        """
+        Same interpolated quantiles as analysis.arrays.quantiles, read off
+        the amount index with LIMIT/OFFSET instead of loading the amounts.
+        """
+        n = conn.execute(f"SELECT COUNT(*) FROM transactions{where}", params).fetchone()[0]
+        if n == 0:
+            return [np.nan for _ in qs]
+
+        result = []
+        for q in qs:
+            position = q * (n - 1)
+            lo = int(np.floor(position))
+            values = [row[0] for row in conn.execute(
+                f"SELECT amount FROM transactions{where} ORDER BY amount LIMIT 2 OFFSET ?", params + [lo]
+            )]
+            hi_value = values[1] if len(values) > 1 else values[0]
+            result.append(values[0] + (hi_value - values[0]) * (position - lo))
+        return result
+
+    def _anomalies(self, conn, where: str, params: list, bounds: tuple, limit: int) -> tuple:
+        """
+        The `limit` lowest and `limit` highest rows outside the fences,
+        read off the amount index and ordered by date, and how many rows
+        fall outside them in all.
+        """
+        lower, upper = bounds
+        both = " AND " if where else " WHERE "
+        count = conn.execute(
+            f"SELECT COUNT(*) FROM transactions{where}{both}(amount < ? OR amount > ?)", params + [lower, upper]
+        ).fetchone()[0]
+
+        select = f"SELECT date, description, amount, category FROM transactions{where}{both}"
+        low = conn.execute(select + "amount < ? ORDER BY amount LIMIT ?", params + [lower, limit]).fetchall()
+        high = conn.execute(select + "amount > ? ORDER BY amount DESC LIMIT ?", params + [upper, limit]).fetchall()
+
+        # Undated rows first, as ORDER BY date would put them
+        rows = sorted(low + high, key=lambda row: (row[0] is not None, row[0] or ""))
+        return rows, count
+
+    @instrumented("store.metrics")
+    def metrics(self, start=None, end=None, categories=None, descriptions=None, contains=None,
+                max_anomalies: int = MAX_ANOMALY_ROWS, drop_repeats: bool = False) -> dict:
+        """
+        The compute_financial_metrics dict for the matching transactions,
+        aggregated inside SQLite. `end` is exclusive; `drop_repeats` leaves
+        out the rows counted by repeats(). At most `max_anomalies` of the
+        lowest and of the highest anomalous rows are returned;
+        "anomaly_count" holds how many there are.
+        """
+        where, params = _filters(start, end, categories, descriptions, contains, drop_repeats)
+        both = " AND " if where else " WHERE "
+
+        with self._connect() as conn:
+            income, expenses = conn.execute(
+                "SELECT TOTAL(CASE WHEN amount > 0 THEN amount END), TOTAL(CASE WHEN amount < 0 THEN amount END) "
+                f"FROM transactions{where}",
+                params,
+            ).fetchone()
+
+            spend = conn.execute(
+                f"SELECT category, TOTAL(amount) FROM transactions{where}{both}amount < 0 GROUP BY category ORDER BY category",
+                params,
+            ).fetchall()
+
+            months = conn.execute(
+                f"SELECT substr(date, 1, 7) AS month, TOTAL(amount) FROM transactions{where}{both}date IS NOT NULL "
+                "GROUP BY month ORDER BY month",
+                params,
+            ).fetchall()
+
+            q1, q3 = self._quantiles(conn, where, params, (0.25, 0.75))
+            iqr = q3 - q1
+            anomalies, anomaly_count = self._anomalies(
+                conn, where, params, (q1 - IQR_MULTIPLIER * iqr, q3 + IQR_MULTIPLIER * iqr), max_anomalies
+            ) if not np.isnan(q1) else ([], 0)
+
+        category_spend = pd.Series(
+            [abs(total) for _, total in spend],
+            index=pd.Index([category for category, _ in spend], name="category"),
+            name="amount",
+            dtype=np.float64,
+        ).sort_values(ascending=False, kind="stable")
+
+        month_ordinals = np.array([month for month, _ in months], dtype="datetime64[M]").astype(np.int64)
+        monthly_trend = net_by_month(month_ordinals, np.array([total for _, total in months], dtype=np.float64))
+
+        metrics = build_metrics(income, abs(expenses), category_spend, monthly_trend, _to_frame(anomalies))
+        metrics["anomaly_count"] = anomaly_count
+        return metrics
+
+
+def _to_frame(rows: list) -> pd.DataFrame:
+    if not rows:
+        return from_columns(amount=np.empty(0))
+    dates, descriptions, amounts, categories = zip(*rows)
+    return from_columns(
+        date=np.array(dates, dtype="datetime64[s]"),
+        description=descriptions,
+        amount=np.array(amounts, dtype=np.float64),
+        category=categories,
+    )
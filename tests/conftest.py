@@ -0,0 +1,67 @@
+import json
+import threading
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from llm import llm_client
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """
+    Chat completions stub: replies with the next scripted (status, headers,
+    body) and records every request it receives.
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.server.requests.append({"headers": dict(self.headers), "json": json.loads(body)})
+        status, headers, reply = self.server.replies.pop(0)
+
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(reply)))
+        self.end_headers()
+        self.wfile.write(reply)
+
+    def log_message(self, *args):
+        pass
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def stream(self, *words):
+        """
+        Scripts a 200 reply streaming `words` as server-sent events.
+        """
+        events = [f"data: {json.dumps({'choices': [{'delta': {'content': word}}]})}\n\n" for word in words]
+        body = ("".join(events) + ": keep-alive\n\ndata: [DONE]\n\n").encode("utf-8")
+        self.replies.append((200, {"Content-Type": "text/event-stream"}, body))
+
+    def fail(self, status: int, message: str = "error", retry_after: str = None):
+        """
+        Scripts an error reply, with a Retry-After header if given.
+        """
+        headers = {"Content-Type": "application/json"}
+        if retry_after is not None:
+            headers["Retry-After"] = retry_after
+        self.replies.append((status, headers, json.dumps({"error": message}).encode("utf-8")))
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    server = StubServer(("127.0.0.1", 0), StubHandler)
+    server.requests, server.replies = [], []
+    threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True).start()
+
+    monkeypatch.setenv("OPENROUTER_API_KEY", "test-key")
+    monkeypatch.setattr(llm_client, "_cache", OrderedDict())
+    server.url = f"http://127.0.0.1:{server.server_port}/v1/chat/completions"
+    yield server
+    server.shutdown()
+    server.server_close()
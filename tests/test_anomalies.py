@@ -0,0 +1,98 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from analysis import anomalies
+from analysis.arrays import group_sort
+
+
+def typical(amounts) -> float:
+    """
+    Baseline the robust detectors use: the median magnitude in log space.
+    """
+    return float(np.expm1(np.median(np.log1p(np.abs(amounts)))))
+
+
+@pytest.fixture
+def ledger() -> pd.DataFrame:
+    """
+    Six months of groceries that jump from ~50 to ~200 in April, monthly
+    rent and salary (too few rows for a baseline of their own), one huge
+    grocery bill in June and one undated grocery row.
+    """
+    rows = []
+    for month in range(1, 7):
+        level = 50 if month <= 3 else 200
+        rows += [(f"2024-{month:02d}-{day:02d}", "Groceries", -(level + day % 5)) for day in range(1, 13)]
+        rows.append((f"2024-{month:02d}-28", "Rent", -1200.0))
+        rows.append((f"2024-{month:02d}-25", "Salary", 3000.0))
+    rows.append(("2024-06-20", "Groceries", -900.0))
+    rows.append((None, "Groceries", -52.0))
+
+    df = pd.DataFrame(rows, columns=["date", "category", "amount"])
+    return df.assign(description="Market", amount=df["amount"].astype(float))
+
+
+def test_group_sort_is_exact_for_large_group_codes():
+    # A combined float key loses both the values and the group order here
+    values = np.arange(10)[::-1] * 0.1
+    assert list(group_sort(np.full(10, 2**52), values)) == list(range(9, -1, -1))
+    assert list(group_sort(np.array([2**53 + 1, 2**53]), np.array([0.0, 1.0]))) == [1, 0]
+
+
+def test_rows_are_scored_against_the_previous_months(ledger):
+    scores = anomalies.robust_scores(ledger, "category")
+    groceries = ledger["category"] == "Groceries"
+    june = groceries & ledger["date"].str.startswith("2024-06") & (ledger["amount"] > -900)
+
+    assert scores.index.equals(ledger.index)
+
+    # March to May, not the whole history
+    march_to_may = groceries & ledger["date"].str.match(r"2024-0[345]")
+    assert scores["baseline"][june].unique() == pytest.approx([-typical(ledger["amount"][march_to_may])])
+    assert (scores["score"][june].abs() < 1).all()
+
+    # The jump is flagged while the window still remembers the old level
+    april = groceries & ledger["date"].str.startswith("2024-04")
+    assert (scores["score"][april] > anomalies.MODIFIED_Z_THRESHOLD).all()
+
+
+def test_rows_without_a_window_fall_back_to_wider_baselines(ledger):
+    scores = anomalies.robust_scores(ledger, "category")
+    groceries = ledger["category"] == "Groceries"
+    expenses = ledger["amount"] < 0
+
+    # No earlier month, or no date: the group over all time
+    january = groceries & ledger["date"].str.startswith("2024-01")
+    undated = ledger["date"].isna()
+    assert scores["baseline"][january | undated].unique() == pytest.approx([-typical(ledger["amount"][groceries])])
+
+    # Too few rows in the group: every row with the same sign
+    assert scores["baseline"][ledger["category"] == "Rent"].unique() == pytest.approx([-typical(ledger["amount"][expenses])])
+    assert scores["baseline"][ledger["category"] == "Salary"].unique() == pytest.approx([3000.0])
+
+
+def test_detect_anomalies_ranks_flagged_rows(ledger):
+    flagged = anomalies.detect_anomalies(ledger)
+
+    assert flagged.index[0] == ledger.index[ledger["amount"] == -900].item()
+    assert flagged["score"].iloc[0] == pytest.approx(20.17)
+    assert list(flagged["score"].abs()) == sorted(flagged["score"].abs(), reverse=True)
+    assert set(flagged["category"]) == {"Groceries"}
+
+    assert anomalies.detect_anomalies(ledger, threshold=20).index.tolist() == flagged.index[:1].tolist()
+
+
+def test_registered_detector_is_used_by_name(ledger, monkeypatch):
+    def by_size(df):
+        return pd.DataFrame({"score": df["amount"] / 1000, "baseline": 0.0}, index=df.index)
+
+    monkeypatch.setattr(anomalies, "DETECTORS", dict(anomalies.DETECTORS))
+    anomalies.register_detector("size", by_size, 1.0)
+
+    flagged = anomalies.detect_anomalies(ledger, "size")
+    assert list(flagged["amount"]) == [3000.0] * 6 + [-1200.0] * 6
+    assert list(flagged["score"][:1]) == [3.0]
+
+    with pytest.raises(ValueError, match="Unknown anomaly detector"):
+        anomalies.detect_anomalies(ledger, "nope")
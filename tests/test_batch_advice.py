@@ -0,0 +1,87 @@
+import asyncio
+import time
+
+import pytest
+
+from llm import batch_advice
+from llm.llm_client import build_prompt
+
+
+def metrics(income: float) -> dict:
+    return {"total_income": income, "total_expenses": 800.0, "net_savings": income - 800.0, "savings_rate": 20.0}
+
+
+@pytest.fixture(autouse=True)
+def short_backoff(monkeypatch):
+    monkeypatch.setattr(batch_advice, "BACKOFF_BASE_SECONDS", 0.01)
+
+
+def advise(stub, items, **options) -> list:
+    return asyncio.run(batch_advice.advise_many(items, api_url=stub.url, **{"rate": 0, **options}))
+
+
+def prompts(stub) -> list:
+    return [request["json"]["messages"][0]["content"] for request in stub.requests]
+
+
+def test_only_identical_prompts_share_a_request(stub):
+    stub.stream("Save ", "more.")
+    stub.stream("Spend ", "less.")
+    items = [metrics(1000.0), metrics(1000.4), metrics(1000.0)]
+
+    results = advise(stub, items, concurrency=1)
+
+    assert prompts(stub) == [build_prompt(items[0]), build_prompt(items[1])]
+    assert [r["duplicate_of"] for r in results] == [None, None, 0]
+    assert [r["advice"] for r in results] == ["Save more.", "Spend less.", "Save more."]
+
+
+def test_rate_limited_and_unavailable_replies_are_retried(stub):
+    stub.fail(429, "slow down", retry_after="0.3")
+    stub.fail(503, "overloaded")
+    stub.stream("Fine.")
+
+    start = time.perf_counter()
+    [result] = advise(stub, [metrics(1000.0)])
+
+    assert result["ok"] and result["advice"] == "Fine."
+    assert result["attempts"] == 3
+    assert len(stub.requests) == 3
+    # The server's Retry-After is waited out before the second attempt
+    assert time.perf_counter() - start >= 0.29
+
+
+def test_item_fails_after_the_last_attempt(stub):
+    for _ in range(batch_advice.MAX_ATTEMPTS):
+        stub.fail(503, "overloaded")
+    stub.stream("Too late.")
+
+    [result] = advise(stub, [metrics(1000.0)])
+
+    assert result["ok"] is False and result["advice"] is None
+    assert result["attempts"] == batch_advice.MAX_ATTEMPTS
+    assert result["error"].startswith("APIError") and "overloaded" in result["error"]
+    assert len(stub.requests) == batch_advice.MAX_ATTEMPTS
+
+
+def test_client_errors_fail_only_their_item_without_retrying(stub):
+    stub.fail(400, "bad request")
+    stub.stream("Fine.")
+
+    results = advise(stub, [metrics(1000.0), metrics(2000.0)], concurrency=1)
+
+    assert [(r["ok"], r["attempts"]) for r in results] == [(False, 1), (True, 1)]
+    assert "bad request" in results[0]["error"]
+    assert len(stub.requests) == 2
+
+
+def test_requests_are_spaced_by_the_rate_limit(stub):
+    for _ in range(3):
+        stub.stream("Fine.")
+
+    start = time.perf_counter()
+    results = advise(stub, [metrics(1000.0), metrics(2000.0), metrics(3000.0)], rate=10)
+
+    assert all(r["ok"] for r in results)
+    # Three starts 0.1 s apart (asyncio may wake a clock tick early)
+    assert time.perf_counter() - start >= 0.19
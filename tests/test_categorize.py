@@ -0,0 +1,68 @@
+import pandas as pd
+import pytest
+
+from analysis.categorize import categorize, classify_description
+from llm import llm_client
+
+
+def categories(descriptions, existing=None) -> list:
+    df = pd.DataFrame({
+        "description": descriptions,
+        "category": existing or ["Uncategorized"] * len(descriptions),
+    })
+    return list(categorize(df)["category"])
+
+
+@pytest.mark.parametrize("description, category", [
+    # Card processor noise is dropped before matching
+    ("AMZN MKTP US*2K3LL0", "Shopping"),
+    ("SQ *BLUE BOTTLE COFFEE 0423", "Dining"),
+    # The longer keyword wins at the same position
+    ("UBER EATS 8005928996", "Dining"),
+    ("UBER *TRIP HELP.UBER.COM", "Transport"),
+    # The earliest keyword in the description wins
+    ("STARBUCKS INSIDE TARGET", "Dining"),
+    ("TARGET STARBUCKS", "Shopping"),
+    # Keywords match whole words only
+    ("BARNES & NOBLE", None),
+    ("GASTROPUB", None),
+])
+def test_keyword_rules(description, category):
+    assert classify_description(description) == category
+
+
+def test_existing_categories_are_kept():
+    assert categories(["NETFLIX.COM", "NETFLIX.COM", "SAFEWAY 1234"], ["Family", "Uncategorized", None]) == [
+        "Family", "Entertainment", "Groceries",
+    ]
+
+
+def test_unmatched_rows_stay_uncategorized():
+    df = pd.DataFrame({"description": ["MYSTERY LLC", None, "Shell Oil 5533"], "category": [None] * 3})
+
+    assert list(categorize(df)["category"]) == ["Uncategorized", "Uncategorized", "Transport"]
+
+
+def test_llm_fallback_sees_each_unmatched_description_once(monkeypatch):
+    asked = []
+
+    def suggest(merchants, names):
+        asked.append(list(merchants))
+        return {"ZELLE TO SAM": "Rent"}
+
+    monkeypatch.setattr(llm_client, "categorize_merchants", suggest)
+    df = pd.DataFrame({
+        "description": ["ZELLE TO SAM", "MYSTERY LLC", "ZELLE TO SAM", "KROGER #12"],
+        "category": ["Uncategorized"] * 4,
+    })
+
+    result = categorize(df, llm_fallback=True)
+
+    assert sorted(asked[0]) == ["MYSTERY LLC", "ZELLE TO SAM"] and len(asked) == 1
+    assert list(result["category"]) == ["Rent", "Uncategorized", "Rent", "Groceries"]
+
+
+def test_llm_fallback_is_not_called_when_every_row_matches(monkeypatch):
+    monkeypatch.setattr(llm_client, "categorize_merchants", lambda *args: pytest.fail("LLM called"))
+
+    assert categories(["CVS PHARMACY", "LYFT RIDE"]) == ["Health", "Transport"]
@@ -0,0 +1,24 @@
+import cli
+
+
+def write(path, rows: str):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text("date,description,amount\n" + rows)
+    return str(path)
+
+
+def test_aggregate_is_reconciled_across_files(tmp_path):
+    files = [
+        write(tmp_path / "checking" / "jan.csv", "2024-01-02,Coffee,-3.50\n2024-01-03,Transfer to savings,-500\n2024-01-05,Salary,2000\n"),
+        write(tmp_path / "savings" / "jan.csv", "2024-01-02,Coffee,-3.50\n2024-01-03,Transfer from checking,500\n"),
+    ]
+
+    results, aggregate = cli.run_batch(files, workers=1)
+    assert all(result["ok"] for result in results)
+    assert aggregate["reconciled"]["transfer"]["rows"] == 2
+    assert aggregate["total_income"] == 2000.0
+    assert aggregate["total_expenses"] == 7.0
+
+    _, aggregate = cli.run_batch(files, workers=1, drop_duplicates=True)
+    assert aggregate["reconciled"]["duplicate"]["rows"] == 1
+    assert aggregate["total_expenses"] == 3.5
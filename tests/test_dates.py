@@ -0,0 +1,70 @@
+import warnings
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+from parsers import dates
+
+# The second lands on the 1st at :00, where values are formatted back to
+# check for rollover
+MOMENTS = [datetime(2024, 2, 29, 13, 5, 9), datetime(2024, 3, 1, 9, 7, 0)]
+
+
+@pytest.fixture(autouse=True)
+def fresh_formats(monkeypatch):
+    monkeypatch.setattr(dates, "_formats", {})
+
+
+@pytest.mark.parametrize("moment", MOMENTS)
+@pytest.mark.parametrize("fmt", dates.DATE_FORMATS)
+def test_every_format_parses_its_own_output(fmt, moment):
+    text = moment.strftime(fmt)
+    expected = datetime.strptime(text, fmt)
+
+    assert dates.infer_date_format([text]) is not None
+    assert dates._strptime(pa.array([text]), fmt).to_pylist() == [expected]
+
+
+@pytest.mark.parametrize("fmt, text", [
+    ("%Y-%m-%d", "2024-02-30"),
+    ("%Y-%m-%d", " 2023-02-29"),
+    ("%m/%d/%Y", "04/31/2024"),
+    ("%Y%m%d", "20230229"),
+    ("%d-%b-%y", "31-Feb-23"),
+    ("%Y-%m-%d %H:%M:%S", "2024-01-01 00:00:60"),
+])
+def test_impossible_dates_are_not_rolled_forward(fmt, text):
+    assert dates._strptime(pa.array([text]), fmt).to_pylist() == [None]
+
+
+def test_impossible_days_come_out_as_nat():
+    parsed = dates.parse_date_strings(["2024-02-29", "2024-02-30", "2023-02-29", "2024-03-01"])
+
+    assert list(pd.DatetimeIndex(parsed).strftime("%Y-%m-%d").fillna("NaT")) == [
+        "2024-02-29", "NaT", "NaT", "2024-03-01",
+    ]
+
+
+def test_unpadded_and_upper_case_values_still_match():
+    parsed = dates.parse_date_strings(["1/5/2024", "12/31/2024", "JAN 5, 2024"])
+
+    assert list(pd.DatetimeIndex(parsed)) == [
+        pd.Timestamp("2024-01-05"), pd.Timestamp("2024-12-31"), pd.Timestamp("2024-01-05"),
+    ]
+
+
+def test_rows_off_the_format_fall_back_across_time_zones():
+    values = ["2024-01-05"] * 20 + ["2024-01-06T10:00:00+02:00", "2024-01-06T10:00:00-05:00", "not a date", None]
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        parsed = dates.parse_date_strings(values)
+
+    assert parsed.dtype == np.dtype("datetime64[ns]")
+    assert parsed[0] == np.datetime64("2024-01-05")
+    assert parsed[20] == np.datetime64("2024-01-06T08:00")
+    assert parsed[21] == np.datetime64("2024-01-06T15:00")
+    assert np.isnat(parsed[22]) and np.isnat(parsed[23])
@@ -0,0 +1,42 @@
+import io
+
+import pandas as pd
+import pytest
+from openpyxl import Workbook
+
+from parsers.cache import ParseCache, cached_parse
+from parsers.excel_parser import parse_excel
+
+
+@pytest.fixture
+def workbook() -> bytes:
+    wb = Workbook()
+    first = wb.active
+    first.append(["Date", "Description", "Amount", "Category"])
+    first.append(["2024-01-02", "Coffee", -3.5, "Food"])
+    second = wb.create_sheet()
+    second.append(["Date", "Description", "Amount"])
+    second.append(["2024-02-02", "Rent", -900])
+    second.append(["2024-02-03", "Coffee", -3])
+
+    buffer = io.BytesIO()
+    wb.save(buffer)
+    return buffer.getvalue()
+
+
+def test_all_sheets_keeps_categorical_columns(workbook):
+    df = parse_excel(io.BytesIO(workbook), all_sheets=True)
+
+    assert len(df) == 3
+    assert isinstance(df["description"].dtype, pd.CategoricalDtype)
+    assert isinstance(df["category"].dtype, pd.CategoricalDtype)
+    assert list(df["category"]) == ["Food", "Uncategorized", "Uncategorized"]
+
+
+def test_cache_key_includes_parser_options(workbook, tmp_path):
+    cache = ParseCache(str(tmp_path))
+
+    assert len(cached_parse(parse_excel, io.BytesIO(workbook), cache)) == 1
+    assert len(cached_parse(parse_excel, io.BytesIO(workbook), cache, all_sheets=True)) == 3
+    assert len(cached_parse(parse_excel, io.BytesIO(workbook), cache, all_sheets=True)) == 3
+    assert (cache.misses, cache.hits) == (2, 1)
@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from analysis import forecast
+from analysis.rollups import build_cube
+
+
+def monthly_cube(start: str, **series) -> pd.DataFrame:
+    """
+    Cube of one transaction per month and category on the 15th;
+    `series` maps a category to its signed monthly amounts.
+    """
+    rows = [
+        (month.strftime("%Y-%m-15"), category, amount)
+        for category, amounts in series.items()
+        for month, amount in zip(pd.period_range(start, periods=len(amounts), freq="M"), amounts)
+    ]
+    return build_cube(pd.DataFrame(rows, columns=["date", "category", "amount"]).assign(description="x"))
+
+
+def test_result_shape_and_balance():
+    cube = monthly_cube("2022-01", Salary=[3000.0] * 30, Dining=[-200.0] * 30, Rent=[-1200.0] * 30)
+    scenarios = [{"name": "Cut dining", "changes": [{"category": "Dining", "scale": 0.5}]}]
+
+    result = forecast.forecast(cube, scenarios, horizon=6, opening=500.0)
+
+    assert result["scenarios"] == ["Baseline", "Cut dining"]
+    assert list(result["periods"].astype(str)) == ["2024-07", "2024-08", "2024-09", "2024-10", "2024-11", "2024-12"]
+    assert list(result["categories"]) == ["Dining", "Rent", "Salary"]
+    assert result["amounts"].shape == (2, 6, 3)
+    assert result["net"].shape == result["balance"].shape == (2, 6)
+    np.testing.assert_allclose(result["net"][0], 1600.0)
+    np.testing.assert_allclose(result["net"][1], 1700.0)
+    np.testing.assert_allclose(result["balance"], 500.0 + np.cumsum(result["net"], axis=1))
+    assert forecast.forecast(build_cube(pd.DataFrame(columns=["date", "category", "amount"]))) == {}
+
+
+def test_seasonal_months_repeat_their_average():
+    # Three years of heating bills that triple over the winter
+    heating = [-300.0 if month in (12, 1, 2) else -100.0 for month in list(range(1, 13)) * 3]
+    cube = monthly_cube("2021-01", Heating=heating)
+
+    result = forecast.forecast(cube, horizon=12)
+    projected = pd.Series(result["net"][0], index=result["periods"].month)
+
+    assert projected[[12, 1, 2]].tolist() == pytest.approx([-300.0] * 3)
+    assert projected[list(range(3, 12))].tolist() == pytest.approx([-100.0] * 9)
+
+
+def test_short_history_follows_a_damped_trend():
+    # Fewer than MIN_SEASONAL_YEARS of history: no seasonal offsets
+    income = [1000.0 + 10 * month for month in range(18)]
+    result = forecast.forecast(monthly_cube("2023-01", Salary=income), horizon=4)
+
+    steps = np.cumsum(forecast.TREND_DAMPING ** np.arange(1, 5))
+    np.testing.assert_allclose(result["net"][0], income[-1] + 10 * steps)
+
+
+def test_falling_expenses_stop_at_zero():
+    result = forecast.forecast(monthly_cube("2023-01", Fuel=[-1000.0 + 90 * month for month in range(12)]), horizon=24)
+
+    assert (result["amounts"][0] <= 0).all()
+    assert result["net"][0][-1] == 0.0
+
+
+def test_scenarios_start_when_asked_and_can_add_categories():
+    cube = monthly_cube("2022-01", Salary=[3000.0] * 30, Dining=[-200.0] * 30)
+    scenarios = [{"name": "Car", "changes": [
+        {"category": "Dining", "scale": 0.5, "start": 2},
+        {"category": "Car loan", "shift": -400.0},
+    ]}]
+
+    result = forecast.forecast(cube, scenarios, horizon=4)
+    difference = result["amounts"][1] - result["amounts"][0]
+
+    assert list(result["categories"]) == ["Dining", "Salary", "Car loan"]
+    np.testing.assert_allclose(difference[:, 0], [0.0, 0.0, 100.0, 100.0])
+    np.testing.assert_allclose(difference[:, 1], 0.0)
+    np.testing.assert_allclose(difference[:, 2], -400.0)
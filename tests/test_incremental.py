@@ -0,0 +1,104 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from analysis.finance_metrics import IQR_MULTIPLIER, compute_financial_metrics
+from analysis.incremental import SKETCH_RELATIVE_ACCURACY, IncrementalMetrics
+from benchmarks.datagen import make_ledger
+from parsers.csv_parser import stream_csv_metrics
+from parsers.schema import from_columns
+from pipeline import stages
+
+
+@pytest.fixture(scope="module")
+def ledger():
+    frame = make_ledger(50_000, seed=3)
+    return from_columns(**{name: frame[name] for name in frame.columns})
+
+
+def batches(df: pd.DataFrame, size: int):
+    return [df.iloc[start:start + size] for start in range(0, len(df), size)]
+
+
+def assert_matches_full(metrics: dict, full: dict, amounts: np.ndarray):
+    for key in ("total_income", "total_expenses", "net_savings", "savings_rate"):
+        assert metrics[key] == pytest.approx(full[key], abs=0.02)
+    pd.testing.assert_series_equal(metrics["category_spend"].sort_index(), full["category_spend"].sort_index(), check_names=False)
+    pd.testing.assert_series_equal(metrics["monthly_trend"], full["monthly_trend"], check_names=False)
+
+    # The sketch's fences are within its relative accuracy of the exact
+    # ones, so only rows that close to a fence may be classified differently
+    q1, q3 = np.quantile(amounts, (0.25, 0.75))
+    fences = np.array([q1 - IQR_MULTIPLIER * (q3 - q1), q3 + IQR_MULTIPLIER * (q3 - q1)])
+    differing = set(metrics["anomalies"].index) ^ set(full["anomalies"].index)
+    near = np.abs(amounts[list(differing)][:, None] - fences).min(axis=1) <= 4 * SKETCH_RELATIVE_ACCURACY * np.abs(fences).max()
+    assert near.all()
+
+
+def test_to_metrics_matches_full_recompute(ledger):
+    full = compute_financial_metrics(ledger)
+    metrics = IncrementalMetrics(max_anomalies=len(ledger))
+    for batch in batches(ledger, 7_000):
+        metrics.update(batch)
+
+    result = metrics.to_metrics()
+    assert_matches_full(result, full, ledger["amount"].to_numpy())
+    assert result["anomaly_count"] == pytest.approx(len(full["anomalies"]), rel=0.01)
+
+
+def test_merge_matches_sequential_updates(ledger):
+    left, right = IncrementalMetrics(), IncrementalMetrics()
+    for i, batch in enumerate(batches(ledger, 5_000)):
+        (left if i % 2 else right).update(batch)
+
+    sequential = IncrementalMetrics()
+    for batch in batches(ledger, 5_000):
+        sequential.update(batch)
+
+    merged = left.merge(right).to_metrics()
+    expected = sequential.to_metrics()
+    assert merged["total_income"] == pytest.approx(expected["total_income"])
+    assert merged["anomaly_count"] == expected["anomaly_count"]
+
+
+def test_anomaly_rows_are_bounded(ledger):
+    metrics = IncrementalMetrics(max_anomalies=100)
+    for batch in batches(ledger, 5_000):
+        metrics.update(batch)
+        assert len(metrics.candidates) <= 200
+
+    result = metrics.to_metrics()
+    full = compute_financial_metrics(ledger)
+    assert len(result["anomalies"]) <= 200
+    assert result["anomaly_count"] == pytest.approx(len(full["anomalies"]), rel=0.01)
+    # The retained rows are the most extreme anomalies
+    assert result["anomalies"]["amount"].max() == full["anomalies"]["amount"].max()
+    assert result["anomalies"]["amount"].min() == full["anomalies"]["amount"].min()
+
+
+class OneWay(io.StringIO):
+    def seekable(self):
+        return False
+
+    def seek(self, *args):
+        raise io.UnsupportedOperation("not seekable")
+
+
+def test_stream_csv_metrics_reads_once(ledger):
+    csv = make_ledger(20_000, seed=3).to_csv(index=False)
+    streamed = stream_csv_metrics(OneWay(csv), chunksize=3_000)
+    frame = make_ledger(20_000, seed=3)
+    full = compute_financial_metrics(from_columns(**{name: frame[name] for name in frame.columns}))
+    assert streamed["total_expenses"] == pytest.approx(full["total_expenses"], abs=0.02)
+    assert streamed["anomaly_count"] == pytest.approx(len(full["anomalies"]), rel=0.01)
+
+
+def test_streamed_ingest_takes_preview_from_the_same_pass():
+    frame = make_ledger(20_000, seed=4)
+    _, preview, metrics = stages.ingest_streamed_csv(
+        stages.PipelineRun(), OneWay(frame.to_csv(index=False)), preview_rows=250
+    )
+    assert list(preview["description"].astype(str)) == list(frame["description"].astype(str)[:250])
+    assert metrics["total_income"] == pytest.approx(frame["amount"].clip(lower=0).sum(), abs=0.02)
@@ -0,0 +1,52 @@
+import pytest
+
+from llm import llm_client
+
+METRICS = {"total_income": 4000.0, "total_expenses": 3100.0, "net_savings": 900.0, "savings_rate": 22.5}
+
+
+def test_streams_server_sent_events_in_order(stub):
+    stub.stream("Save ", "more ", "each month.")
+
+    chunks = list(llm_client.stream_ai_advice(METRICS, api_url=stub.url))
+
+    assert chunks == ["Save ", "more ", "each month."]
+    request = stub.requests[0]
+    assert request["headers"]["Authorization"] == "Bearer test-key"
+    assert request["json"]["stream"] is True
+    assert request["json"]["messages"][0]["content"] == llm_client.build_prompt(METRICS)
+
+
+def test_repeated_prompt_is_served_from_cache(stub):
+    stub.stream("Cut ", "dining.")
+    hits = llm_client.advisor_stats()["cache_hits"]
+
+    first = llm_client.generate_ai_advice(METRICS, api_url=stub.url)
+    second = llm_client.generate_ai_advice(dict(METRICS), api_url=stub.url)
+
+    assert first == second == "Cut dining."
+    assert len(stub.requests) == 1
+    assert llm_client.advisor_stats()["cache_hits"] == hits + 1
+
+
+def test_error_reply_raises_and_is_not_cached(stub):
+    stub.fail(429, "slow down", retry_after="2")
+    stub.stream("Fine.")
+    errors = llm_client.advisor_stats()["errors"]
+
+    with pytest.raises(llm_client.APIError) as raised:
+        llm_client.generate_ai_advice(METRICS, api_url=stub.url)
+    assert raised.value.status_code == 429
+    assert raised.value.retry_after == 2.0
+    assert llm_client.advisor_stats()["errors"] == errors + 1
+
+    assert llm_client.generate_ai_advice(METRICS, api_url=stub.url) == "Fine."
+    assert len(stub.requests) == 2
+
+
+def test_missing_api_key_fails_before_any_request(stub, monkeypatch):
+    monkeypatch.delenv("OPENROUTER_API_KEY")
+
+    with pytest.raises(RuntimeError, match="OPENROUTER_API_KEY"):
+        llm_client.generate_ai_advice(METRICS, api_url=stub.url)
+    assert stub.requests == []
@@ -0,0 +1,108 @@
+import io
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from monitoring import instrumentation
+from parsers import multi
+from parsers.cache import ParseCache
+from parsers.pdf_parser import parse_pdf
+from parsers.schema import from_columns
+
+
+class Upload(io.BytesIO):
+    """
+    Minimal stand-in for a Streamlit UploadedFile.
+    """
+
+    def __init__(self, name: str, data: bytes):
+        super().__init__(data)
+        self.name = name
+
+
+@pytest.fixture(autouse=True)
+def cache(monkeypatch, tmp_path):
+    cache = ParseCache(str(tmp_path))
+    monkeypatch.setattr("parsers.cache._default_cache", cache)
+    return cache
+
+
+def uploads():
+    return [
+        Upload("jan.csv", b"date,description,amount\n2024-01-02,Coffee,-3.50\n2024-01-05,Salary,2000\n"),
+        Upload("notes.docx", b"not a statement"),
+        Upload("feb.txt", b"2024-02-03 Rent -900.00\n"),
+    ]
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_uploads_are_merged_in_upload_order(monkeypatch, workers):
+    monkeypatch.setattr(multi, "ProcessPoolExecutor", ThreadPoolExecutor)
+    progress = []
+
+    df, results = multi.parse_uploads(uploads(), workers=workers, on_progress=lambda done, total, _: progress.append((done, total)))
+
+    assert [r["file"] for r in results] == ["jan.csv", "notes.docx", "feb.txt"]
+    assert [r["ok"] for r in results] == [True, False, True]
+    assert "Unsupported file type" in results[1]["error"]
+    assert sorted(progress) == [(1, 3), (2, 3), (3, 3)]
+
+    assert list(df["source"]) == ["jan.csv", "jan.csv", "feb.txt"]
+    assert list(df["source"].cat.categories) == ["jan.csv", "feb.txt"]
+    assert list(df["amount"]) == [-3.5, 2000.0, -900.0]
+
+
+def test_no_parsed_upload_gives_no_frame():
+    df, results = multi.parse_uploads([Upload("notes.docx", b"")], workers=1)
+
+    assert df is None
+    assert results[0]["ok"] is False
+
+
+def test_pdfs_in_the_pool_are_parsed_with_one_worker(monkeypatch):
+    calls = []
+
+    def record(parser, source, key=None, **options):
+        calls.append((parser, options))
+        return from_columns(date=["2024-01-02"], description=["Coffee"], amount=[-3.5], category=["Food"])
+
+    monkeypatch.setattr(multi, "ProcessPoolExecutor", ThreadPoolExecutor)
+    monkeypatch.setattr(multi, "cached_parse", record)
+
+    multi.parse_uploads([Upload("a.pdf", b"%PDF"), Upload("b.pdf", b"%PDF")], workers=2)
+    assert calls == [(parse_pdf, {"workers": 1})] * 2
+
+    # A single upload is parsed in this process, so parse_pdf may use every CPU
+    calls.clear()
+    multi.parse_uploads([Upload("a.pdf", b"%PDF")], workers=2)
+    assert calls == [(parse_pdf, {"workers": None})]
+
+
+def test_worker_count_is_not_part_of_the_cache_key():
+    assert ParseCache.key("parse_pdf", b"%PDF", {"workers": 1}) == ParseCache.key("parse_pdf", b"%PDF")
+    assert ParseCache.key("parse_excel", b"x", {"all_sheets": True}) != ParseCache.key("parse_excel", b"x")
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_cache_hits_and_misses_are_counted_in_the_parent(cache, workers):
+    files = [Upload("jan.csv", uploads()[0].getvalue()), Upload("feb.txt", uploads()[2].getvalue())]
+
+    multi.parse_uploads(files, workers=workers)
+    assert (cache.hits, cache.misses) == (0, 2)
+
+    multi.parse_uploads(files, workers=workers)
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["hit_rate"]) == (2, 2, 0.5)
+    assert stats["bytes_saved"] == sum(len(f.getvalue()) for f in files)
+
+
+def test_cache_counters_are_exported_with_the_metrics(cache, monkeypatch):
+    # default_cache() registers the collector when it creates the cache
+    monkeypatch.setattr("parsers.cache._default_cache", None)
+    monkeypatch.setattr("parsers.cache.ParseCache", lambda: cache)
+    multi.parse_uploads(uploads()[:1], workers=1)
+
+    text = instrumentation.prometheus_text()
+    assert "# TYPE finance_analyzer_parse_cache_misses_total counter" in text
+    assert "finance_analyzer_parse_cache_misses_total 1" in text
+    assert "# TYPE finance_analyzer_parse_cache_hit_rate gauge" in text
@@ -0,0 +1,35 @@
+import numpy as np
+import pandas as pd
+
+from parsers.schema import from_columns
+from pipeline import presentation
+
+
+def unique_ledger(rows: int) -> pd.DataFrame:
+    return from_columns(
+        date=np.full(rows, "2024-01-01", dtype=object),
+        description=np.array([f"merchant {i}" for i in range(rows)], dtype=object),
+        amount=np.linspace(-500, 500, rows),
+        category=np.full(rows, "Shopping", dtype=object),
+    )
+
+
+def test_page_sends_only_its_own_categories():
+    df = unique_ledger(50_000)
+    page = presentation.page(df, 3, page_rows=100)
+
+    assert len(page["description"].cat.categories) == 100
+    assert list(page["description"]) == list(df["description"].iloc[200:300])
+    assert presentation.payload_bytes(page) < presentation.payload_bytes(df.iloc[200:300]) / 50
+
+
+def test_largest_rows_ranks_by_score_when_present():
+    df = unique_ledger(10)
+    scored = df.assign(score=[0, 0, 0, 0, 9, -8, 0, 0, 0, 0.5])
+
+    kept = presentation.largest_rows(scored, limit=3)
+    assert list(kept.index) == [4, 5, 9]
+    assert len(kept["description"].cat.categories) == 3
+
+    by_amount = presentation.largest_rows(df, limit=2)
+    assert list(by_amount.index) == [0, 9]
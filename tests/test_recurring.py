@@ -0,0 +1,77 @@
+import pandas as pd
+import pytest
+
+from analysis.recurring import detect_recurring
+
+
+def series(description: str, start: str, step, amounts) -> list:
+    """
+    Rows of one merchant charged every `step` from `start`, one per amount.
+    """
+    dates = pd.date_range(start, periods=len(amounts), freq=step)
+    return [(date.strftime("%Y-%m-%d"), description, "Bills", amount) for date, amount in zip(dates, amounts)]
+
+
+@pytest.fixture
+def found() -> pd.DataFrame:
+    rows = (
+        series("SPOTIFY P1234", "2024-04-05", "7D", [-9.99] * 12)
+        + series("GYM CLUB", "2024-03-01", "14D", [-20.0] * 8)
+        + series("LANDLORD RENT", "2024-01-01", "MS", [-1500.0] * 6)
+        + series("INSURANCE CO", "2023-07-10", pd.DateOffset(months=3), [-300.0] * 4)
+        + series("DOMAIN RENEW", "2023-06-20", pd.DateOffset(years=1), [-12.0] * 2)
+        # Within AMOUNT_TOLERANCE of the typical amount
+        + series("POWER UTILITY", "2024-01-20", pd.DateOffset(months=1), [-100.0, -110.0, -95.0, -105.0, -98.0])
+        # Regular dates, but the amounts are all over the place
+        + series("PHONE SHOP", "2024-01-20", pd.DateOffset(months=1), [-50.0, -120.0, -300.0, -60.0, -200.0])
+        # Stopped a year before the newest transaction
+        + series("OLD MAGAZINE", "2023-06-03", pd.DateOffset(months=1), [-7.5] * 4)
+        + [("2024-06-28", "SALARY", "Income", 3000.0)]
+    )
+    df = pd.DataFrame(rows, columns=["date", "description", "category", "amount"])
+    return detect_recurring(df).set_index("description")
+
+
+def test_each_cadence_is_found_with_its_yearly_cost(found):
+    assert found["period"].to_dict() == {
+        "LANDLORD RENT": "monthly",
+        "INSURANCE CO": "quarterly",
+        "POWER UTILITY": "monthly",
+        "GYM CLUB": "biweekly",
+        "SPOTIFY P1234": "weekly",
+        "DOMAIN RENEW": "annual",
+        "OLD MAGAZINE": "monthly",
+    }
+    assert found["annualized_cost"].to_dict() == {
+        "LANDLORD RENT": 18000.0,
+        "INSURANCE CO": 1200.0,
+        "POWER UTILITY": 1200.0,
+        "GYM CLUB": 520.0,
+        "SPOTIFY P1234": 519.48,
+        "DOMAIN RENEW": 12.0,
+        "OLD MAGAZINE": 90.0,
+    }
+
+
+def test_amounts_must_stay_within_tolerance(found):
+    assert found.loc["POWER UTILITY", "amount"] == 100.0
+    assert "PHONE SHOP" not in found.index
+
+
+def test_stopped_series_are_inactive_and_listed_last(found):
+    assert found["active"].to_dict() == {name: name != "OLD MAGAZINE" for name in found.index}
+    assert found.index[-1] == "OLD MAGAZINE"
+
+
+def test_next_charge_follows_the_calendar(found):
+    expected = {
+        "LANDLORD RENT": ("2024-06-01", "2024-07-01"),
+        "INSURANCE CO": ("2024-04-10", "2024-07-10"),
+        "GYM CLUB": ("2024-06-07", "2024-06-21"),
+        "SPOTIFY P1234": ("2024-06-21", "2024-06-28"),
+        "DOMAIN RENEW": ("2024-06-20", "2025-06-20"),
+    }
+    for name, (last, next_expected) in expected.items():
+        assert found.loc[name, "last_charge"] == pd.Timestamp(last)
+        assert found.loc[name, "next_expected"] == pd.Timestamp(next_expected)
+    assert found.loc["SPOTIFY P1234", "charges"] == 12
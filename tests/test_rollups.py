@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from analysis import rollups
+from analysis.finance_metrics import compute_financial_metrics
+
+
+@pytest.fixture
+def ledger() -> pd.DataFrame:
+    """
+    Fourteen months of mixed income and expenses, a few zero amounts,
+    spanning a year boundary.
+    """
+    rng = np.random.default_rng(7)
+    rows = 3000
+    dates = pd.Timestamp("2023-11-03") + pd.to_timedelta(rng.integers(0, 420, rows), unit="D")
+    amounts = np.round(rng.normal(-60, 80, rows), 2)
+    amounts[::97] = 0.0
+
+    return pd.DataFrame({
+        "date": dates.strftime("%Y-%m-%d"),
+        "description": "x",
+        "amount": amounts,
+        "category": rng.choice(["Groceries", "Rent", "Salary", "Dining"], rows),
+    })
+
+
+@pytest.mark.parametrize("freq", rollups.GRANULARITIES.values())
+def test_every_granularity_reconciles_with_the_metrics(ledger, freq):
+    metrics = compute_financial_metrics(ledger)
+    table = rollups.rollup(rollups.build_cube(ledger), freq)
+
+    assert table["income"].sum() == pytest.approx(metrics["total_income"], abs=0.01)
+    assert table["expenses"].sum() == pytest.approx(metrics["total_expenses"], abs=0.01)
+    assert table["net"].sum() == pytest.approx(metrics["net_savings"], abs=0.01)
+    assert table["count"].sum() == len(ledger)
+    assert table["min"].min() == ledger["amount"].min()
+    assert table["max"].max() == ledger["amount"].max()
+
+
+def test_monthly_views_match_the_metrics(ledger):
+    metrics = compute_financial_metrics(ledger)
+    cube = rollups.build_cube(ledger)
+
+    pd.testing.assert_series_equal(rollups.trend(cube, "M"), metrics["monthly_trend"], check_freq=False)
+
+    spend = rollups.category_trend(cube, "M").sum()
+    spend = spend[spend > 0].sort_values(ascending=False)
+    assert spend.to_dict() == pytest.approx(metrics["category_spend"].to_dict())
+
+    balance = rollups.running_balance(cube, "M", opening=100.0)
+    assert balance.iloc[-1] == pytest.approx(100.0 + metrics["net_savings"], abs=0.01)
+
+
+def test_period_rows_match_a_groupby_over_transactions(ledger):
+    table = rollups.rollup(rollups.build_cube(ledger), "W", by_category=True)
+
+    weeks = pd.to_datetime(ledger["date"]).dt.to_period("W")
+    expected = ledger.groupby([weeks.rename("period"), "category"])["amount"].agg(["count", "min", "max", "sum"])
+
+    assert list(table.index) == list(expected.index)
+    assert list(table["count"]) == list(expected["count"])
+    assert list(table["min"]) == list(expected["min"]) and list(table["max"]) == list(expected["max"])
+    np.testing.assert_allclose(table["net"], expected["sum"])
+
+
+def test_undated_rows_are_left_out_like_the_monthly_trend(ledger):
+    ledger.loc[:9, "date"] = None
+    metrics = compute_financial_metrics(ledger)
+    cube = rollups.build_cube(ledger)
+
+    assert cube["count"].sum() == len(ledger) - 10
+    pd.testing.assert_series_equal(rollups.trend(cube, "M"), metrics["monthly_trend"], check_freq=False)
+    assert len(rollups.build_cube(ledger.iloc[:10])) == 0
@@ -0,0 +1,56 @@
+import io
+
+import numpy as np
+import pandas as pd
+
+from parsers.cache import ParseCache
+from parsers.csv_parser import parse_csv
+from pipeline import stages
+
+
+def test_memo_is_bounded_by_bytes():
+    memo = stages.StageMemo(max_bytes=3 * 8_000 + 1_000)
+    for i in range(5):
+        memo.put(("stage", str(i)), np.zeros(1_000))
+
+    assert len(memo) == 3
+    assert memo.size_bytes <= memo.max_bytes
+    assert memo.get(("stage", "0")) == (False, None)
+    assert memo.get(("stage", "4"))[0]
+
+
+def test_memo_skips_results_larger_than_the_budget():
+    memo = stages.StageMemo(max_bytes=1_000)
+    memo.put(("stage", "big"), pd.DataFrame({"x": np.zeros(1_000)}))
+    assert len(memo) == 0 and memo.size_bytes == 0
+
+
+def test_runs_share_results_only_through_their_memo():
+    calls = []
+
+    def compute(value):
+        calls.append(value)
+        return value * 2
+
+    memo = stages.StageMemo()
+    assert stages.PipelineRun(memo).stage("double", "k", compute, 2) == 4
+    assert stages.PipelineRun(memo).stage("double", "k", compute, 2) == 4
+    assert stages.PipelineRun().stage("double", "k", compute, 2) == 4
+    assert calls == [2, 2]
+
+
+def test_ingest_hashes_the_upload_once(monkeypatch, tmp_path):
+    hashed = []
+    original = ParseCache.key
+
+    def counting_key(parser_name, data):
+        hashed.append(parser_name)
+        return original(parser_name, data)
+
+    monkeypatch.setattr(ParseCache, "key", staticmethod(counting_key))
+    monkeypatch.setattr("parsers.cache._default_cache", ParseCache(str(tmp_path)))
+
+    upload = io.BytesIO(b"date,description,amount\n2024-01-02,coffee,-3.5\n")
+    _, df = stages.ingest(stages.PipelineRun(), parse_csv, upload)
+    assert len(df) == 1
+    assert hashed == ["parse_csv"]
@@ -0,0 +1,74 @@
+from analysis.finance_metrics import compute_financial_metrics
+from benchmarks.datagen import make_ledger
+from parsers.schema import from_columns
+from storage.transactions import TransactionStore
+
+
+def ledger(rows: int, seed: int):
+    frame = make_ledger(rows, seed=seed)
+    return from_columns(**{name: frame[name] for name in frame.columns})
+
+
+def test_metrics_limits_anomaly_rows_but_counts_them_all(tmp_path):
+    store = TransactionStore(str(tmp_path / "transactions.sqlite"))
+    df = ledger(20_000, seed=5)
+    store.add_frame(df, "statement")
+
+    full = compute_financial_metrics(df)
+    limited = store.metrics(max_anomalies=10)
+    assert limited["anomaly_count"] == len(full["anomalies"])
+    expected = sorted(full["anomalies"]["amount"].nsmallest(10)) + sorted(full["anomalies"]["amount"].nlargest(10))
+    assert sorted(limited["anomalies"]["amount"]) == expected
+
+    everything = store.metrics(max_anomalies=len(df))
+    assert sorted(everything["anomalies"]["amount"]) == sorted(full["anomalies"]["amount"])
+
+
+def test_revision_changes_only_when_rows_are_added(tmp_path):
+    store = TransactionStore(str(tmp_path / "transactions.sqlite"))
+    empty = store.revision()
+    df = ledger(1_000, seed=6)
+
+    store.add_frame(df, "first")
+    saved = store.revision()
+    assert saved != empty
+
+    store.add_frame(df, "again")
+    assert store.revision() == saved
+
+
+def test_statements_sharing_a_row_keep_both_until_confirmed(tmp_path):
+    store = TransactionStore(str(tmp_path / "transactions.sqlite"))
+    checking = from_columns(
+        date=["2024-01-02", "2024-01-02", "2024-01-05"], description=["Coffee", "Coffee", "Salary"],
+        amount=[-3.5, -3.5, 2000.0], category=["Food", "Food", "Income"],
+    )
+    card = from_columns(
+        date=["2024-01-02", None, "2024-01-09"], description=["Coffee", "Coffee", "Rent"],
+        amount=[-3.5, -3.5, -900.0], category=["Food", "Food", "Housing"],
+    )
+
+    assert store.add_frame(checking, "checking") == 3
+    assert store.add_frame(card, "card") == 3
+    assert len(store.query()) == 6
+    assert store.repeats() == 1
+    assert store.metrics()["total_expenses"] == 914.0
+    assert store.metrics(drop_repeats=True)["total_expenses"] == 910.5
+    assert len(store.query(drop_repeats=True)) == 5
+
+
+def test_version_0_store_is_rebuilt_with_its_rows(tmp_path):
+    import sqlite3
+
+    path = str(tmp_path / "transactions.sqlite")
+    store = TransactionStore(path)
+    store.add_frame(ledger(100, seed=7), "old")
+    with sqlite3.connect(path) as conn:
+        conn.execute("PRAGMA user_version = 0")
+
+    reopened = TransactionStore(path)
+    assert len(reopened.query()) == 100
+    with sqlite3.connect(path) as conn:
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == 1
+        schema = conn.execute("SELECT sql FROM sqlite_master WHERE name = 'transactions'").fetchone()[0]
+    assert "UNIQUE (statement_id, date" in schema
@@ -0,0 +1,77 @@
+import io
+from datetime import date
+
+import pandas as pd
+import pytest
+
+from parsers.dispatch import parse_path
+from parsers.text_parser import parse_text, parse_text_stream
+
+
+def rows(df: pd.DataFrame) -> list:
+    dates = df["date"].dt.strftime("%Y-%m-%d").where(df["date"].notna(), None)
+    return list(zip(dates, df["description"].astype(str), df["amount"]))
+
+
+@pytest.mark.parametrize("text, expected", [
+    (
+        "On 2024-03-05 I spent $120 on flight tickets and $80 on hotel. 2024-04-09 Got $2,000 for salary",
+        [("2024-03-05", "flight tickets", -120.0), ("2024-03-05", "hotel", -80.0), ("2024-04-09", "salary", 2000.0)],
+    ),
+    # The separator before a description that precedes its amount is dropped
+    ("Mar 3 2024: coffee 4.50, lunch 12", [("2024-03-03", "coffee", -4.5), ("2024-03-03", "lunch", -12.0)]),
+    # Chat-export speaker prefixes are not part of the description
+    ("[2024-10-02 06:27] me: Spotify - $16.29", [("2024-10-02", "Spotify", -16.29)]),
+    ("[2024-12-12 09:47] me: paid 12.10 for Chipotle and $4.03 for tips",
+     [("2024-12-12", "Chipotle", -12.1), ("2024-12-12", "tips", -4.03)]),
+    # Ordinals are dates, not amounts
+    ("rent 1200 on 1st of May", [(None, "rent", -1200.0)]),
+    ("21st March 2024 spent 30 on books", [("2024-03-21", "books", -30.0)]),
+    ("received $1,780.40 salary from ACME", [(None, "salary from ACME", 1780.4)]),
+    ("Paid (45.00) FOR GAS", [(None, "GAS", -45.0)]),
+    ("2024-01-05T10:00 +$5 refund coffee", [("2024-01-05", "refund coffee", 5.0)]),
+])
+def test_parse_text(text, expected):
+    assert rows(parse_text(text)) == expected
+
+
+def test_stream_matches_parse_text_across_blocks():
+    text = "\n".join(f"2024-01-{day:02d} me: spent ${day}.50 on lunch" for day in range(1, 29)) + "\n"
+    assert rows(parse_text_stream(io.StringIO(text), block_lines=5)) == rows(parse_text(text))
+
+
+@pytest.mark.parametrize("text, expected", [
+    # A date without a year takes the last year written before it...
+    ("Jan 3 2023: coffee 4.50. Feb 5th lunch 12. 2024-06-01 rent 900. 7 July: taxi 20",
+     [("2023-01-03", "coffee", -4.5), ("2023-02-05", "lunch", -12.0), ("2024-06-01", "rent", -900.0),
+      ("2024-07-07", "taxi", -20.0)]),
+    # ...or, before any, the first one written after it
+    ("5th of March spent 30 on books. 1/2/22 spent 8 on bus",
+     [("2022-03-05", "books", -30.0), ("2022-01-02", "bus", -8.0)]),
+])
+def test_dates_without_a_year_take_one_from_the_text(text, expected):
+    assert rows(parse_text(text)) == expected
+
+
+def test_dates_without_a_year_default_to_this_year():
+    assert rows(parse_text("Sept. 14: coffee 4")) == [(f"{date.today().year}-09-14", "coffee", -4.0)]
+
+
+def test_year_carries_across_stream_blocks():
+    text = "Jan 2 2023 me: spent $5 on tea\n" + "".join(f"Jan {day} me: spent ${day} on lunch\n" for day in range(3, 10))
+    df = parse_text_stream(io.StringIO(text), block_lines=2)
+
+    assert list(df["date"].dt.strftime("%Y-%m-%d")) == [f"2023-01-{day:02d}" for day in range(2, 10)]
+    assert rows(df) == rows(parse_text(text))
+
+
+def test_text_files_are_parsed_as_a_stream(tmp_path):
+    path = tmp_path / "log.txt"
+    path.write_text("2024-01-05 me: spent $3 on coffee\n2024-01-06 me: got $50 refund\n")
+
+    assert rows(parse_path(str(path))) == [("2024-01-05", "coffee", -3.0), ("2024-01-06", "refund", 50.0)]
+
+
+def test_no_transactions():
+    with pytest.raises(ValueError):
+        parse_text("nothing to see here")